@@ -1,7 +1,9 @@
 from django.contrib import admin
 from .models import UserProfile
-from .models import Product, CartItem, UserProfile
+from .models import Product, CartItem, UserProfile, SellerSalesSummary, Task
 
 admin.site.register(Product)
 admin.site.register(CartItem)
 admin.site.register(UserProfile)
+admin.site.register(SellerSalesSummary)
+admin.site.register(Task)
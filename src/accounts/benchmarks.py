@@ -0,0 +1,460 @@
+"""Route benchmark harness.
+
+Seeds the database at several data volumes and drives every named route in
+``accounts.urls`` through the test ``Client``, recording per route and
+volume:
+
+    * the number of SQL queries,
+    * p50/p95 wall-clock latency,
+    * peak Python memory allocated while serving the request.
+
+Every request runs inside a transaction that is rolled back afterwards, so
+mutating routes (``add_to_cart``, ``place_order``...) see the same seeded
+state on every repeat. ``scaling_routes`` flags routes whose query count
+grows with the data volume, which is how N+1 regressions show up.
+
+Used by the ``bench_routes`` command and by the test suite.
+
+``session_load`` is a separate concurrency benchmark for the
+``bench_sessions`` command: many logged-in clients hit one route at once and
+the session table traffic and lock errors are counted per session engine.
+``db_load`` (``bench_sqlite_load``) forks gunicorn-like worker processes,
+each with several threads, and drives a read/write route mix against a
+SQLite file to compare connection settings.
+"""
+import multiprocessing
+import random
+import statistics
+import threading
+import time
+import tracemalloc
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, get_resolver, reverse
+
+from . import carts, fulfillment, pricing, reports, sales, search
+from .models import CartItem, Fulfillment, Order, OrderItem, Product, UserProfile
+
+VOLUMES = {
+    "small": {"buyers": 5, "products": 20, "cart_lines": 1, "orders": 5, "lines_per_order": 2},
+    "medium": {"buyers": 50, "products": 200, "cart_lines": 50, "orders": 500, "lines_per_order": 4},
+    "large": {"buyers": 200, "products": 1000, "cart_lines": 500, "orders": 2500, "lines_per_order": 4},
+}
+
+PASSWORD = "bench-pass-123"
+
+
+class Fixture:
+    """Handles to the seeded rows that route specs need."""
+
+    def __init__(self, buyer, seller, product, cart_item, order, fulfillment):
+        self.buyer = buyer
+        self.seller = seller
+        self.product = product
+        self.cart_item = cart_item
+        self.order = order
+        self.fulfillment = fulfillment
+
+
+# name -> (method, user, args(fixture), data(fixture))
+# ``user`` is "buyer", "seller" or None for an anonymous request.
+ROUTES = {
+    "home": ("get", None, None, None),
+    "product_details": ("get", "buyer", lambda f: [f.product.id], None),
+    "product_search": ("get", None, None, lambda f: {"q": "oak", "in_stock": "1"}),
+    "shopping_cart": ("get", "buyer", None, None),
+    "add_to_cart": ("post", "buyer", None, lambda f: {"product_id": f.product.id, "quantity": 1}),
+    "cart_count": ("get", "buyer", None, None),
+    "update_cart_quantity": ("get", "buyer", lambda f: [f.cart_item.id, "increase"], None),
+    "remove_from_cart": ("get", "buyer", lambda f: [f.cart_item.id], None),
+    "checkout": ("get", "buyer", None, None),
+    "place_order": ("post", "buyer", None, None),
+    "login_register": ("get", None, None, None),
+    "login_user": ("post", None, None, lambda f: {"login-email": f.buyer.email, "login-password": PASSWORD}),
+    "register_user": ("post", None, None, lambda f: {
+        "register-fullname": "Bench New",
+        "register-role": "buyer",
+        "register-email": "bench-new@example.com",
+        "register-password": PASSWORD,
+        "register-confirm-password": PASSWORD,
+    }),
+    "logout_user": ("get", "buyer", None, None),
+    "buyer_profile": ("get", "buyer", None, None),
+    "order_history": ("get", "buyer", None, None),
+    "invoice_page": ("get", "buyer", lambda f: [f.order.order_id], None),
+    "invoice_pdf": ("get", "buyer", lambda f: [f.order.order_id], None),
+    "artisan_dashboard": ("get", "seller", None, None),
+    "create_listing": ("get", "seller", None, None),
+    "edit_listing": ("get", "seller", lambda f: [f.product.id], None),
+    "fulfillment": ("get", "seller", None, None),
+    "fulfillment_queue": ("get", "seller", None, lambda f: {"status": "pending"}),
+    "update_fulfillment": ("post", "seller", lambda f: [f.fulfillment.id], lambda f: {"status": "packed"}),
+    "inventory_manager": ("get", "seller", None, None),
+    "import_products": ("post", "seller", None, lambda f: {"file": SimpleUploadedFile(
+        "products.csv", b"sku,name,price,stock\nBENCH-1,Bench chair,49.00,3\nBENCH-2,Bench table,120.00,1\n"
+    )}),
+    "inventory_low_stock": ("get", "seller", None, None),
+    "reports_page": ("get", "seller", None, None),
+    "sales_export": ("get", "seller", None, lambda f: {"format": "csv"}),
+    "sales_report": ("get", "seller", None, lambda f: {"period": "week", "by_product": "1"}),
+    "profiling_stats": ("get", "seller", None, None),
+}
+
+
+def route_names():
+    """Every named route declared in ``accounts.urls``."""
+    names = set()
+    for pattern in get_resolver().url_patterns:
+        for sub in getattr(pattern, "url_patterns", [pattern]):
+            if isinstance(sub, URLPattern) and sub.name and sub.callback.__module__ == "accounts.views":
+                names.add(sub.name)
+    return names
+
+
+def unbenchmarked_routes():
+    return sorted(route_names() - set(ROUTES))
+
+
+def seed(spec, rng=None):
+    """Populate the database for a volume ``spec`` and return a ``Fixture``."""
+    rng = rng or random.Random(0)
+    if isinstance(spec, str):
+        spec = VOLUMES[spec]
+
+    seller = User.objects.create_user("bench-seller", "seller@bench.test", PASSWORD)
+    UserProfile.objects.create(user=seller, role="artisan")
+    buyer = User.objects.create_user("bench-buyer", "buyer@bench.test", PASSWORD, first_name="Bench")
+    UserProfile.objects.create(user=buyer, role="buyer")
+    others = User.objects.bulk_create(
+        [User(username=f"bench-user-{i}", email=f"user{i}@bench.test") for i in range(spec["buyers"])]
+    )
+
+    products = Product.objects.bulk_create([
+        Product(
+            name=f"{rng.choice(['Oak', 'Ash', 'Elm'])} {rng.choice(['bowl', 'stool', 'tray'])} {i}",
+            price=pricing.to_money(rng.uniform(5, 200)),
+            stock=rng.randint(0, 50) + 10_000,
+            seller=seller,
+        )
+        for i in range(max(spec["products"], spec["cart_lines"]))
+    ])
+
+    CartItem.objects.bulk_create([
+        CartItem(user=buyer, product=product, quantity=rng.randint(1, 3))
+        for product in products[:spec["cart_lines"]]
+    ])
+
+    purchasers = [buyer] + others
+    placed = Order.objects.bulk_create([
+        Order(
+            user=purchasers[i % len(purchasers)],
+            order_id=f"WW-BENCH-{i:06d}",
+            subtotal=0, tax=0, total=0,
+        )
+        for i in range(spec["orders"])
+    ])
+    OrderItem.objects.bulk_create(
+        [
+            OrderItem(order=order, product=product, quantity=1, price=product.price)
+            for order in placed
+            for product in rng.sample(products, min(spec["lines_per_order"], len(products)))
+        ],
+        batch_size=1000,
+    )
+    # One large order for the invoice routes.
+    invoice_order = Order.objects.create(user=buyer, order_id="WW-BENCH-INVOICE", subtotal=0, tax=0, total=0)
+    OrderItem.objects.bulk_create(
+        [
+            OrderItem(order=invoice_order, product=product, quantity=1, price=product.price)
+            for product in products[:max(spec["cart_lines"], 1)]
+        ],
+        batch_size=1000,
+    )
+
+    carts.rebuild()
+    fulfillment.backfill()
+    sales.rebuild()
+    reports.rebuild_daily_sales()
+    search.rebuild_index()
+
+    return Fixture(
+        buyer=buyer,
+        seller=seller,
+        product=products[0],
+        cart_item=CartItem.objects.filter(user=buyer).order_by("id").first(),
+        order=invoice_order,
+        fulfillment=Fulfillment.objects.get(order=invoice_order),
+    )
+
+
+def _request(client, name, fixture):
+    method, _, args, data = ROUTES[name]
+    url = reverse(name, args=args(fixture) if args else None)
+    response = getattr(client, method)(url, data(fixture) if data else {})
+    if response.streaming:
+        for _ in response.streaming_content:
+            pass
+    response.close()
+    return response
+
+
+def measure_route(name, fixture, repeat=5, using=DEFAULT_DB_ALIAS):
+    """Serve route ``name`` ``repeat`` times and return its measurements."""
+    _, user, _, _ = ROUTES[name]
+    client = Client()
+    connection = connections[using]
+
+    def run(trace_memory=False):
+        if user:
+            client.force_login(getattr(fixture, user))
+        with transaction.atomic(using=using):
+            with CaptureQueriesContext(connection) as queries:
+                if trace_memory:
+                    tracemalloc.start()
+                start = time.perf_counter()
+                response = _request(client, name, fixture)
+                elapsed = time.perf_counter() - start
+                peak = tracemalloc.get_traced_memory()[1] if trace_memory else 0
+                if trace_memory:
+                    tracemalloc.stop()
+            transaction.set_rollback(True, using=using)
+        return response.status_code, len(queries), elapsed, peak
+
+    timings, counts = [], []
+    status = None
+    for _ in range(repeat):
+        status, count, elapsed, _ = run()
+        timings.append(elapsed * 1000)
+        counts.append(count)
+    _, _, _, peak = run(trace_memory=True)
+
+    timings.sort()
+    return {
+        "status": status,
+        "queries": max(counts),
+        "p50_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[min(len(timings) - 1, int(round(0.95 * (len(timings) - 1))))], 3),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def run(volumes=("small", "large"), repeat=5, routes=None, using=DEFAULT_DB_ALIAS):
+    """Benchmark ``routes`` (default: all) at each volume and return the report dict.
+
+    ``volumes`` is a sequence of ``VOLUMES`` names or a ``{name: spec}`` dict.
+
+    Each volume is seeded inside its own transaction, which is rolled back
+    once its routes have been measured.
+    """
+    if not isinstance(volumes, dict):
+        volumes = {name: VOLUMES[name] for name in volumes}
+    routes = sorted(routes or ROUTES)
+    report = {"volumes": dict(volumes), "routes": {name: {} for name in routes}}
+    for volume, spec in volumes.items():
+        with transaction.atomic(using=using):
+            for cache in caches.all(initialized_only=False):
+                cache.clear()
+            fixture = seed(spec)
+            for name in routes:
+                report["routes"][name][volume] = measure_route(name, fixture, repeat=repeat, using=using)
+            transaction.set_rollback(True, using=using)
+    report["scaling"] = scaling_routes(report)
+    report["unbenchmarked"] = unbenchmarked_routes()
+    return report
+
+
+def scaling_routes(report, tolerance=0):
+    """Names of routes whose query count grows by more than ``tolerance`` across volumes."""
+    flagged = []
+    for name, by_volume in report["routes"].items():
+        counts = [m["queries"] for m in by_volume.values()]
+        if counts and max(counts) - min(counts) > tolerance:
+            flagged.append(name)
+    return sorted(flagged)
+
+
+class _SessionSQL:
+    """``execute_wrapper`` counting statements against the session table."""
+
+    TABLE = "django_session"
+
+    def __init__(self):
+        self.reads = self.writes = self.locked = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        if self.TABLE not in sql:
+            return execute(sql, params, many, context)
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        except OperationalError as exc:
+            if "locked" in str(exc):
+                self.locked += 1
+            raise
+        finally:
+            self.seconds += time.perf_counter() - start
+            if sql.lstrip()[:6].upper() == "SELECT":
+                self.reads += 1
+            else:
+                self.writes += 1
+
+
+def session_load(engine, users, path="/orders/", requests=200, login_every=0, using=DEFAULT_DB_ALIAS):
+    """Serve ``path`` to every user in ``users`` concurrently under ``SESSION_ENGINE=engine``.
+
+    One thread per user sends ``requests`` GETs; with ``login_every`` it
+    logs in again every that many requests, which writes a new session.
+    The database must be visible to every thread (a file, not in-memory
+    SQLite) and is left as found apart from session rows.
+    """
+    barrier = threading.Barrier(len(users))
+    results = []
+    lock = threading.Lock()
+
+    def worker(user):
+        sql = _SessionSQL()
+        timings, errors = [], 0
+        client = Client()
+        try:
+            with connections[using].execute_wrapper(sql):
+                client.force_login(user)
+                barrier.wait()
+                for i in range(requests):
+                    if login_every and i and i % login_every == 0:
+                        client.force_login(user)
+                    start = time.perf_counter()
+                    try:
+                        if client.get(path).status_code >= 500:
+                            errors += 1
+                    except Exception:
+                        errors += 1
+                    timings.append((time.perf_counter() - start) * 1000)
+        finally:
+            connections.close_all()
+        with lock:
+            results.append((sql, timings, errors))
+
+    with override_settings(SESSION_ENGINE=engine):
+        threads = [threading.Thread(target=worker, args=(user,)) for user in users]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+    timings = sorted(t for _, ts, _ in results for t in ts)
+    total = len(timings) or 1
+    return {
+        "engine": engine,
+        "threads": len(users),
+        "requests": len(timings),
+        "req_per_s": round(len(timings) / elapsed, 1),
+        "p50_ms": round(statistics.median(timings), 2) if timings else None,
+        "p95_ms": round(timings[int(0.95 * (len(timings) - 1))], 2) if timings else None,
+        "session_reads_per_request": round(sum(s.reads for s, _, _ in results) / total, 3),
+        "session_writes_per_request": round(sum(s.writes for s, _, _ in results) / total, 3),
+        "session_sql_ms": round(sum(s.seconds for s, _, _ in results) * 1000, 1),
+        "locked_errors": sum(s.locked for s, _, _ in results),
+        "errors": sum(e for _, _, e in results),
+    }
+
+
+# (weight, method, route, args(product_id), data(product_id)) for ``db_load``.
+LOAD_MIX = (
+    (50, "get", "home", None, None),
+    (20, "get", "product_details", lambda pid: [pid], None),
+    (15, "get", "order_history", None, None),
+    (12, "post", "add_to_cart", None, lambda pid: {"product_id": pid, "quantity": 1}),
+    (3, "post", "place_order", None, None),
+)
+
+
+def _load_thread(user_id, product_ids, deadline, seed, out):
+    rng = random.Random(seed)
+    weights = [w for w, *_ in LOAD_MIX]
+    timings, errors, locked = [], 0, 0
+    client = Client()
+    try:
+        try:
+            client.force_login(User.objects.get(id=user_id))
+        except Exception as exc:
+            out.append(([], 1, int("locked" in str(exc))))
+            return
+        while time.perf_counter() < deadline:
+            _, method, name, args, data = rng.choices(LOAD_MIX, weights)[0]
+            pid = rng.choice(product_ids)
+            url = reverse(name, args=args(pid) if args else None)
+            start = time.perf_counter()
+            try:
+                if getattr(client, method)(url, data(pid) if data else {}).status_code >= 500:
+                    errors += 1
+            except Exception as exc:
+                errors += 1
+                locked += "locked" in str(exc)
+            timings.append((time.perf_counter() - start) * 1000)
+    finally:
+        connections.close_all()
+    out.append((timings, errors, locked))
+
+
+def _load_process(user_ids, product_ids, seconds, configure, queue):
+    configure()
+    out = []
+    deadline = time.perf_counter() + seconds
+    threads = [
+        threading.Thread(target=_load_thread, args=(uid, product_ids, deadline, uid, out))
+        for uid in user_ids
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    queue.put(out)
+
+
+def db_load(user_ids, product_ids, workers=3, threads=4, seconds=5.0, configure=lambda: None):
+    """Run ``LOAD_MIX`` from ``workers`` forked processes of ``threads`` threads each.
+
+    Every thread logs in as its own user from ``user_ids`` (at least
+    ``workers * threads`` of them). ``configure`` runs first in each child,
+    before it opens a connection, to apply the settings profile under test.
+    The default database must be a file and every connection in this
+    process is closed before forking.
+    """
+    connections.close_all()
+    ctx = multiprocessing.get_context("fork")
+    queue = ctx.Queue()
+    procs = [
+        ctx.Process(
+            target=_load_process,
+            args=(user_ids[w * threads:(w + 1) * threads], product_ids, seconds, configure, queue),
+        )
+        for w in range(workers)
+    ]
+    started = time.perf_counter()
+    for proc in procs:
+        proc.start()
+    results = [item for _ in procs for item in queue.get()]
+    for proc in procs:
+        proc.join()
+    elapsed = time.perf_counter() - started
+
+    timings = sorted(t for ts, _, _ in results for t in ts)
+    return {
+        "workers": workers,
+        "threads": threads,
+        "requests": len(timings),
+        "req_per_s": round(len(timings) / elapsed, 1),
+        "p50_ms": round(statistics.median(timings), 2) if timings else None,
+        "p95_ms": round(timings[int(0.95 * (len(timings) - 1))], 2) if timings else None,
+        "p99_ms": round(timings[int(0.99 * (len(timings) - 1))], 2) if timings else None,
+        "errors": sum(e for _, e, _ in results),
+        "locked_errors": sum(lk for _, _, lk in results),
+    }
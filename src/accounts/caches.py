@@ -0,0 +1,335 @@
+"""Cache backends with hit/miss counters.
+
+``settings.CACHES`` defines one alias per kind of data (``default``,
+``sessions``, ``catalog``, ``aggregates``), each with its own backend,
+timeout, key prefix and version. The backends here are thin subclasses that
+count hits and misses:
+
+    * ``SQLiteCache`` keeps entries in a local SQLite file (WAL mode), so
+      every gunicorn worker on the host shares them with no extra service.
+      Counters are shared too. It is the default.
+    * ``RedisCache`` is Django's Redis backend, for when a Redis-compatible
+      server is available (needs the ``redis`` package).
+    * ``LocMemCache`` is Django's per-process cache, used by the test suite.
+
+Counters are buffered in-process and flushed every ``STATS_FLUSH_EVERY``
+lookups (and whenever ``stats()`` is read) to wherever the backend can
+share them. ``cache_stats`` prints them for every alias.
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.locmem import LocMemCache as DjangoLocMemCache
+from django.core.cache.backends.redis import RedisCache as DjangoRedisCache
+
+STATS_FLUSH_EVERY = 100
+
+
+class CacheStatsMixin:
+    """Count hits and misses of ``get``/``get_many``.
+
+    Subclasses that can share counters between processes override
+    ``_flush_stats``, ``_shared_stats`` and ``_reset_stats``.
+    """
+
+    shared_stats = False
+
+    def _init_stats(self):
+        self._stats_lock = threading.Lock()
+        self._stats_local = threading.local()
+        self._pending = [0, 0]
+        self._totals = [0, 0]
+
+    def _count(self, hits, misses):
+        with self._stats_lock:
+            self._pending[0] += hits
+            self._pending[1] += misses
+            flush = self._pending[0] + self._pending[1] >= STATS_FLUSH_EVERY
+        if flush:
+            self.flush_stats()
+
+    def flush_stats(self):
+        with self._stats_lock:
+            hits, misses = self._pending
+            self._pending = [0, 0]
+        if hits or misses:
+            self._flush_stats(hits, misses)
+
+    def _flush_stats(self, hits, misses):
+        with self._stats_lock:
+            self._totals[0] += hits
+            self._totals[1] += misses
+
+    def _shared_stats(self):
+        with self._stats_lock:
+            return tuple(self._totals)
+
+    def _reset_stats(self):
+        with self._stats_lock:
+            self._totals = [0, 0]
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self._pending = [0, 0]
+        self._reset_stats()
+
+    def stats(self):
+        """Return ``{"hits", "misses", "hit_rate", "shared"}`` for this alias."""
+        self.flush_stats()
+        hits, misses = self._shared_stats()
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else None,
+            "shared": self.shared_stats,
+        }
+
+    def get(self, key, default=None, version=None):
+        missing = object()
+        value = super().get(key, missing, version=version)
+        if not getattr(self._stats_local, "batch", False):
+            self._count(int(value is not missing), int(value is missing))
+        return default if value is missing else value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        # BaseCache.get_many calls get() per key; count the batch once.
+        self._stats_local.batch = True
+        try:
+            found = super().get_many(keys, version=version)
+        finally:
+            self._stats_local.batch = False
+        self._count(len(found), len(keys) - len(found))
+        return found
+
+
+class LocMemCache(CacheStatsMixin, DjangoLocMemCache):
+    def __init__(self, name, params):
+        super().__init__(name, params)
+        self._init_stats()
+
+
+class RedisCache(CacheStatsMixin, DjangoRedisCache):
+    shared_stats = True
+
+    def __init__(self, server, params):
+        super().__init__(server, params)
+        self._init_stats()
+
+    def _stats_keys(self):
+        return self.make_key("__stats__:hits"), self.make_key("__stats__:misses")
+
+    def _flush_stats(self, hits, misses):
+        hits_key, misses_key = self._stats_keys()
+        client = self._cache.get_client(hits_key, write=True)
+        with client.pipeline() as pipe:
+            pipe.incrby(hits_key, hits)
+            pipe.incrby(misses_key, misses)
+            pipe.execute()
+
+    def _shared_stats(self):
+        hits_key, misses_key = self._stats_keys()
+        client = self._cache.get_client(hits_key)
+        return tuple(int(v or 0) for v in client.mget([hits_key, misses_key]))
+
+    def _reset_stats(self):
+        hits_key, misses_key = self._stats_keys()
+        self._cache.get_client(hits_key, write=True).delete(hits_key, misses_key)
+
+
+class SQLiteStore(BaseCache):
+    """Cache stored in a standalone SQLite file shared by every local process.
+
+    ``LOCATION`` is the database file. Values are pickled; expiry times are
+    absolute UNIX timestamps (``NULL`` never expires). Every
+    ``CULL_EVERY`` writes, expired rows are purged and, past
+    ``MAX_ENTRIES``, the ``1/CULL_FREQUENCY`` soonest-expiring entries go.
+    """
+
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+    CULL_EVERY = 100
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        self.path = Path(location)
+        self._local = threading.local()
+        self._writes = 0
+
+    def _connection(self):
+        """Per-thread connection, reopened after a fork (gunicorn preload)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS cache_entry (
+                    key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL
+                );
+                CREATE INDEX IF NOT EXISTS cache_entry_expires ON cache_entry (expires);
+                CREATE TABLE IF NOT EXISTS cache_stats (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    hits INTEGER NOT NULL DEFAULT 0,
+                    misses INTEGER NOT NULL DEFAULT 0
+                );
+                INSERT OR IGNORE INTO cache_stats (id) VALUES (1);
+                """
+            )
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _dumps(self, value):
+        return pickle.dumps(value, self.pickle_protocol)
+
+    def _live(self, conn, keys):
+        placeholders = ", ".join("?" * len(keys))
+        rows = conn.execute(
+            f"SELECT key, value FROM cache_entry WHERE key IN ({placeholders}) "
+            f"AND (expires IS NULL OR expires > ?)",
+            [*keys, time.time()],
+        )
+        return {key: pickle.loads(value) for key, value in rows}
+
+    def _write_lock(self, conn):
+        """Transaction holding SQLite's write lock for a read-modify-write."""
+        return _Immediate(conn)
+
+    def _after_write(self, conn, count=1):
+        self._writes += count
+        if self._writes < self.CULL_EVERY:
+            return
+        self._writes = 0
+        conn.execute("DELETE FROM cache_entry WHERE expires <= ?", [time.time()])
+        (entries,) = conn.execute("SELECT COUNT(*) FROM cache_entry").fetchone()
+        if entries > self._max_entries:
+            conn.execute(
+                "DELETE FROM cache_entry WHERE key IN ("
+                "SELECT key FROM cache_entry ORDER BY expires IS NULL, expires LIMIT ?)",
+                [max(1, entries // self._cull_frequency)],
+            )
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return self._live(self._connection(), [key]).get(key, default)
+
+    def get_many(self, keys, version=None):
+        made = {self.make_and_validate_key(key, version=version): key for key in keys}
+        if not made:
+            return {}
+        found = self._live(self._connection(), list(made))
+        return {made[key]: value for key, value in found.items()}
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.set_many({key: value}, timeout, version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        if not data:
+            return []
+        expires = self.get_backend_timeout(timeout)
+        rows = [
+            (self.make_and_validate_key(key, version=version), self._dumps(value), expires)
+            for key, value in data.items()
+        ]
+        conn = self._connection()
+        conn.executemany("INSERT OR REPLACE INTO cache_entry (key, value, expires) VALUES (?, ?, ?)", rows)
+        self._after_write(conn, len(rows))
+        return []
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        conn = self._connection()
+        with self._write_lock(conn):
+            conn.execute("DELETE FROM cache_entry WHERE key = ? AND expires <= ?", [key, time.time()])
+            added = conn.execute(
+                "INSERT OR IGNORE INTO cache_entry (key, value, expires) VALUES (?, ?, ?)",
+                [key, self._dumps(value), self.get_backend_timeout(timeout)],
+            ).rowcount == 1
+        if added:
+            self._after_write(conn)
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return self._connection().execute(
+            "UPDATE cache_entry SET expires = ? WHERE key = ? AND (expires IS NULL OR expires > ?)",
+            [self.get_backend_timeout(timeout), key, time.time()],
+        ).rowcount == 1
+
+    def incr(self, key, delta=1, version=None):
+        """Atomic across processes: the read-modify-write holds the write lock."""
+        made = self.make_and_validate_key(key, version=version)
+        conn = self._connection()
+        with self._write_lock(conn):
+            found = self._live(conn, [made])
+            if made not in found:
+                raise ValueError(f"Key '{key}' not found")
+            value = found[made] + delta
+            conn.execute("UPDATE cache_entry SET value = ? WHERE key = ?", [self._dumps(value), made])
+        return value
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return self._connection().execute("DELETE FROM cache_entry WHERE key = ?", [key]).rowcount == 1
+
+    def delete_many(self, keys, version=None):
+        keys = [self.make_and_validate_key(key, version=version) for key in keys]
+        if keys:
+            placeholders = ", ".join("?" * len(keys))
+            self._connection().execute(f"DELETE FROM cache_entry WHERE key IN ({placeholders})", keys)
+
+    def has_key(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return bool(self._live(self._connection(), [key]))
+
+    def clear(self):
+        self._connection().execute("DELETE FROM cache_entry")
+
+    def entry_count(self):
+        (count,) = self._connection().execute(
+            "SELECT COUNT(*) FROM cache_entry WHERE expires IS NULL OR expires > ?", [time.time()]
+        ).fetchone()
+        return count
+
+
+class _Immediate:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+
+
+class SQLiteCache(CacheStatsMixin, SQLiteStore):
+    """``SQLiteStore`` whose counters live in the same file, shared by all workers."""
+
+    shared_stats = True
+
+    def __init__(self, location, params):
+        super().__init__(location, params)
+        self._init_stats()
+
+    def close(self, **kwargs):
+        # The connection is kept across requests; only flush the counters.
+        self.flush_stats()
+
+    def _flush_stats(self, hits, misses):
+        self._connection().execute(
+            "UPDATE cache_stats SET hits = hits + ?, misses = misses + ? WHERE id = 1", [hits, misses]
+        )
+
+    def _shared_stats(self):
+        return self._connection().execute("SELECT hits, misses FROM cache_stats WHERE id = 1").fetchone()
+
+    def _reset_stats(self):
+        self._connection().execute("UPDATE cache_stats SET hits = 0, misses = 0 WHERE id = 1")
@@ -0,0 +1,138 @@
+"""Cart mutations that keep ``CartSummary`` in step.
+
+Every change to a user's ``CartItem`` rows goes through this module, which
+applies the matching delta to the user's summary row with an F-expression
+UPDATE. Badges and checkout totals then read a single row instead of
+walking the cart. ``asummary_for`` and ``aline_count`` are the async ORM
+versions used by the async cart views.
+"""
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from . import pricing
+from .models import CartItem, CartSummary
+
+
+def summary_for(user):
+    """Return the user's cart summary, or an unsaved empty one."""
+    if not user.is_authenticated:
+        return CartSummary()
+    return CartSummary.objects.filter(user=user).first() or CartSummary(user=user)
+
+
+async def asummary_for(user):
+    if not user.is_authenticated:
+        return CartSummary()
+    return await CartSummary.objects.filter(user=user).afirst() or CartSummary(user=user)
+
+
+async def aline_count(user):
+    """Badge count: the number of lines in the cart."""
+    if not user.is_authenticated:
+        return 0
+    return await CartSummary.objects.filter(user=user).values_list("line_count", flat=True).afirst() or 0
+
+
+def _changes(lines, items, amount):
+    return dict(
+        line_count=F("line_count") + lines,
+        item_count=F("item_count") + items,
+        subtotal=F("subtotal") + amount,
+    )
+
+
+def _apply(user_id, lines=0, items=0, amount=pricing.ZERO):
+    changes = _changes(lines, items, amount)
+    if not CartSummary.objects.filter(user_id=user_id).update(**changes):
+        CartSummary.objects.bulk_create([CartSummary(user_id=user_id)], ignore_conflicts=True)
+        CartSummary.objects.filter(user_id=user_id).update(**changes)
+
+
+def add_item(user, product, quantity=1):
+    """Add ``quantity`` of ``product`` to the cart and return the line."""
+    item, created = CartItem.objects.get_or_create(
+        user=user,
+        product=product,
+        defaults={"quantity": quantity},
+    )
+    if not created:
+        CartItem.objects.filter(id=item.id).update(quantity=F("quantity") + quantity)
+        item.quantity += quantity
+    _apply(user.id, lines=int(created), items=quantity, amount=product.price * quantity)
+    return item
+
+
+def set_quantity(item, quantity):
+    """Change a line's quantity; ``item.product`` is used for pricing."""
+    delta = quantity - item.quantity
+    if not delta:
+        return
+    item.quantity = quantity
+    item.save(update_fields=["quantity"])
+    _apply(item.user_id, items=delta, amount=item.product.price * delta)
+
+
+def remove_item(item):
+    """Delete a cart line; ``item.product`` is used for pricing."""
+    item.delete()
+    _apply(item.user_id, lines=-1, items=-item.quantity, amount=-item.product.price * item.quantity)
+
+
+def clear(user):
+    """Zero the summary after the cart lines themselves were deleted."""
+    CartSummary.objects.filter(user=user).update(line_count=0, item_count=0, subtotal=0)
+
+
+def _subtotal_subquery():
+    return Coalesce(
+        Subquery(
+            CartItem.objects.filter(user_id=OuterRef("user_id"))
+            .order_by()
+            .values("user_id")
+            .annotate(total=Sum(pricing.line_total("product__price")))
+            .values("total")
+        ),
+        Value(pricing.ZERO),
+        output_field=pricing.MONEY,
+    )
+
+
+def reprice_product(product):
+    """Recompute subtotals of every cart holding ``product`` in one UPDATE."""
+    reprice_products([product.id])
+
+
+def reprice_products(product_ids):
+    """``reprice_product`` for many products, still one UPDATE."""
+    CartSummary.objects.filter(
+        user__cartitem__product_id__in=product_ids
+    ).update(subtotal=_subtotal_subquery())
+
+
+def rebuild(users=None):
+    """Recompute summaries from ``CartItem``; every cart when ``users`` is None."""
+    lines = CartItem.objects.all()
+    if users is not None:
+        lines = lines.filter(user__in=users)
+    totals = (
+        lines.values("user_id")
+        .annotate(
+            lines=Count("id"),
+            items=Sum("quantity"),
+            subtotal=pricing.sum_line_totals("product__price"),
+        )
+        .order_by()
+    )
+    rows = [
+        CartSummary(user_id=row["user_id"], line_count=row["lines"],
+                    item_count=row["items"], subtotal=row["subtotal"])
+        for row in totals
+    ]
+    with transaction.atomic():
+        stale = CartSummary.objects.all()
+        if users is not None:
+            stale = stale.filter(user__in=users)
+        stale.delete()
+        CartSummary.objects.bulk_create(rows, batch_size=500)
+    return len(rows)
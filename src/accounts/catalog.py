@@ -0,0 +1,92 @@
+"""Cached product fragments for the home page and product details.
+
+Rendered product cards and detail panels are stored in the ``catalog``
+cache under keys versioned on ``Product.updated_at``. Saving a product
+bumps its ``updated_at``, so only that product's fragments miss on the next
+request; everything else keeps being served from the cache. Entries live
+for the alias's ``TIMEOUT``.
+
+``ahome_cards`` and ``adetail_panel`` are the same lookups on the async ORM
+and cache API, for the async views.
+"""
+from django.core.cache import caches
+from django.template.loader import render_to_string
+
+from .models import Product
+
+HOME_PAGE_SIZE = 24
+CACHE_ALIAS = "catalog"
+
+
+def fragment_key(kind, product_id, updated_at):
+    return f"catalog:{kind}:{product_id}:{updated_at.timestamp():.6f}"
+
+
+def _missing_products(keys, found):
+    missing = [pid for pid, key in keys.items() if key not in found]
+    return Product.objects.select_related("seller").filter(id__in=missing) if missing else None
+
+
+def _render(kind, template_name, product):
+    return fragment_key(kind, product.id, product.updated_at), render_to_string(template_name, {"product": product})
+
+
+def _render_fragments(kind, template_name, versions):
+    """Return rendered fragments for ``versions`` (``[(id, updated_at), ...]``) in order.
+
+    Hits come from one ``get_many``; misses are loaded in one query and
+    written back with one ``set_many``.
+    """
+    cache = caches[CACHE_ALIAS]
+    keys = {pid: fragment_key(kind, pid, ts) for pid, ts in versions}
+    found = cache.get_many(keys.values())
+
+    missing = _missing_products(keys, found)
+    if missing is not None:
+        rendered = dict(_render(kind, template_name, product) for product in missing)
+        cache.set_many(rendered)
+        found.update(rendered)
+
+    return [found[key] for key in keys.values() if key in found]
+
+
+async def _arender_fragments(kind, template_name, versions):
+    cache = caches[CACHE_ALIAS]
+    keys = {pid: fragment_key(kind, pid, ts) for pid, ts in versions}
+    found = await cache.aget_many(keys.values())
+
+    missing = _missing_products(keys, found)
+    if missing is not None:
+        rendered = dict([_render(kind, template_name, product) async for product in missing.aiterator()])
+        await cache.aset_many(rendered)
+        found.update(rendered)
+
+    return [found[key] for key in keys.values() if key in found]
+
+
+def home_cards(limit=HOME_PAGE_SIZE):
+    """Rendered cards for the newest listings."""
+    versions = Product.objects.order_by("-id").values_list("id", "updated_at")[:limit]
+    return _render_fragments("card", "ProductCard.html", list(versions))
+
+
+def detail_panel(product_id):
+    """Rendered detail panel for one product, or ``None`` if it does not exist."""
+    version = Product.objects.filter(id=product_id).values_list("id", "updated_at").first()
+    if version is None:
+        return None
+    fragments = _render_fragments("detail", "ProductDetailPanel.html", [version])
+    return fragments[0] if fragments else None
+
+
+async def ahome_cards(limit=HOME_PAGE_SIZE):
+    versions = Product.objects.order_by("-id").values_list("id", "updated_at")[:limit]
+    return await _arender_fragments("card", "ProductCard.html", [v async for v in versions])
+
+
+async def adetail_panel(product_id):
+    version = await Product.objects.filter(id=product_id).values_list("id", "updated_at").afirst()
+    if version is None:
+        return None
+    fragments = await _arender_fragments("detail", "ProductDetailPanel.html", [version])
+    return fragments[0] if fragments else None
@@ -0,0 +1,8 @@
+from django.utils.functional import SimpleLazyObject
+
+from . import carts
+
+
+def cart(request):
+    """Expose the user's cart summary as ``cart``; queried only if a template uses it."""
+    return {"cart": SimpleLazyObject(lambda: carts.summary_for(request.user))}
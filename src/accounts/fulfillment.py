@@ -0,0 +1,157 @@
+"""Per-seller fulfillment of orders.
+
+``place_order`` splits each new ``Order`` into one ``Fulfillment`` per
+seller in its lines (``split_order``, one bulk insert), carrying that
+seller's line count, units and subtotal. A seller's queue is then read
+from ``fulfillment_queue_idx`` on ``(seller, status, created_at, id)``: one
+status at a time, oldest first, keyset-paged like order history. Deep
+pages cost the same as the first: one query for the fulfillments with
+their orders and one for the seller's lines in them.
+
+Status moves forward only (``TRANSITIONS``). ``set_status`` applies a move
+with one conditional UPDATE, so two packers racing on the same
+fulfillment cannot both ship it.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db.models import Count, Prefetch, Q, Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import pricing
+from .models import Fulfillment, OrderItem
+from .pagination import InvalidCursor, decode_cursor, encode_cursor
+
+QUEUE_PAGE_SIZE = 25
+MAX_QUEUE_PAGE_SIZE = 100
+
+# status -> statuses it may move to
+TRANSITIONS = {
+    Fulfillment.PENDING: {Fulfillment.PACKED, Fulfillment.SHIPPED, Fulfillment.CANCELLED},
+    Fulfillment.PACKED: {Fulfillment.SHIPPED, Fulfillment.CANCELLED},
+    Fulfillment.SHIPPED: {Fulfillment.DELIVERED},
+    Fulfillment.DELIVERED: set(),
+    Fulfillment.CANCELLED: set(),
+}
+
+
+def split_order(order, items):
+    """Create one pending fulfillment per seller for a freshly placed order.
+
+    ``items`` must have ``product`` loaded.
+    """
+    lines, units, subtotal = defaultdict(int), defaultdict(int), defaultdict(Decimal)
+    for item in items:
+        seller_id = item.product.seller_id
+        lines[seller_id] += 1
+        units[seller_id] += item.quantity
+        subtotal[seller_id] += pricing.to_money(item.price) * item.quantity
+    return Fulfillment.objects.bulk_create([
+        Fulfillment(
+            order=order,
+            seller_id=seller_id,
+            item_count=lines[seller_id],
+            units=units[seller_id],
+            subtotal=subtotal[seller_id],
+            created_at=order.created_at,
+        )
+        for seller_id in lines
+    ])
+
+
+def backfill(order_ids=None):
+    """Split orders that have no fulfillments yet (e.g. bulk-loaded ones); return how many were created."""
+    items = OrderItem.objects.filter(order__fulfillment__isnull=True)
+    if order_ids is not None:
+        items = items.filter(order_id__in=order_ids)
+    totals = (
+        items.values("order_id", "product__seller_id", "order__created_at")
+        .annotate(lines=Count("id"), units=Sum("quantity"), subtotal=pricing.sum_line_totals())
+        .order_by()
+    )
+    created = Fulfillment.objects.bulk_create(
+        [
+            Fulfillment(
+                order_id=row["order_id"],
+                seller_id=row["product__seller_id"],
+                item_count=row["lines"],
+                units=row["units"],
+                subtotal=row["subtotal"],
+                created_at=row["order__created_at"],
+            )
+            for row in totals
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+    return len(created)
+
+
+def queue(seller, status=Fulfillment.PENDING, cursor=None, limit=QUEUE_PAGE_SIZE):
+    """Return ``(fulfillments, next_cursor)`` for one page of ``seller``'s queue, oldest first.
+
+    Each fulfillment has ``order`` (with ``user``) loaded and
+    ``seller_items``, the order's lines for this seller.
+    """
+    if status not in TRANSITIONS:
+        raise ValueError(status)
+    limit = max(1, min(int(limit), MAX_QUEUE_PAGE_SIZE))
+    qs = Fulfillment.objects.filter(seller=seller, status=status)
+    if cursor:
+        created_at, pk = decode_cursor(cursor, 2)
+        created_at = parse_datetime(created_at) if isinstance(created_at, str) else None
+        if created_at is None or not isinstance(pk, int):
+            raise InvalidCursor(cursor)
+        qs = qs.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk))
+
+    page = list(
+        qs.order_by("created_at", "id")
+        .select_related("order__user")
+        .prefetch_related(Prefetch(
+            "order__orderitem_set",
+            queryset=OrderItem.objects.filter(product__seller=seller).select_related("product").order_by("id"),
+            to_attr="seller_items",
+        ))[:limit + 1]
+    )
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        last = page[-1]
+        next_cursor = encode_cursor(last.created_at.isoformat(), last.id)
+    return page, next_cursor
+
+
+def serialize(fulfillment):
+    """JSON-ready queue entry; amounts are numbers like ``orders.serialize_order``."""
+    order = fulfillment.order
+    return {
+        "id": fulfillment.id,
+        "order_id": order.order_id,
+        "status": fulfillment.status,
+        "created_at": fulfillment.created_at.isoformat(),
+        "buyer": order.user_name or order.user.username,
+        "shipping_address": order.shipping_address,
+        "item_count": fulfillment.item_count,
+        "units": fulfillment.units,
+        "subtotal": float(fulfillment.subtotal),
+        "items": [
+            {
+                "product_id": item.product_id,
+                "name": item.product.name,
+                "sku": item.product.sku,
+                "quantity": item.quantity,
+                "price": float(item.price),
+            }
+            for item in order.seller_items
+        ],
+    }
+
+
+def set_status(seller, fulfillment_id, status):
+    """Move one of ``seller``'s fulfillments to ``status``; False if it may not move there."""
+    allowed_from = [current for current, targets in TRANSITIONS.items() if status in targets]
+    return bool(
+        Fulfillment.objects.filter(id=fulfillment_id, seller=seller, status__in=allowed_from)
+        .update(status=status, updated_at=timezone.now())
+    )
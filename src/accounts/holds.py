@@ -0,0 +1,164 @@
+"""Time-limited stock holds for buyers' carts.
+
+Adding a product to the cart, changing a line and opening checkout set the
+buyer's hold on each product to the quantity in their cart, valid for
+``settings.STOCK_HOLD_SECONDS``. A product's availability is its ``stock``
+minus the unexpired holds of every buyer, read in one query over
+``stockhold_product_expiry_idx``. A hold is granted only when what other
+buyers hold leaves enough. ``place_order`` reserves stock against the same
+rule and then drops the buyer's holds it consumed. Removing a cart line
+drops its hold in the same transaction.
+
+Arbitration happens in the database. ``hold`` locks the product rows it
+checks (``lock_products``; on SQLite the IMMEDIATE transaction already
+serialises writers), so two buyers cannot both be granted the last unit.
+The lock is its own statement, taken before other buyers' holds are read:
+under READ COMMITTED a statement that waited on a row lock still reads
+the rest of the database as it was when the statement started. An expired hold no longer counts, whether or not it has been
+deleted; ``sweep_holds`` only clears them out.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from . import carts
+from .models import CartItem, Product, StockHold
+
+SWEEP_BATCH_SIZE = 1000
+
+
+def hold_seconds():
+    return getattr(settings, "STOCK_HOLD_SECONDS", 600)
+
+
+def held_by_others(user_id, now=None):
+    """Expression: units of the outer ``Product`` held by buyers other than ``user_id``."""
+    active = StockHold.objects.filter(product_id=OuterRef("pk"), expires_at__gt=now or timezone.now())
+    if user_id is not None:
+        active = active.exclude(user_id=user_id)
+    return Coalesce(
+        Subquery(active.order_by().values("product_id").annotate(n=Sum("quantity")).values("n")),
+        Value(0),
+        output_field=IntegerField(),
+    )
+
+
+def available(product_ids, user=None):
+    """``{product_id: units available}``, not counting ``user``'s own holds."""
+    rows = Product.objects.filter(id__in=product_ids).annotate(held=held_by_others(user and user.id))
+    return {pid: max(0, stock - held) for pid, stock, held in rows.values_list("id", "stock", "held")}
+
+
+def lock_products(product_ids):
+    """Lock the given product rows until the surrounding transaction ends.
+
+    Rows are locked in id order so buyers locking overlapping products
+    cannot deadlock.
+    """
+    list(Product.objects.select_for_update().filter(id__in=product_ids).order_by("id").values_list("id", flat=True))
+
+
+def hold(user, quantities):
+    """Set ``user``'s holds to ``{product_id: quantity}`` and restart their expiry.
+
+    Products without enough units left are not held; returns them as
+    ``{product_id: units available}`` (empty when everything was held).
+    """
+    now = timezone.now()
+    short, granted = {}, []
+    with transaction.atomic():
+        lock_products(quantities)
+        rows = (
+            Product.objects.filter(id__in=quantities)
+            .annotate(held=held_by_others(user.id, now))
+            .values_list("id", "stock", "held")
+        )
+        for pid, stock, held in rows:
+            if stock - held >= quantities[pid]:
+                granted.append(StockHold(
+                    user=user, product_id=pid, quantity=quantities[pid],
+                    expires_at=now + timedelta(seconds=hold_seconds()),
+                ))
+            else:
+                short[pid] = max(0, stock - held)
+        StockHold.objects.bulk_create(
+            granted,
+            update_conflicts=True,
+            unique_fields=["user", "product"],
+            update_fields=["quantity", "expires_at"],
+        )
+    return short
+
+
+def add_to_cart(user, product, quantity=1):
+    """Hold ``quantity`` more of ``product`` for ``user`` and add it to their cart.
+
+    The hold and the cart write share one transaction. The product row is
+    locked here, before the cart line is read, rather than only in
+    ``hold``: otherwise two concurrent adds by the same buyer could read the
+    same line quantity and each hold one add short. Returns ``(item, short)``:
+    ``item`` is None and ``short`` is as for ``hold`` when stock ran out.
+    """
+    with transaction.atomic():
+        lock_products([product.id])
+        in_cart = CartItem.objects.filter(user=user, product=product).values_list("quantity", flat=True).first()
+        short = hold(user, {product.id: (in_cart or 0) + quantity})
+        if short:
+            return None, short
+        return carts.add_item(user, product, quantity), {}
+
+
+def set_line_quantity(user, item, quantity):
+    """Change ``user``'s cart line to ``quantity`` along with its hold; returns ``short`` as for ``hold``.
+
+    Growing the line needs the extra units to be available. Shrinking
+    always succeeds and frees the units for other buyers at once.
+    """
+    with transaction.atomic():
+        if quantity > item.quantity:
+            short = hold(user, {item.product_id: quantity})
+            if short:
+                return short
+        else:
+            StockHold.objects.filter(user=user, product_id=item.product_id).update(quantity=quantity)
+        carts.set_quantity(item, quantity)
+    return {}
+
+
+def remove_line(user, item):
+    """Remove ``user``'s cart line and release its hold together."""
+    with transaction.atomic():
+        carts.remove_item(item)
+        release(user, [item.product_id])
+
+
+def hold_cart(user):
+    """Hold every line of ``user``'s cart; returns the short products as ``hold`` does."""
+    quantities = dict(
+        CartItem.objects.filter(user=user).values("product_id")
+        .annotate(n=Sum("quantity")).order_by().values_list("product_id", "n")
+    )
+    return hold(user, quantities) if quantities else {}
+
+
+def release(user, product_ids=None):
+    """Drop ``user``'s holds, on ``product_ids`` only if given."""
+    holds = StockHold.objects.filter(user=user)
+    if product_ids is not None:
+        holds = holds.filter(product_id__in=product_ids)
+    holds.delete()
+
+
+def sweep(batch_size=SWEEP_BATCH_SIZE):
+    """Delete expired holds in batches; return how many."""
+    now = timezone.now()
+    removed = 0
+    while True:
+        ids = list(StockHold.objects.filter(expires_at__lte=now).values_list("id", flat=True)[:batch_size])
+        if not ids:
+            return removed
+        removed += StockHold.objects.filter(id__in=ids).delete()[0]
@@ -0,0 +1,63 @@
+"""Low-stock alerting for sellers.
+
+Each product has its own ``reorder_threshold`` and counts as low while
+``stock`` is below it (``sales.LOW_STOCK``; a threshold of 0 never
+alerts). The partial index ``product_low_stock_idx`` holds only those
+rows. The database keeps it current through every kind of stock change:
+saves, the order engine's conditional UPDATE and bulk imports. So a
+seller's at-risk products are one indexed query (``low_stock``) rather
+than a filter over the seller's whole catalog.
+
+``SellerSalesSummary.low_stock_count`` caches the per-seller count for the
+dashboard, including sellers with no sales yet. It is refreshed where
+stock changes (``sales``) and, for every seller at once, by
+``store_counts``. ``digests`` is one pass over the index in seller order,
+so the ``low_stock_digest`` command batches alerts for all sellers without
+a query per seller.
+"""
+import itertools
+
+from . import sales
+from .models import Product
+
+DIGEST_CHUNK_SIZE = 2000
+
+LOW_STOCK_FIELDS = ("id", "seller_id", "name", "sku", "stock", "reorder_threshold")
+
+
+def low_stock(seller):
+    """The seller's low-stock products, most urgent (least stock) first."""
+    return Product.objects.filter(sales.LOW_STOCK, seller=seller).order_by("stock", "id")
+
+
+def serialize(row):
+    """JSON-ready alert for a ``LOW_STOCK_FIELDS`` values row."""
+    return {
+        "product_id": row["id"],
+        "name": row["name"],
+        "sku": row["sku"],
+        "stock": row["stock"],
+        "reorder_threshold": row["reorder_threshold"],
+        "shortfall": row["reorder_threshold"] - row["stock"],
+    }
+
+
+def low_stock_rows(seller):
+    return [serialize(row) for row in low_stock(seller).values(*LOW_STOCK_FIELDS)]
+
+
+def digests(chunk_size=DIGEST_CHUNK_SIZE):
+    """Yield ``(seller_id, alerts)`` for every seller with low stock, in one query."""
+    rows = (
+        Product.objects.filter(sales.LOW_STOCK)
+        .order_by("seller_id", "stock", "id")
+        .values(*LOW_STOCK_FIELDS)
+        .iterator(chunk_size=chunk_size)
+    )
+    for seller_id, group in itertools.groupby(rows, key=lambda row: row["seller_id"]):
+        yield seller_id, [serialize(row) for row in group]
+
+
+def store_counts():
+    """Recount every seller's low stock, creating summaries where missing."""
+    return sales.refresh_low_stock()
@@ -0,0 +1,146 @@
+"""Server-side PDF invoices.
+
+Invoices are rendered with a small built-in PDF writer (standard Courier,
+no external dependencies) and cached on disk under ``INVOICE_CACHE_DIR`` as
+``<order_id>-<content hash>.pdf``. The hash covers everything printed on
+the invoice, so a repeat download is served straight from the file and any
+change to the order produces a fresh render.
+"""
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+
+from .models import OrderItem
+
+# Bump when the layout changes so cached files are re-rendered.
+RENDERER_VERSION = "1"
+
+PAGE_WIDTH = 612   # US Letter, points
+PAGE_HEIGHT = 792
+MARGIN = 56
+LINE_HEIGHT = 16
+LINES_PER_PAGE = (PAGE_HEIGHT - 2 * MARGIN) // LINE_HEIGHT
+
+
+def cache_dir():
+    return Path(getattr(settings, "INVOICE_CACHE_DIR", Path(settings.BASE_DIR) / "invoice_cache"))
+
+
+def invoice_data(order):
+    """Collect everything printed on the invoice in one ``OrderItem`` query.
+
+    ``order.user`` should already be loaded (``select_related("user")``).
+    """
+    items = OrderItem.objects.filter(order=order).select_related("product").order_by("id")
+    lines = []
+    for it in items:
+        lines.append({
+            "name": it.product.name,
+            "quantity": it.quantity,
+            "price": f"{it.price:.2f}",
+            "amount": f"{it.price * it.quantity:.2f}",
+        })
+    return {
+        "order_id": order.order_id,
+        "created_at": order.created_at.strftime("%Y-%m-%d"),
+        "user_name": f"{order.user.first_name} {order.user.last_name}".strip(),
+        "shipping_address": order.shipping_address or "Default Address",
+        "items": lines,
+        "subtotal": f"{order.subtotal:.2f}",
+        "tax": f"{order.tax:.2f}",
+        "total": f"{order.total:.2f}",
+    }
+
+
+def content_hash(data):
+    payload = json.dumps(data, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(f"{RENDERER_VERSION}:{payload}".encode()).hexdigest()[:16]
+
+
+def _text_lines(data):
+    yield "Woodman's World"
+    yield f"Invoice #{data['order_id']}"
+    yield f"Date: {data['created_at']}"
+    yield f"Bill to: {data['user_name'] or 'Customer'}"
+    yield f"Ship to: {data['shipping_address']}"
+    yield ""
+    yield f"{'Item':<40}{'Qty':>6}{'Price':>12}{'Amount':>12}"
+    for line in data["items"]:
+        yield f"{line['name'][:40]:<40}{line['quantity']:>6}{line['price']:>12}{line['amount']:>12}"
+    yield ""
+    yield f"{'Subtotal':<58}{data['subtotal']:>12}"
+    yield f"{'Tax':<58}{data['tax']:>12}"
+    yield f"{'Total':<58}{data['total']:>12}"
+
+
+def _escape(text):
+    return (
+        text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+        .encode("latin-1", "replace")
+    )
+
+
+def _page_stream(lines):
+    out = [b"BT /F1 10 Tf", b"%d TL" % LINE_HEIGHT, b"%d %d Td" % (MARGIN, PAGE_HEIGHT - MARGIN)]
+    for line in lines:
+        out.append(b"(" + _escape(line) + b") Tj T*")
+    out.append(b"ET")
+    return b"\n".join(out)
+
+
+def render_pdf(data):
+    """Return the invoice as PDF bytes."""
+    lines = list(_text_lines(data))
+    pages = [lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)]
+
+    # Object numbers: 1 catalog, 2 page tree, 3 font, then (page, content) pairs.
+    page_ids = [4 + 2 * i for i in range(len(pages))]
+    objects = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        2: b"<< /Type /Pages /Kids [%s] /Count %d >>"
+        % (b" ".join(b"%d 0 R" % pid for pid in page_ids), len(pages)),
+        3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Courier /Encoding /WinAnsiEncoding >>",
+    }
+    for pid, page_lines in zip(page_ids, pages):
+        stream = _page_stream(page_lines)
+        objects[pid] = (
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>"
+            % (PAGE_WIDTH, PAGE_HEIGHT, pid + 1)
+        )
+        objects[pid + 1] = b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for num in sorted(objects):
+        offsets[num] = len(out)
+        out += b"%d 0 obj\n%s\nendobj\n" % (num, objects[num])
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for num in sorted(objects):
+        out += b"%010d 00000 n \n" % offsets[num]
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def invoice_pdf_path(order):
+    """Return the cached PDF for ``order``, rendering it on a cache miss."""
+    data = invoice_data(order)
+    directory = cache_dir()
+    path = directory / f"{order.order_id}-{content_hash(data)}.pdf"
+    if path.exists():
+        return path
+
+    directory.mkdir(parents=True, exist_ok=True)
+    for stale in directory.glob(f"{order.order_id}-*.pdf"):
+        stale.unlink(missing_ok=True)
+
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "wb") as fh:
+        fh.write(render_pdf(data))
+    os.replace(tmp, path)
+    return path
@@ -0,0 +1,42 @@
+import time
+
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.management.base import BaseCommand
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from accounts.middleware import LoginRequiredMiddleware
+
+PATHS = (
+    "/",                    # exact
+    "/static/css/site.css", # prefix
+    "/login/",              # exact
+    "/profile/",            # resolved, protected
+    "/product/42/",         # resolved, protected
+)
+
+
+class Command(BaseCommand):
+    help = "Measure per-request overhead of LoginRequiredMiddleware."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20000)
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+        factory = RequestFactory()
+        ok = HttpResponse("OK")
+        middleware = LoginRequiredMiddleware(lambda request: ok)
+        users = (("anonymous", AnonymousUser()), ("authenticated", User(username="bench")))
+
+        self.stdout.write(f"{'path':<24}{'user':<16}{'us/request':>12}")
+        for path in PATHS:
+            request = factory.get(path)
+            for label, user in users:
+                request.user = user
+                middleware(request)  # warm the matcher cache
+                start = time.perf_counter()
+                for _ in range(iterations):
+                    middleware(request)
+                elapsed = time.perf_counter() - start
+                self.stdout.write(f"{path:<24}{label:<16}{elapsed / iterations * 1e6:>12.2f}")
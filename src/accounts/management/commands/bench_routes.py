@@ -0,0 +1,70 @@
+import json
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+
+from accounts import benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark every accounts route (query count, p50/p95 latency, peak memory) "
+        "at several data volumes in a throwaway test database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--volumes",
+            default="small,large",
+            help=f"Comma-separated volumes from: {', '.join(benchmarks.VOLUMES)}.",
+        )
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--route", action="append", dest="routes", help="Only this route (repeatable).")
+        parser.add_argument("--output", help="Write the JSON report to this file.")
+
+    def handle(self, *args, **options):
+        volumes = [v.strip() for v in options["volumes"].split(",") if v.strip()]
+        unknown = [v for v in volumes if v not in benchmarks.VOLUMES]
+        if unknown:
+            raise CommandError(f"Unknown volume(s): {', '.join(unknown)}")
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            # Per-process caches, so the run neither reads nor clears the shared ones.
+            local_caches = {
+                alias: {**config, "BACKEND": "accounts.caches.LocMemCache", "LOCATION": f"bench-{alias}"}
+                for alias, config in settings.CACHES.items()
+            }
+            with tempfile.TemporaryDirectory() as invoice_dir, override_settings(
+                CACHES=local_caches,
+                INVOICE_CACHE_DIR=invoice_dir,
+                PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+            ):
+                report = benchmarks.run(volumes, repeat=options["repeat"], routes=options["routes"])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        self._print(report, volumes)
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                json.dump(report, fh, indent=2, sort_keys=True)
+
+        if report["unbenchmarked"]:
+            self.stderr.write(f"Routes without a benchmark spec: {', '.join(report['unbenchmarked'])}")
+        if report["scaling"]:
+            raise CommandError(f"Query count scales with data volume: {', '.join(report['scaling'])}")
+
+    def _print(self, report, volumes):
+        header = f"{'route':<22}" + "".join(f"{v + ' q/p50/p95/KiB':>34}" for v in volumes)
+        self.stdout.write(header)
+        for name, by_volume in sorted(report["routes"].items()):
+            cells = []
+            for volume in volumes:
+                m = by_volume[volume]
+                cells.append(f"{m['queries']:>6}{m['p50_ms']:>9.1f}{m['p95_ms']:>9.1f}{m['peak_kib']:>10.0f}")
+            self.stdout.write(f"{name:<22}" + "".join(f"{c:>34}" for c in cells))
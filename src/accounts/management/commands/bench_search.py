@@ -0,0 +1,78 @@
+import random
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from accounts import search
+from accounts.models import Product
+
+WORDS = (
+    "oak walnut maple cedar teak birch pine ash cherry bamboo "
+    "bowl spoon chair stool table tray box frame shelf board "
+    "carved turned rustic polished handmade small large round square vintage"
+).split()
+
+QUERIES = ("oak bowl", "walnut", "carv", "rustic table", "bamboo tray small", "ch")
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed synthetic products inside a rolled-back transaction and compare "
+        "full-text search against an icontains scan."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--products", type=int, default=100_000)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        if not search.fts_available():
+            self.stderr.write("Full-text search benchmark requires SQLite.")
+            return
+
+        rng = random.Random(0)
+        with transaction.atomic():
+            seller = User.objects.create_user(username="bench-search-seller")
+            start = time.perf_counter()
+            Product.objects.bulk_create(
+                (
+                    Product(
+                        name=" ".join(rng.sample(WORDS, 3)),
+                        price=round(rng.uniform(5, 500), 2),
+                        stock=rng.randint(0, 20),
+                        seller=seller,
+                    )
+                    for _ in range(options["products"])
+                ),
+                batch_size=2000,
+            )
+            search.rebuild_index()
+            self.stdout.write(
+                f"Seeded and indexed {options['products']} products in {time.perf_counter() - start:.1f}s"
+            )
+
+            self.stdout.write(f"{'query':<22}{'fts ms':>10}{'scan ms':>10}{'hits':>8}")
+            for query in QUERIES:
+                fts = self._time(options["repeat"], lambda: search.search_products(query, in_stock=True))
+                scan = self._time(options["repeat"], lambda: self._scan(query))
+                hits = len(search.search_products(query, limit=search.MAX_LIMIT)[0])
+                self.stdout.write(f"{query:<22}{fts:>10.2f}{scan:>10.2f}{hits:>8}")
+
+            transaction.set_rollback(True)
+
+    @staticmethod
+    def _scan(query):
+        # Ranking needs every match, so the scan baseline collects them all.
+        qs = Product.objects.filter(stock__gt=0)
+        for term in query.split():
+            qs = qs.filter(name__icontains=term)
+        return list(qs.values_list("id", flat=True))
+
+    @staticmethod
+    def _time(repeat, fn):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        return (time.perf_counter() - start) / repeat * 1000
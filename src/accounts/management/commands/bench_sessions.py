@@ -0,0 +1,84 @@
+import json
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+
+from accounts import benchmarks
+
+ENGINES = {
+    "db": "django.contrib.sessions.backends.db",
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "signed_cookies": "django.contrib.sessions.backends.signed_cookies",
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare session engines under concurrent logged-in load: throughput, latency, "
+        "django_session reads/writes per request and 'database is locked' errors."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--engines", default="db,cached_db", help=f"Comma-separated from: {', '.join(ENGINES)}.")
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--requests", type=int, default=200, help="Requests per thread.")
+        parser.add_argument("--path", default="/orders/")
+        parser.add_argument("--login-every", type=int, default=0, help="Re-login (session write) every N requests.")
+        parser.add_argument("--output", help="Write the JSON results to this file.")
+
+    def handle(self, *args, **options):
+        engines = [e.strip() for e in options["engines"].split(",") if e.strip()]
+        results = []
+        with tempfile.TemporaryDirectory() as tmp:
+            # A file database so every thread sees the same rows and locks, and
+            # a SQLite session cache like production's, both thrown away after.
+            connection.settings_dict["TEST"]["NAME"] = str(Path(tmp) / "bench.sqlite3")
+            bench_caches = {
+                alias: {**config, "BACKEND": "accounts.caches.LocMemCache", "LOCATION": f"bench-{alias}"}
+                for alias, config in settings.CACHES.items()
+            }
+            bench_caches[settings.SESSION_CACHE_ALIAS] = {
+                **settings.CACHES[settings.SESSION_CACHE_ALIAS],
+                "BACKEND": "accounts.caches.SQLiteCache",
+                "LOCATION": str(Path(tmp) / "sessions-cache.sqlite3"),
+            }
+            setup_test_environment()
+            old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+            try:
+                with override_settings(CACHES=bench_caches):
+                    users = [
+                        User.objects.create_user(f"bench-session-{i}", f"s{i}@bench.test")
+                        for i in range(options["threads"])
+                    ]
+                    for name in engines:
+                        caches[settings.SESSION_CACHE_ALIAS].clear()
+                        results.append(benchmarks.session_load(
+                            ENGINES[name],
+                            users,
+                            path=options["path"],
+                            requests=options["requests"],
+                            login_every=options["login_every"],
+                        ))
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+                teardown_test_environment()
+
+        self.stdout.write(
+            f"{'engine':<16}{'req/s':>8}{'p50 ms':>9}{'p95 ms':>9}{'reads/req':>11}{'writes/req':>12}"
+            f"{'sess sql ms':>13}{'locked':>8}{'errors':>8}"
+        )
+        for name, r in zip(engines, results):
+            self.stdout.write(
+                f"{name:<16}{r['req_per_s']:>8}{r['p50_ms']:>9}{r['p95_ms']:>9}"
+                f"{r['session_reads_per_request']:>11}{r['session_writes_per_request']:>12}"
+                f"{r['session_sql_ms']:>13}{r['locked_errors']:>8}{r['errors']:>8}"
+            )
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                json.dump(results, fh, indent=2)
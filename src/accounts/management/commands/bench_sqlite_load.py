@@ -0,0 +1,134 @@
+import json
+import shutil
+import sqlite3
+import tempfile
+from contextlib import closing
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+
+from accounts import benchmarks
+from accounts.models import Product, UserProfile
+
+# The stock sqlite3 setup the project started with, and the tuned settings.
+# journal_mode is a property of the file: it is set once on each run's copy
+# rather than by every connection, which would need an exclusive lock.
+PROFILES = {
+    "baseline": {
+        "journal_mode": "DELETE",
+        "pragmas": {"synchronous": "FULL"},
+        "conn_max_age": 0,
+        "options": {},
+    },
+    "tuned": {
+        "journal_mode": settings.SQLITE_PRAGMAS.get("journal_mode", "DELETE"),
+        "pragmas": {k: v for k, v in settings.SQLITE_PRAGMAS.items() if k != "journal_mode"},
+        "conn_max_age": settings.DATABASES["default"].get("CONN_MAX_AGE", 0),
+        "options": settings.DATABASES["default"].get("OPTIONS", {}),
+    },
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Concurrent read/write load against a throwaway SQLite file, comparing the "
+        "baseline and tuned connection profiles at several workers x threads shapes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--profiles", default="baseline,tuned", help=f"From: {', '.join(PROFILES)}.")
+        parser.add_argument(
+            "--shapes",
+            default="1x1,1x4,3x1,3x4",
+            help="Comma-separated WORKERSxTHREADS; 3x4 is the Dockerfile's gunicorn setup.",
+        )
+        parser.add_argument("--seconds", type=float, default=5.0, help="Duration of each run.")
+        parser.add_argument("--volume", default="small", choices=list(benchmarks.VOLUMES))
+        parser.add_argument("--output", help="Write the JSON results to this file.")
+
+    def handle(self, *args, **options):
+        profiles = [p.strip() for p in options["profiles"].split(",") if p.strip()]
+        unknown = set(profiles) - set(PROFILES)
+        if unknown:
+            raise CommandError(f"Unknown profile(s): {', '.join(sorted(unknown))}")
+        try:
+            shapes = [tuple(int(n) for n in s.lower().split("x")) for s in options["shapes"].split(",")]
+        except ValueError:
+            raise CommandError("--shapes must look like 1x4,3x4")
+
+        results = []
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            template = tmp / "template.sqlite3"
+            connection.settings_dict["TEST"]["NAME"] = str(template)
+            bench_caches = {
+                alias: {**config, "BACKEND": "accounts.caches.LocMemCache", "LOCATION": f"bench-{alias}"}
+                for alias, config in settings.CACHES.items()
+            }
+            bench_caches[settings.SESSION_CACHE_ALIAS] = {
+                **settings.CACHES[settings.SESSION_CACHE_ALIAS],
+                "BACKEND": "accounts.caches.SQLiteCache",
+                "LOCATION": str(tmp / "sessions-cache.sqlite3"),
+            }
+            setup_test_environment()
+            old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+            try:
+                with override_settings(
+                    CACHES=bench_caches,
+                    INVOICE_CACHE_DIR=str(tmp / "invoices"),
+                    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+                ):
+                    user_ids, product_ids = self._seed(options["volume"], max(w * t for w, t in shapes))
+                    connections.close_all()  # checkpoints the WAL into the template file
+
+                    for name in profiles:
+                        for workers, threads in shapes:
+                            run_db = tmp / f"{name}-{workers}x{threads}.sqlite3"
+                            shutil.copyfile(template, run_db)
+                            with closing(sqlite3.connect(run_db)) as conn:
+                                conn.execute(f"PRAGMA journal_mode = {PROFILES[name]['journal_mode']}")
+                            connection.settings_dict["NAME"] = str(run_db)
+                            result = benchmarks.db_load(
+                                user_ids, product_ids, workers=workers, threads=threads,
+                                seconds=options["seconds"], configure=self._configure(PROFILES[name]),
+                            )
+                            result["profile"] = name
+                            results.append(result)
+                            self._print_row(result, header=len(results) == 1)
+                    connection.settings_dict["NAME"] = str(template)
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+                teardown_test_environment()
+
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                json.dump(results, fh, indent=2)
+
+    def _seed(self, volume, buyers):
+        benchmarks.seed(volume)
+        users = User.objects.bulk_create([User(username=f"load-{i}", email=f"load{i}@bench.test") for i in range(buyers)])
+        UserProfile.objects.bulk_create([UserProfile(user=user, role="buyer") for user in users])
+        return [user.id for user in users], list(Product.objects.values_list("id", flat=True))
+
+    @staticmethod
+    def _configure(profile):
+        def configure():
+            settings.SQLITE_PRAGMAS = profile["pragmas"]
+            connection.settings_dict["CONN_MAX_AGE"] = profile["conn_max_age"]
+            connection.settings_dict["OPTIONS"] = dict(profile["options"])
+        return configure
+
+    def _print_row(self, r, header=False):
+        if header:
+            self.stdout.write(
+                f"{'profile':<10}{'shape':>7}{'requests':>10}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}"
+                f"{'p99 ms':>9}{'errors':>8}{'locked':>8}"
+            )
+        self.stdout.write(
+            f"{r['profile']:<10}{str(r['workers']) + 'x' + str(r['threads']):>7}{r['requests']:>10}"
+            f"{r['req_per_s']:>9}{r['p50_ms']:>9}{r['p95_ms']:>9}{r['p99_ms']:>9}{r['errors']:>8}{r['locked_errors']:>8}"
+        )
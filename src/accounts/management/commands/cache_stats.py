@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = "Show hit/miss counters (and entry counts where known) for each configured cache."
+
+    def add_arguments(self, parser):
+        parser.add_argument("aliases", nargs="*", help="Cache aliases (default: all).")
+        parser.add_argument("--reset", action="store_true", help="Zero the counters after printing.")
+        parser.add_argument("--clear", action="store_true", help="Empty the caches after printing.")
+
+    def handle(self, *args, **options):
+        aliases = options["aliases"] or list(settings.CACHES)
+        unknown = set(aliases) - set(settings.CACHES)
+        if unknown:
+            raise CommandError(f"Unknown cache alias(es): {', '.join(sorted(unknown))}")
+
+        self.stdout.write(f"{'alias':<12}{'backend':<14}{'hits':>10}{'misses':>10}{'hit rate':>10}{'entries':>10}")
+        for alias in aliases:
+            cache = caches[alias]
+            if not hasattr(cache, "stats"):
+                self.stdout.write(f"{alias:<12}{type(cache).__name__:<14}{'(no counters)':>20}")
+                continue
+            stats = cache.stats()
+            rate = f"{stats['hit_rate']:.1%}" if stats["hit_rate"] is not None else "-"
+            entries = cache.entry_count() if hasattr(cache, "entry_count") else "-"
+            scope = "" if stats["shared"] else "  (this process only)"
+            self.stdout.write(
+                f"{alias:<12}{type(cache).__name__:<14}{stats['hits']:>10}{stats['misses']:>10}"
+                f"{rate:>10}{entries!s:>10}{scope}"
+            )
+            if options["reset"]:
+                cache.reset_stats()
+            if options["clear"]:
+                cache.clear()
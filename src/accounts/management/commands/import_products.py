@@ -0,0 +1,45 @@
+import sys
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts import product_import
+
+
+class Command(BaseCommand):
+    help = (
+        "Create, update or restock a seller's products from a CSV or JSON Lines file. "
+        "Rows are streamed and written in batches; invalid rows are reported and skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import; '-' reads standard input.")
+        parser.add_argument("--seller", required=True, help="Username of the seller who owns the products.")
+        parser.add_argument("--format", choices=product_import.FORMATS, help="Default: guessed from the file name.")
+        parser.add_argument("--batch-size", type=int, default=product_import.BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            seller = User.objects.get(username=options["seller"])
+        except User.DoesNotExist:
+            raise CommandError(f"No user named {options['seller']!r}.")
+        path = options["path"]
+        fmt = options["format"] or product_import.format_for(path)
+
+        if path == "-":
+            result = product_import.import_products(seller, sys.stdin, fmt, options["batch_size"])
+        else:
+            try:
+                with open(path, encoding="utf-8-sig", newline="") as stream:
+                    result = product_import.import_products(seller, stream, fmt, options["batch_size"])
+            except OSError as exc:
+                raise CommandError(str(exc))
+
+        for error in result.errors:
+            self.stderr.write(f"line {error['line']}: {error['error']}")
+        if result.error_count > len(result.errors):
+            self.stderr.write(f"... and {result.error_count - len(result.errors)} more error(s).")
+        self.stdout.write(self.style.SUCCESS(
+            f"{result.rows} row(s): {result.created} created, {result.updated} updated, "
+            f"{result.error_count} rejected."
+        ))
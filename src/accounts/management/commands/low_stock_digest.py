@@ -0,0 +1,36 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from accounts import inventory
+
+
+class Command(BaseCommand):
+    help = (
+        "Print a low-stock digest for every seller from one pass over the low-stock index, "
+        "and refresh the dashboards' cached low-stock counts. Meant to run periodically."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--json", action="store_true", help="One JSON object per seller per line.")
+        parser.add_argument("--no-counts", action="store_true", help="Do not refresh the cached counts.")
+
+    def handle(self, *args, **options):
+        sellers = products = 0
+        for seller_id, alerts in inventory.digests():
+            sellers += 1
+            products += len(alerts)
+            if options["json"]:
+                self.stdout.write(json.dumps({"seller_id": seller_id, "products": alerts}))
+                continue
+            self.stdout.write(f"Seller {seller_id}: {len(alerts)} product(s) low on stock")
+            for alert in alerts:
+                self.stdout.write(
+                    f"  {alert['name']} ({alert['sku'] or '-'}): {alert['stock']} left, "
+                    f"reorder at {alert['reorder_threshold']}"
+                )
+
+        if not options["no_counts"]:
+            inventory.store_counts()
+        if not options["json"]:
+            self.stdout.write(f"{products} low-stock product(s) across {sellers} seller(s).")
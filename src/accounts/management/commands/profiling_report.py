@@ -0,0 +1,37 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts import profiling
+
+
+class Command(BaseCommand):
+    help = "Summarize a ProfilingMiddleware request log into per-view timing histograms."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--log", help="JSON Lines file (default: PROFILING['REQUEST_LOG']).")
+        parser.add_argument("--json", action="store_true", help="Print the raw summary as JSON.")
+
+    def handle(self, *args, **options):
+        path = options["log"] or profiling.options()["REQUEST_LOG"]
+        if not path:
+            raise CommandError("No request log given and PROFILING['REQUEST_LOG'] is not set.")
+        try:
+            summary = profiling.summarize_log(path)
+        except FileNotFoundError:
+            raise CommandError(f"{path} does not exist.")
+
+        if options["json"]:
+            self.stdout.write(json.dumps(summary, indent=2))
+            return
+
+        self.stdout.write(
+            f"{'view':<32}{'count':>7}{'mean ms':>10}{'p95 ms':>9}{'max ms':>10}"
+            f"{'sql/req':>9}{'sql ms':>9}{'tpl ms':>9}"
+        )
+        for view, row in sorted(summary.items(), key=lambda item: -item[1]["mean_ms"] * item[1]["count"]):
+            p95 = row["p95_ms"] if row["p95_ms"] is not None else f">{profiling.BUCKETS_MS[-1]}"
+            self.stdout.write(
+                f"{view:<32}{row['count']:>7}{row['mean_ms']:>10.2f}{p95!s:>9}{row['max_ms']:>10.2f}"
+                f"{row['mean_sql_count']:>9.1f}{row['mean_sql_ms']:>9.2f}{row['mean_template_ms']:>9.2f}"
+            )
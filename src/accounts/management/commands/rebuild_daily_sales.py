@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from accounts import reports
+
+
+class Command(BaseCommand):
+    help = "Rebuild the DailySales rollup from OrderItem history."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--since", help="Only rebuild days on or after this date (YYYY-MM-DD).")
+
+    def handle(self, *args, **options):
+        since = None
+        if options["since"]:
+            since = parse_date(options["since"])
+            if since is None:
+                raise CommandError(f"Invalid --since date: {options['since']}")
+        written = reports.rebuild_daily_sales(since=since)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} daily sales rows."))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from accounts import sales
+
+
+class Command(BaseCommand):
+    help = "Rebuild per-seller sales summaries from OrderItem history."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seller",
+            type=int,
+            action="append",
+            dest="sellers",
+            help="Only rebuild this seller id (repeatable).",
+        )
+
+    def handle(self, *args, **options):
+        written = sales.rebuild(options["sellers"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} seller summaries."))
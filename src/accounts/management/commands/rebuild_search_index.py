@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from accounts import search
+
+
+class Command(BaseCommand):
+    help = "Rebuild the catalog full-text search index from Product."
+
+    def handle(self, *args, **options):
+        if not search.fts_available():
+            self.stdout.write("Full-text index is only used on SQLite; nothing to rebuild.")
+            return
+        indexed = search.rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} products."))
@@ -0,0 +1,58 @@
+import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from accounts import tasks
+
+
+class Command(BaseCommand):
+    help = (
+        "Run queued background tasks (accounts.tasks) with a pool of worker threads. "
+        "Stops on SIGINT/SIGTERM after the tasks in hand finish."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=2, help="Tasks run concurrently (default 2).")
+        parser.add_argument("--poll", type=float, default=1.0, help="Seconds to wait when the queue is empty.")
+        parser.add_argument("--once", action="store_true", help="Drain the due tasks, then exit.")
+
+    def handle(self, *args, **options):
+        self.verbosity = options["verbosity"]
+        self.stop = threading.Event()
+        if threading.current_thread() is threading.main_thread():
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(sig, lambda *_: self.stop.set())
+
+        if options["threads"] <= 1:
+            ran = self._loop(options["poll"], options["once"], pooled=False)
+        else:
+            with ThreadPoolExecutor(max_workers=options["threads"], thread_name_prefix="task") as pool:
+                results = [
+                    pool.submit(self._loop, options["poll"], options["once"]) for _ in range(options["threads"])
+                ]
+            ran = sum(future.result() for future in results)
+        self.stdout.write(f"Ran {ran} task(s).")
+
+    def _loop(self, poll, once, pooled=True):
+        worker = tasks.worker_id()
+        ran = 0
+        try:
+            while not self.stop.is_set():
+                close_old_connections()
+                claimed = tasks.claim(worker)
+                if not claimed:
+                    if once:
+                        break
+                    self.stop.wait(poll)
+                    continue
+                ok = tasks.run(claimed[0], worker)
+                ran += 1
+                if self.verbosity > 1:
+                    self.stdout.write(f"{claimed[0]}: {'ok' if ok else 'failed'}")
+        finally:
+            if pooled:  # pool threads each opened their own connections
+                connections.close_all()
+        return ran
@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts import holds
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired stock holds (accounts.holds). Expired holds already stop counting "
+        "against availability; this keeps the table small. Run from cron, or with --every."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--every", type=float, help="Keep running, sweeping every this many seconds.")
+        parser.add_argument("--batch-size", type=int, default=holds.SWEEP_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        while True:
+            removed = holds.sweep(batch_size=options["batch_size"])
+            self.stdout.write(f"Removed {removed} expired hold(s).")
+            if not options["every"]:
+                return
+            time.sleep(options["every"])
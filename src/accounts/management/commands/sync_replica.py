@@ -0,0 +1,27 @@
+import sqlite3
+from contextlib import closing
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from accounts import routers
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the primary SQLite database over the replica's file, standing in for "
+        "replication when both aliases point at local SQLite files."
+    )
+
+    def handle(self, *args, **options):
+        if not routers.replica_configured():
+            raise CommandError("No replica database configured (set WEBSITE_DB_REPLICA_NAME).")
+        primary, replica = connections[routers.PRIMARY], connections[routers.REPLICA]
+        if primary.vendor != "sqlite" or replica.vendor != "sqlite":
+            raise CommandError("sync_replica only copies SQLite files; use the server's replication otherwise.")
+        replica.close()
+        source, target = primary.settings_dict["NAME"], replica.settings_dict["NAME"]
+        # The backup API takes a consistent snapshot even while the primary is written to.
+        with closing(sqlite3.connect(source)) as src, closing(sqlite3.connect(target)) as dst:
+            src.backup(dst)
+        self.stdout.write(f"Copied {source} to {target}.")
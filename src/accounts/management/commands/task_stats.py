@@ -0,0 +1,41 @@
+import json
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from accounts import tasks
+
+
+class Command(BaseCommand):
+    help = "Print background task queue depth, counts per task and status, and wait/run latency."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--window", type=int, default=60, help="Minutes of finished tasks for latency.")
+        parser.add_argument("--json", action="store_true", help="Print the raw stats as JSON.")
+        parser.add_argument("--purge-days", type=int, help="First delete done tasks older than this.")
+
+    def handle(self, *args, **options):
+        if options["purge_days"] is not None:
+            removed = tasks.purge(timedelta(days=options["purge_days"]))
+            self.stdout.write(f"Purged {removed} finished task(s).")
+
+        data = tasks.stats(window=timedelta(minutes=options["window"]))
+        if options["json"]:
+            self.stdout.write(json.dumps(data, indent=2))
+            return
+
+        oldest = data["oldest_due_seconds"]
+        self.stdout.write(
+            f"Due now: {data['depth']} (oldest waiting {oldest if oldest is not None else '-'} s), "
+            f"awaiting retry: {data['retrying']}"
+        )
+        self.stdout.write(
+            f"Finished in the last {options['window']} min: {data['finished_in_window']}; "
+            f"wait p50/p95 {data['wait_p50']}/{data['wait_p95']} s, "
+            f"run p50/p95 {data['run_p50']}/{data['run_p95']} s"
+        )
+        if data["counts"]:
+            width = max(len(row["name"]) for row in data["counts"])
+            self.stdout.write(f"{'task':<{width}}  {'status':<8}{'count':>8}")
+            for row in data["counts"]:
+                self.stdout.write(f"{row['name']:<{width}}  {row['status']:<8}{row['count']:>8}")
@@ -1,10 +1,86 @@
+import cProfile
 import logging
-from typing import Callable
+import os
+import random
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Iterable
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
 from django.shortcuts import redirect
 from django.urls import resolve, Resolver404
 
+from . import profiling, routers
+
 logger = logging.getLogger(__name__)
 
+
+class PrefixTrie:
+    """Character trie answering "does path start with any stored prefix?".
+
+    Lookup cost is bounded by the length of the longest prefix, not by the
+    number of prefixes.
+    """
+
+    _END = object()
+
+    def __init__(self, prefixes: Iterable[str] = ()):
+        self._root = {}
+        for prefix in prefixes:
+            self.add(prefix)
+
+    def add(self, prefix: str) -> None:
+        node = self._root
+        for ch in prefix:
+            node = node.setdefault(ch, {})
+        node[self._END] = True
+
+    def matches(self, path: str) -> bool:
+        node = self._root
+        if self._END in node:
+            return True
+        for ch in path:
+            node = node.get(ch)
+            if node is None:
+                return False
+            if self._END in node:
+                return True
+        return False
+
+
+class PublicPathMatcher:
+    """Decides once per distinct path whether it is public.
+
+    Exact paths and prefixes are checked first; only when both miss is the
+    path resolved to compare its url_name. The combined answer is memoised
+    in a bounded LRU so a repeat path costs a single dictionary lookup.
+    """
+
+    def __init__(self, exact_paths, prefixes, view_names, cache_size=2048):
+        self.exact_paths = frozenset(exact_paths)
+        self.prefixes = PrefixTrie(prefixes)
+        self.view_names = frozenset(view_names)
+        self.is_public = lru_cache(maxsize=cache_size)(self._compute)
+
+    def path_public(self, path: str) -> bool:
+        return path in self.exact_paths or self.prefixes.matches(path)
+
+    def view_name_public(self, path: str) -> bool:
+        """Resolve and compare url_name; resolver failures are non-public."""
+        try:
+            return resolve(path).url_name in self.view_names
+        except Resolver404:
+            return False
+
+    def _compute(self, path: str) -> bool:
+        return self.path_public(path) or self.view_name_public(path)
+
+
 class LoginRequiredMiddleware:
     """Require authentication for non-public paths.
 
@@ -13,6 +89,12 @@ class LoginRequiredMiddleware:
       * Path starts with one of PUBLIC_PREFIXES
       * Resolved url_name is in PUBLIC_VIEW_NAMES
     Otherwise unauthenticated users are redirected to the combined login/register page.
+
+    The checks are compiled into a ``PublicPathMatcher`` when the middleware
+    is instantiated, so each distinct path is only resolved once.
+
+    Sync and async capable: under ASGI the user is loaded with
+    ``request.auser()`` and only for non-public paths.
     """
 
     PUBLIC_EXACT_PATHS = {
@@ -36,45 +118,236 @@ class LoginRequiredMiddleware:
         'login_register',
         'login_user',
         'register_user',
+        'product_search',
+        'cart_count',
     }
 
+    CACHE_SIZE = 2048
+
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response: Callable):
         self.get_response = get_response
-        if not logger.handlers:
-            handler = logging.StreamHandler()
-            formatter = logging.Formatter('[LoginRequiredMiddleware] %(message)s')
-            handler.setFormatter(formatter)
-            logger.addHandler(handler)
-            logger.setLevel(logging.DEBUG)
-
-    def _path_public(self, path: str) -> bool:
-        """Fast path checks: exact match or prefix."""
-        if path in self.PUBLIC_EXACT_PATHS:
-            return True
-        return any(path.startswith(pref) for pref in self.PUBLIC_PREFIXES)
-
-    def _view_name_public(self, path: str) -> bool:
-        """Resolve and compare url_name; resolver failures are non-public."""
-        try:
-            match = resolve(path)
-            return match.url_name in self.PUBLIC_VIEW_NAMES
-        except Resolver404:
-            return False
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        self.matcher = PublicPathMatcher(
+            self.PUBLIC_EXACT_PATHS,
+            self.PUBLIC_PREFIXES,
+            self.PUBLIC_VIEW_NAMES,
+            cache_size=self.CACHE_SIZE,
+        )
 
     def is_public(self, path: str) -> bool:
-        return self._path_public(path) or self._view_name_public(path)
+        return self.matcher.is_public(path)
 
     def __call__(self, request):  # pragma: no cover - entry still exercised via tests
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
         path = request.path
         is_auth = request.user.is_authenticated
-        logger.debug("Request path=%s is_authenticated=%s", path, is_auth)
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug("Request path=%s is_authenticated=%s", path, is_auth)
 
         if self.is_public(path):
-            logger.debug("Allowed: public path")
+            if debug:
+                logger.debug("Allowed: public path")
             return self.get_response(request)
         if is_auth:
-            logger.debug("Allowed: authenticated")
+            if debug:
+                logger.debug("Allowed: authenticated")
             return self.get_response(request)
-        logger.debug("Redirecting to login page")
+        if debug:
+            logger.debug("Redirecting to login page")
         return redirect('login_register')
 
+    async def __acall__(self, request):
+        # Public paths skip loading the user altogether.
+        if self.is_public(request.path) or (await request.auser()).is_authenticated:
+            return await self.get_response(request)
+        logger.debug("Redirecting %s to login page", request.path)
+        return redirect('login_register')
+
+
+class ProfilingMiddleware:
+    """Time each request and report where the time went.
+
+    Opt-in through ``settings.PROFILING["ENABLED"]``; otherwise Django drops
+    the middleware at startup. Listed first in ``MIDDLEWARE`` so the wall
+    time covers every other middleware too. For each request it records the
+    view name, wall time, SQL query count and time (through
+    ``profiling.record_sql`` on every database connection) and template
+    render time, then:
+
+      * adds a ``Server-Timing`` header (``SERVER_TIMING``),
+      * folds the numbers into ``profiling.STATS``,
+      * appends them to ``REQUEST_LOG`` when set,
+      * runs a ``SAMPLE_RATE`` fraction of requests under cProfile and
+        dumps the stats to ``PROFILE_DIR``.
+
+    Streaming response bodies are produced after the middleware returns, so
+    their generation time is not included. Sync and async capable; under
+    ASGI, cProfile sampling is skipped.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable):
+        options = profiling.options()
+        if not options["ENABLED"]:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        self.server_timing = options["SERVER_TIMING"]
+        self.sample_rate = options["SAMPLE_RATE"]
+        self.profile_dir = Path(options["PROFILE_DIR"]) if options["PROFILE_DIR"] else None
+        self.request_log = options["REQUEST_LOG"]
+        self.random = random.random
+
+    def _sampled(self):
+        return self.profile_dir is not None and self.sample_rate > 0 and self.random() < self.sample_rate
+
+    def _start_profiler(self):
+        if not self._sampled():
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:  # another profiler already owns this thread
+            return None
+        return profiler
+
+    @staticmethod
+    def _install_sql_timing():
+        for conn in connections.all():
+            profiling.install(conn)
+
+    @contextmanager
+    def _measure(self, profile):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            profile.wall = time.perf_counter() - start
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        self._install_sql_timing()
+        profile, token = profiling.start()
+        profiler = None
+        try:
+            with self._measure(profile):
+                profiler = self._start_profiler()
+                try:
+                    response = self.get_response(request)
+                finally:
+                    if profiler is not None:
+                        profiler.disable()
+        finally:
+            profiling.finish(token)
+        return self._finish(request, response, profile, profiler)
+
+    async def __acall__(self, request):
+        # cProfile follows a thread rather than a coroutine, so async
+        # requests are timed but never sampled. Queries run on the
+        # thread-sensitive executor's connections, so wrap those.
+        await sync_to_async(self._install_sql_timing)()
+        profile, token = profiling.start()
+        try:
+            with self._measure(profile):
+                response = await self.get_response(request)
+        finally:
+            profiling.finish(token)
+        return self._finish(request, response, profile, None)
+
+    def _finish(self, request, response, profile, profiler):
+        match = getattr(request, "resolver_match", None)
+        profile.view = match.view_name if match else "<unresolved>"
+        if profiler is not None:
+            profile.profile_path = self._dump(profiler, profile.view)
+        self._record(profile)
+        if self.server_timing:
+            response["Server-Timing"] = profile.server_timing()
+        return response
+
+    def _dump(self, profiler, view):
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        name = f"{view.replace(':', '.')}-{time.time_ns()}-{os.getpid()}.prof"
+        path = self.profile_dir / name
+        profiler.dump_stats(path)
+        return path
+
+    def _record(self, profile):
+        record = profile.as_record()
+        profiling.STATS.add(record)
+        if self.request_log:
+            if profile.profile_path:
+                record["profile"] = str(profile.profile_path)
+            try:
+                profiling.append_record(self.request_log, record)
+            except OSError:
+                logger.warning("Could not append to profiling log %s", self.request_log, exc_info=True)
+
+
+class ReplicaRoutingMiddleware:
+    """Bind per-request routing state for ``routers.PrimaryReplicaRouter``.
+
+    Only installed when a ``replica`` database is configured. A request that
+    carries an unexpired ``REPLICA_PIN_COOKIE`` reads from the primary
+    throughout. A request that writes sets the cookie for
+    ``REPLICA_STICKY_SECONDS``. Listed before the session and auth
+    middleware so their reads and writes are tracked too.
+    """
+
+    COOKIE = "db_pin"
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable):
+        if not routers.replica_configured():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        self.cookie = getattr(settings, "REPLICA_PIN_COOKIE", self.COOKIE)
+        self.sticky_seconds = routers.sticky_seconds()
+
+    def _pinned(self, request):
+        try:
+            return float(request.COOKIES.get(self.cookie, 0)) > time.time()
+        except ValueError:
+            return False
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state, token = routers.start(pinned=self._pinned(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            routers.finish(token)
+        return self._finish(state, response)
+
+    async def __acall__(self, request):
+        state, token = routers.start(pinned=self._pinned(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            routers.finish(token)
+        return self._finish(state, response)
+
+    def _finish(self, state, response):
+        if state.wrote and self.sticky_seconds > 0:
+            response.set_cookie(
+                self.cookie,
+                f"{time.time() + self.sticky_seconds:.0f}",
+                max_age=self.sticky_seconds,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
@@ -0,0 +1,86 @@
+# Generated by Django 5.2.7 on 2026-10-17 06:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, DecimalField, F, Sum
+
+# Low-stock threshold in force when the summary was introduced; per-product
+# thresholds came later (0018) with the same default.
+LOW_STOCK_THRESHOLD = 5
+
+
+def backfill_sales_summaries(apps, schema_editor):
+    """Build every seller's summary from order history, as ``sales.rebuild`` does."""
+    OrderItem = apps.get_model("accounts", "OrderItem")
+    Product = apps.get_model("accounts", "Product")
+    SellerSalesSummary = apps.get_model("accounts", "SellerSalesSummary")
+    rows = {}
+    totals = (
+        OrderItem.objects.values("product__seller_id")
+        .annotate(
+            revenue=Sum(F("price") * F("quantity"), output_field=DecimalField(max_digits=12, decimal_places=2)),
+            units=Sum("quantity"),
+            orders=Count("order", distinct=True),
+        )
+        .order_by()
+    )
+    for row in totals:
+        rows[row["product__seller_id"]] = SellerSalesSummary(
+            seller_id=row["product__seller_id"],
+            total_revenue=row["revenue"] or 0,
+            units_sold=row["units"] or 0,
+            order_count=row["orders"],
+        )
+    low = (
+        Product.objects.filter(stock__lt=LOW_STOCK_THRESHOLD)
+        .values("seller_id")
+        .annotate(n=Count("id"))
+        .order_by()
+    )
+    for row in low:
+        summary = rows.setdefault(row["seller_id"], SellerSalesSummary(seller_id=row["seller_id"]))
+        summary.low_stock_count = row["n"]
+    SellerSalesSummary.objects.bulk_create(rows.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0005_product_seller_product_stock_alter_orderitem_price"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SellerSalesSummary",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "total_revenue",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                ("order_count", models.IntegerField(default=0)),
+                ("units_sold", models.IntegerField(default=0)),
+                ("low_stock_count", models.IntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "seller",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="sales_summary",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.RunPython(backfill_sales_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.2.7 on 2026-10-17 06:24
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F, FloatField, Sum
+
+
+def backfill_cart_summaries(apps, schema_editor):
+    CartItem = apps.get_model("accounts", "CartItem")
+    CartSummary = apps.get_model("accounts", "CartSummary")
+    totals = (
+        CartItem.objects.values("user_id")
+        .annotate(
+            lines=Count("id"),
+            items=Sum("quantity"),
+            subtotal=Sum(F("product__price") * F("quantity"), output_field=FloatField()),
+        )
+        .order_by()
+    )
+    CartSummary.objects.bulk_create(
+        [
+            CartSummary(
+                user_id=row["user_id"],
+                line_count=row["lines"],
+                item_count=row["items"],
+                subtotal=row["subtotal"] or 0,
+            )
+            for row in totals
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0006_sellersalessummary"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CartSummary",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("line_count", models.IntegerField(default=0)),
+                ("item_count", models.IntegerField(default=0)),
+                ("subtotal", models.FloatField(default=0)),
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="cart_summary",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.RunPython(backfill_cart_summaries, migrations.RunPython.noop),
+    ]
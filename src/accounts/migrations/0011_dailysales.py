@@ -0,0 +1,98 @@
+# Generated by Django 5.2.7 on 2026-10-17 06:34
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, DecimalField, F, Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_daily_sales(apps, schema_editor):
+    """Roll existing order history up per product and day, as ``reports.rebuild_daily_sales`` does."""
+    OrderItem = apps.get_model("accounts", "OrderItem")
+    DailySales = apps.get_model("accounts", "DailySales")
+    totals = (
+        OrderItem.objects.annotate(day=TruncDate("order__created_at"))
+        .values("product_id", "product__seller_id", "day")
+        .annotate(
+            units=Sum("quantity"),
+            revenue=Sum(F("price") * F("quantity"), output_field=DecimalField(max_digits=12, decimal_places=2)),
+            orders=Count("order", distinct=True),
+        )
+        .order_by()
+    )
+    batch = []
+    for row in totals.iterator(chunk_size=1000):
+        batch.append(DailySales(
+            seller_id=row["product__seller_id"],
+            product_id=row["product_id"],
+            day=row["day"],
+            units=row["units"],
+            revenue=row["revenue"] or 0,
+            order_count=row["orders"],
+        ))
+        if len(batch) >= 1000:
+            DailySales.objects.bulk_create(batch)
+            batch = []
+    DailySales.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0010_order_user_created_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailySales",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("units", models.IntegerField(default=0)),
+                (
+                    "revenue",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                ("order_count", models.IntegerField(default=0)),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_sales",
+                        to="accounts.product",
+                    ),
+                ),
+                (
+                    "seller",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_sales",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["seller", "day"], name="daily_sales_seller_day_idx"
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("product", "day"), name="daily_sales_product_day_uniq"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_daily_sales, migrations.RunPython.noop),
+    ]
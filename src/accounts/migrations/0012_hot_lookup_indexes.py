@@ -0,0 +1,114 @@
+# Generated by Django 5.2.7 on 2026-10-17 06:42
+
+import django.db.models.deletion
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import migrations, models
+from django.db.models import Count, F, Min, Sum
+
+
+def merge_duplicate_cart_lines(apps, schema_editor):
+    """Fold duplicate (user, product) cart lines into the oldest one.
+
+    Item counts and subtotals are unchanged by the merge; only the
+    summary's line count drops by the number of lines removed.
+    """
+    CartItem = apps.get_model("accounts", "CartItem")
+    CartSummary = apps.get_model("accounts", "CartSummary")
+    duplicates = (
+        CartItem.objects.values("user_id", "product_id")
+        .annotate(lines=Count("id"), keep=Min("id"), quantity=Sum("quantity"))
+        .filter(lines__gt=1)
+        .order_by()
+    )
+    for row in duplicates:
+        CartItem.objects.filter(id=row["keep"]).update(quantity=row["quantity"])
+        CartItem.objects.filter(
+            user_id=row["user_id"], product_id=row["product_id"]
+        ).exclude(id=row["keep"]).delete()
+        CartSummary.objects.filter(user_id=row["user_id"]).update(
+            line_count=F("line_count") - (row["lines"] - 1)
+        )
+
+
+USER_EMAIL_INDEX = "auth_user_email_idx"
+
+
+def _user_email_column(apps):
+    """``(table, column)`` of the user model's email, or None if it has none.
+
+    Read from the historical user model so a swapped ``AUTH_USER_MODEL`` or a
+    custom ``db_table`` is honoured; the index is raw SQL because the user
+    model belongs to another app and its state must not change here.
+    """
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    try:
+        email = User._meta.get_field("email")
+    except FieldDoesNotExist:
+        return None
+    return User._meta.db_table, email.column
+
+
+def create_user_email_index(apps, schema_editor):
+    target = _user_email_column(apps)
+    if target is None:
+        return
+    quote = schema_editor.quote_name
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS {quote(USER_EMAIL_INDEX)} ON {quote(target[0])} ({quote(target[1])})"
+    )
+
+
+def drop_user_email_index(apps, schema_editor):
+    if _user_email_column(apps) is not None:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {schema_editor.quote_name(USER_EMAIL_INDEX)}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0011_dailysales"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        # SQLite rebuilds auth_user in these migrations, which would drop
+        # auth_user_email_idx if it were created first.
+        ("auth", "0012_alter_user_first_name_max_length"),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_cart_lines, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="cartitem",
+            constraint=models.UniqueConstraint(
+                fields=("user", "product"), name="cartitem_user_product_uniq"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["seller", "stock"], name="product_seller_stock_idx"
+            ),
+        ),
+        # login_user and register_user look users up by email.
+        migrations.RunPython(create_user_email_index, drop_user_email_index),
+        # The composite indexes above lead with these columns, so their own
+        # single-column indexes are redundant.
+        migrations.AlterField(
+            model_name="cartitem",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="product",
+            name="seller",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="products",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+    ]
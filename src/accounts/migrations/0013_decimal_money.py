@@ -0,0 +1,52 @@
+# Generated by Django 5.2.7 on 2026-10-17 06:45
+
+from django.db import migrations, models
+from django.db.models.functions import Round
+
+
+def round_to_cents(apps, schema_editor):
+    """Drop float noise (``19.990000000000002``) so SQL sums are exact."""
+    Product = apps.get_model("accounts", "Product")
+    Order = apps.get_model("accounts", "Order")
+    CartSummary = apps.get_model("accounts", "CartSummary")
+    Product.objects.update(price=Round("price", 2))
+    Order.objects.update(
+        subtotal=Round("subtotal", 2), tax=Round("tax", 2), total=Round("total", 2)
+    )
+    CartSummary.objects.update(subtotal=Round("subtotal", 2))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0012_hot_lookup_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="cartsummary",
+            name="subtotal",
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AlterField(
+            model_name="order",
+            name="subtotal",
+            field=models.DecimalField(decimal_places=2, max_digits=12),
+        ),
+        migrations.AlterField(
+            model_name="order",
+            name="tax",
+            field=models.DecimalField(decimal_places=2, max_digits=12),
+        ),
+        migrations.AlterField(
+            model_name="order",
+            name="total",
+            field=models.DecimalField(decimal_places=2, max_digits=12),
+        ),
+        migrations.AlterField(
+            model_name="product",
+            name="price",
+            field=models.DecimalField(decimal_places=2, max_digits=10),
+        ),
+        migrations.RunPython(round_to_cents, migrations.RunPython.noop),
+    ]
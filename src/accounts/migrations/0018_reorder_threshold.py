@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-17 07:36
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0017_stock_holds"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="reorder_threshold",
+            field=models.PositiveIntegerField(default=5),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                condition=models.Q(("stock__lt", models.F("reorder_threshold"))),
+                fields=["seller", "stock"],
+                name="product_low_stock_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,114 @@
+# Generated by Django 5.2.7 on 2026-10-17 07:40
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, DecimalField, F, Sum
+
+
+def backfill_fulfillments(apps, schema_editor):
+    """Split existing orders per seller; they have no fulfillment status yet, so pending."""
+    OrderItem = apps.get_model("accounts", "OrderItem")
+    Fulfillment = apps.get_model("accounts", "Fulfillment")
+    totals = (
+        OrderItem.objects.values("order_id", "product__seller_id", "order__created_at")
+        .annotate(
+            lines=Count("id"),
+            units=Sum("quantity"),
+            subtotal=Sum(F("price") * F("quantity"), output_field=DecimalField(max_digits=12, decimal_places=2)),
+        )
+        .order_by()
+    )
+    batch = []
+    for row in totals.iterator(chunk_size=2000):
+        batch.append(Fulfillment(
+            order_id=row["order_id"],
+            seller_id=row["product__seller_id"],
+            item_count=row["lines"],
+            units=row["units"],
+            subtotal=row["subtotal"],
+            created_at=row["order__created_at"],
+        ))
+        if len(batch) >= 2000:
+            Fulfillment.objects.bulk_create(batch)
+            batch = []
+    Fulfillment.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0018_reorder_threshold"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Fulfillment",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "pending"),
+                            ("packed", "packed"),
+                            ("shipped", "shipped"),
+                            ("delivered", "delivered"),
+                            ("cancelled", "cancelled"),
+                        ],
+                        default="pending",
+                        max_length=10,
+                    ),
+                ),
+                ("item_count", models.PositiveIntegerField(default=0)),
+                ("units", models.PositiveIntegerField(default=0)),
+                (
+                    "subtotal",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "order",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="accounts.order",
+                    ),
+                ),
+                (
+                    "seller",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="fulfillments",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["seller", "status", "created_at", "id"],
+                        name="fulfillment_queue_idx",
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("order", "seller"), name="fulfillment_order_seller_uniq"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_fulfillments, migrations.RunPython.noop),
+    ]
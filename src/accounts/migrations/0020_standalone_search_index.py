@@ -0,0 +1,72 @@
+from django.db import migrations
+
+FTS_TABLE = "accounts_product_fts"
+
+# 0008 created an external-content FTS5 table fed by triggers on
+# accounts_product. SQLite drops those triggers whenever a migration rebuilds
+# accounts_product, so the index went stale. Replace it with a standalone
+# FTS5 table keyed by product id and kept in sync from Python
+# (accounts.signals and accounts.search.index_products).
+STANDALONE_SQL = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_au",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ai",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+    f"""
+    CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        name,
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"INSERT INTO {FTS_TABLE}(rowid, name) SELECT id, name FROM accounts_product",
+]
+
+# The 0008 schema, for migrating backwards.
+EXTERNAL_CONTENT_SQL = [
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+    f"""
+    CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        name,
+        content='accounts_product',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON accounts_product BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name) VALUES (new.id, new.name);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON accounts_product BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name) VALUES ('delete', old.id, old.name);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE OF name ON accounts_product BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name) VALUES ('delete', old.id, old.name);
+        INSERT INTO {FTS_TABLE}(rowid, name) VALUES (new.id, new.name);
+    END
+    """,
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != "sqlite":
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0019_fulfillment"),
+    ]
+
+    operations = [
+        migrations.RunPython(_run(STANDALONE_SQL), _run(EXTERNAL_CONTENT_SQL)),
+    ]
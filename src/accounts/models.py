@@ -1,5 +1,9 @@
 from django.db import models
+from django.db.models import F, Q
 from django.contrib.auth.models import User
+from django.utils import timezone
+
+from .pricing import amount_field, price_field
 
 class UserProfile(models.Model):
     ROLE_CHOICES = (
@@ -12,11 +16,58 @@ class UserProfile(models.Model):
 
     def __str__(self):
         return f"{self.user.username} ({self.role})"
+class ProductQuerySet(models.QuerySet):
+    """Keeps the search index in step with renames that bypass ``save``."""
+
+    def update(self, **kwargs):
+        if "name" not in kwargs:
+            return super().update(**kwargs)
+        from . import search
+
+        ids = list(self.values_list("id", flat=True))
+        updated = super().update(**kwargs)
+        search.index_products(ids)
+        return updated
+
+    def bulk_update(self, objs, fields, batch_size=None):
+        updated = super().bulk_update(objs, fields, batch_size=batch_size)
+        if "name" in fields:
+            from . import search
+
+            search.index_products(obj.pk for obj in objs)
+        return updated
+
+
 class Product(models.Model):
     name = models.CharField(max_length=200)
-    price = models.FloatField()
+    price = price_field()
     stock = models.IntegerField(default=10)  # NEW FIELD
-    seller = models.ForeignKey(User, on_delete=models.CASCADE, related_name="products")
+    # Stock below this is low (see accounts.inventory); 0 turns alerts off.
+    reorder_threshold = models.PositiveIntegerField(default=5)
+    # Indexed through product_seller_stock_idx, whose leading column is seller.
+    seller = models.ForeignKey(User, on_delete=models.CASCADE, related_name="products", db_index=False)
+    # Seller's own stock-keeping code; bulk imports upsert on (seller, sku).
+    sku = models.CharField(max_length=64, null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)  # versions cached fragments
+
+    objects = ProductQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Seller listings and low-stock lookups (stock < threshold).
+            models.Index(fields=["seller", "stock"], name="product_seller_stock_idx"),
+            # Only low-stock rows, so the database keeps it current as stock
+            # or thresholds change and at-risk lookups read just those rows.
+            models.Index(
+                fields=["seller", "stock"],
+                name="product_low_stock_idx",
+                condition=Q(stock__lt=F("reorder_threshold")),
+            ),
+        ]
+        constraints = [
+            # NULL skus never conflict, so listings without one are unaffected.
+            models.UniqueConstraint(fields=["seller", "sku"], name="product_seller_sku_uniq"),
+        ]
 
     def __str__(self):
         return self.name
@@ -27,12 +78,30 @@ class Product(models.Model):
 
 
 class CartItem(models.Model):
-    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    # Indexed through cartitem_user_product_uniq, whose leading column is user.
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
     quantity = models.IntegerField(default=1)
 
+    class Meta:
+        constraints = [
+            # One line per product; lets get_or_create in add_to_cart survive races.
+            models.UniqueConstraint(fields=["user", "product"], name="cartitem_user_product_uniq"),
+        ]
+
     def __str__(self):
         return f"{self.user.username} - {self.product.name}"
+
+
+class CartSummary(models.Model):
+    """Running totals for a user's cart, kept in step by ``accounts.carts``."""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="cart_summary")
+    line_count = models.IntegerField(default=0)
+    item_count = models.IntegerField(default=0)
+    subtotal = amount_field(default=0)
+
+    def __str__(self):
+        return f"{self.user.username} cart ({self.line_count} lines)"
     
 from django.db import models
 from django.contrib.auth.models import User
@@ -42,13 +111,24 @@ from .models import Product  # if already imported above, remove this line
 class Order(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     order_id = models.CharField(max_length=50, unique=True)
-    subtotal = models.FloatField()
-    tax = models.FloatField()
-    total = models.FloatField()
+    subtotal = amount_field()
+    tax = amount_field()
+    total = amount_field()
     shipping_address = models.TextField(default="")
     user_name = models.CharField(max_length=100, default="")
+    # Checkout token the order was placed with; replays return this order.
+    idempotency_key = models.CharField(max_length=64, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Keyset pagination of a buyer's order history.
+            models.Index(fields=["user", "created_at", "id"], name="order_user_created_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=["user", "idempotency_key"], name="order_user_idempotency_uniq"),
+        ]
+
     def __str__(self):
         return self.order_id
 
@@ -57,7 +137,150 @@ class OrderItem(models.Model):
     order = models.ForeignKey(Order, on_delete=models.CASCADE)
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
     quantity = models.IntegerField(default=1)
-    price = models.DecimalField(max_digits=10, decimal_places=2)
+    price = price_field()
 
     def __str__(self):
         return f"{self.product.name} x {self.quantity}"
+
+
+class SellerSalesSummary(models.Model):
+    """Per-seller rollup read by the artisan dashboard.
+
+    Maintained incrementally by ``accounts.sales`` as orders are placed and
+    rebuilt from ``OrderItem`` by the ``rebuild_sales_summary`` command.
+    """
+    seller = models.OneToOneField(User, on_delete=models.CASCADE, related_name="sales_summary")
+    total_revenue = amount_field(default=0)
+    order_count = models.IntegerField(default=0)
+    units_sold = models.IntegerField(default=0)
+    low_stock_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.seller.username} sales"
+
+
+class DailySales(models.Model):
+    """Units, revenue and orders per seller, product and day.
+
+    Filled incrementally by ``accounts.reports.record_order_items`` and
+    rebuilt by the ``rebuild_daily_sales`` command.
+    """
+    seller = models.ForeignKey(User, on_delete=models.CASCADE, related_name="daily_sales")
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="daily_sales")
+    day = models.DateField()
+    units = models.IntegerField(default=0)
+    revenue = amount_field(default=0)
+    order_count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["product", "day"], name="daily_sales_product_day_uniq"),
+        ]
+        indexes = [
+            models.Index(fields=["seller", "day"], name="daily_sales_seller_day_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} on {self.day}"
+
+
+class Task(models.Model):
+    """A unit of background work for the ``run_tasks`` worker (``accounts.tasks``).
+
+    ``key`` makes enqueueing idempotent: a second task with the same key is
+    dropped. A claimed task holds a lease until ``locked_until``. When a
+    worker dies, the task is claimed again after the lease runs out.
+    """
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [(s, s) for s in (QUEUED, RUNNING, DONE, FAILED)]
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    key = models.CharField(max_length=200, unique=True, null=True, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=64, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            # Claiming due work: status = queued AND run_at <= now, oldest first.
+            models.Index(fields=["status", "run_at"], name="task_status_run_at_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+
+
+class StockHold(models.Model):
+    """Units of a product set aside for a buyer's cart until ``expires_at``.
+
+    Availability is ``stock`` minus the unexpired holds (``accounts.holds``).
+    """
+
+    # Indexed through stockhold_user_product_uniq, whose leading column is user.
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, db_index=False)
+    quantity = models.PositiveIntegerField()
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "product"], name="stockhold_user_product_uniq"),
+        ]
+        indexes = [
+            # Active holds on a product (expires_at > now), and the sweeper.
+            models.Index(fields=["product", "expires_at"], name="stockhold_product_expiry_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.quantity} x {self.product_id} for {self.user_id}"
+
+
+class Fulfillment(models.Model):
+    """One seller's share of an ``Order``, split out when the order is placed.
+
+    Sellers work through their queue (``accounts.fulfillment``) by status,
+    oldest first, without joining their whole order history.
+    """
+
+    PENDING = "pending"
+    PACKED = "packed"
+    SHIPPED = "shipped"
+    DELIVERED = "delivered"
+    CANCELLED = "cancelled"
+    STATUS_CHOICES = [(s, s) for s in (PENDING, PACKED, SHIPPED, DELIVERED, CANCELLED)]
+
+    # Indexed through fulfillment_order_seller_uniq, whose leading column is order.
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, db_index=False)
+    # Indexed through fulfillment_queue_idx, whose leading column is seller.
+    seller = models.ForeignKey(User, on_delete=models.CASCADE, related_name="fulfillments", db_index=False)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    item_count = models.PositiveIntegerField(default=0)
+    units = models.PositiveIntegerField(default=0)
+    subtotal = amount_field(default=0)
+    created_at = models.DateTimeField(default=timezone.now)  # the order's time
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["order", "seller"], name="fulfillment_order_seller_uniq"),
+        ]
+        indexes = [
+            # A seller's queue for one status, oldest first, keyset-paged on (created_at, id).
+            models.Index(fields=["seller", "status", "created_at", "id"], name="fulfillment_queue_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.order_id}/{self.seller_id} ({self.status})"
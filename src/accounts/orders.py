@@ -0,0 +1,226 @@
+"""Order placement engine.
+
+Turns a user's cart into an ``Order`` using a fixed number of queries,
+independent of how many lines the cart holds:
+
+    1. read the cart lines joined with their products
+    2. insert the ``Order``
+    3. reserve stock for every product in one conditional UPDATE that
+       leaves other buyers' stock holds (``accounts.holds``) covered
+    4. bulk insert all ``OrderItem`` rows
+    5. split the order into one ``Fulfillment`` per seller and roll the new
+       lines into the sellers' sales summaries and daily rollups
+    6. delete the cart lines that were read, the buyer's holds on them, and
+       zero the cart summary
+
+All six run inside a single transaction, so a failed reservation leaves
+stock, orders and the cart untouched.
+
+Checkout is idempotent. ``checkout_page`` issues a key
+(``new_checkout_key``) that the order form posts back, and the order is
+stored with it under a ``(user, idempotency_key)`` unique constraint. A
+replay with the same key returns the existing order before reading the
+cart. Concurrent duplicates are settled by the order insert, the first
+write of the transaction. The loser fails on the constraint (or finds the
+cart already emptied) and rolls back before touching stock, then returns
+the winner's order. Work that can wait, such as
+rendering the invoice PDF, is queued for the task worker once the
+transaction commits (``after_order_placed``), keyed on the order id.
+"""
+import re
+import uuid
+from collections import OrderedDict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, IntegerField, Prefetch, Q, Value, When
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import carts, fulfillment, holds, invoices, pricing, reports, sales, tasks
+from .models import CartItem, Order, OrderItem, Product
+from .pagination import InvalidCursor, decode_cursor, encode_cursor
+
+HISTORY_PAGE_SIZE = 20
+MAX_HISTORY_PAGE_SIZE = 100
+
+CHECKOUT_KEY_RE = re.compile(r"[A-Za-z0-9_-]{1,64}")
+
+
+class EmptyCart(Exception):
+    """Raised when an order is requested for a user with no cart lines."""
+
+
+class InsufficientStock(Exception):
+    """Raised when at least one product cannot cover the requested quantity."""
+
+
+def new_order_id():
+    return "WW-" + uuid.uuid4().hex[:8].upper()
+
+
+def new_checkout_key():
+    return uuid.uuid4().hex
+
+
+def clean_checkout_key(value):
+    """Return ``value`` if it is a usable idempotency key, else None."""
+    value = (value or "").strip()
+    return value if CHECKOUT_KEY_RE.fullmatch(value) else None
+
+
+def _placed_with(user, key):
+    return Order.objects.filter(user=user, idempotency_key=key).first() if key else None
+
+
+def _quantities_by_product(cart_items):
+    """Collapse cart lines into ``{product_id: (product, quantity)}``."""
+    lines = OrderedDict()
+    for item in cart_items:
+        product, qty = lines.get(item.product_id, (item.product, 0))
+        lines[item.product_id] = (product, qty + item.quantity)
+    return lines
+
+
+def _reserve_stock(user, lines):
+    """Decrement stock for every product in one conditional UPDATE.
+
+    The rows are locked first, in a statement of their own, so the holds
+    read next are current (see ``holds``). Each row is only updated when
+    ``stock`` covers the quantity plus what other buyers hold; if fewer rows
+    than products were updated, somebody else got there first and the whole
+    reservation is rejected (the surrounding transaction rolls it back).
+    Bumping ``updated_at`` expires the products' cached catalog fragments.
+    """
+    holds.lock_products(lines.keys())
+    wanted = Case(
+        *[When(id=pid, then=Value(qty)) for pid, (_, qty) in lines.items()],
+        output_field=IntegerField(),
+    )
+    updated = Product.objects.filter(
+        id__in=lines.keys(), stock__gte=wanted + holds.held_by_others(user.id)
+    ).update(
+        stock=F("stock") - wanted,
+        updated_at=timezone.now(),
+    )
+    if updated != len(lines):
+        raise InsufficientStock()
+
+
+def place_order(user, key=None):
+    """Create an order from ``user``'s cart and return it.
+
+    With an idempotency ``key`` that already placed one of ``user``'s
+    orders, that order is returned instead. Raises ``EmptyCart`` when there
+    is nothing to order and ``InsufficientStock`` when any product cannot
+    be reserved.
+    """
+    existing = _placed_with(user, key)
+    if existing is not None:
+        return existing
+    try:
+        return _place_order(user, key)
+    except (EmptyCart, IntegrityError):
+        # A concurrent request with the same key won the race.
+        existing = _placed_with(user, key)
+        if existing is None:
+            raise
+        return existing
+
+
+def _place_order(user, key):
+    with transaction.atomic():
+        cart_items = list(CartItem.objects.filter(user=user).select_related("product"))
+        if not cart_items:
+            raise EmptyCart()
+
+        lines = _quantities_by_product(cart_items)
+        subtotal, tax, total = pricing.order_totals(
+            sum((product.price * qty for product, qty in lines.values()), pricing.ZERO)
+        )
+
+        order = Order.objects.create(
+            user=user,
+            order_id=new_order_id(),
+            idempotency_key=key,
+            subtotal=subtotal,
+            tax=tax,
+            total=total,
+        )
+        _reserve_stock(user, lines)
+        items = OrderItem.objects.bulk_create([
+            OrderItem(order=order, product=product, quantity=qty, price=product.price)
+            for product, qty in lines.values()
+        ])
+        fulfillment.split_order(order, items)
+        sales.record_order_items(items)
+        reports.record_order_items(items, timezone.localdate(order.created_at))
+        CartItem.objects.filter(id__in=[item.id for item in cart_items]).delete()
+        holds.release(user, lines.keys())
+        carts.clear(user)
+        tasks.enqueue_on_commit(
+            after_order_placed, {"order_id": order.order_id}, key=f"order_placed:{order.order_id}"
+        )
+
+    return order
+
+
+def after_order_placed(order_id):
+    """Background side effects of a new order, run by the task worker.
+
+    Pre-renders the invoice PDF so the first download is a cache hit.
+    """
+    order = Order.objects.select_related("user").get(order_id=order_id)
+    invoices.invoice_pdf_path(order)
+
+
+def order_history(user, cursor=None, limit=HISTORY_PAGE_SIZE):
+    """Return ``(orders, next_cursor)`` for one page of ``user``'s orders, newest first.
+
+    Pages are keyed on ``(created_at, id)`` and served by
+    ``order_user_created_idx``, so a deep page costs the same as the first:
+    one query for the orders and one for their items with products.
+    """
+    limit = max(1, min(int(limit), MAX_HISTORY_PAGE_SIZE))
+    qs = Order.objects.filter(user=user)
+    if cursor:
+        created_at, order_pk = decode_cursor(cursor, 2)
+        created_at = parse_datetime(created_at) if isinstance(created_at, str) else None
+        if created_at is None or not isinstance(order_pk, int):
+            raise InvalidCursor(cursor)
+        qs = qs.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=order_pk))
+
+    page = list(
+        qs.order_by("-created_at", "-id")
+        .prefetch_related(
+            Prefetch("orderitem_set", queryset=OrderItem.objects.select_related("product").order_by("id"))
+        )[:limit + 1]
+    )
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        last = page[-1]
+        next_cursor = encode_cursor(last.created_at.isoformat(), last.id)
+    return page, next_cursor
+
+
+def serialize_order(order):
+    """JSON-ready summary of an order whose items were prefetched.
+
+    Amounts are numbers for the order history page's script.
+    """
+    return {
+        "order_id": order.order_id,
+        "created_at": order.created_at.isoformat(),
+        "subtotal": float(order.subtotal),
+        "tax": float(order.tax),
+        "total": float(order.total),
+        "items": [
+            {
+                "product_id": item.product_id,
+                "name": item.product.name,
+                "quantity": item.quantity,
+                "price": float(item.price),
+            }
+            for item in order.orderitem_set.all()
+        ],
+    }
@@ -0,0 +1,29 @@
+"""Opaque keyset-pagination cursors.
+
+A cursor is the sort key of the last row on a page, JSON encoded and
+wrapped in URL-safe base64 so it can travel in a query string untouched.
+"""
+import base64
+import binascii
+import json
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(*values):
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor, arity):
+    """Return the ``arity`` values stored in ``cursor`` as a list."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (AttributeError, TypeError, ValueError, binascii.Error):
+        raise InvalidCursor(cursor)
+    if not isinstance(values, list) or len(values) != arity:
+        raise InvalidCursor(cursor)
+    return values
@@ -0,0 +1,58 @@
+"""Money handling shared by carts, orders, invoices and reports.
+
+Every amount is a ``Decimal`` rounded to cents. Model fields come from
+``price_field``/``amount_field`` and database expressions that multiply or
+sum money use ``MONEY`` as their output field, so totals are computed by
+the database and read back as ``Decimal`` rather than ``float``. Tax is
+computed once, here, on the order subtotal.
+"""
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import models
+from django.db.models import ExpressionWrapper, F, Sum, Value
+from django.db.models.functions import Coalesce
+
+CENT = Decimal("0.01")
+ZERO = Decimal("0.00")
+TAX_RATE = Decimal("0.08")
+
+# Output field for money expressions; wide enough for any aggregate.
+MONEY = models.DecimalField(max_digits=14, decimal_places=2)
+
+
+def price_field(**kwargs):
+    """Unit price column."""
+    return models.DecimalField(max_digits=10, decimal_places=2, **kwargs)
+
+
+def amount_field(**kwargs):
+    """Column holding a total of several prices."""
+    return models.DecimalField(max_digits=12, decimal_places=2, **kwargs)
+
+
+def to_money(value):
+    """``value`` as a ``Decimal`` rounded half-up to cents; floats go through ``str``."""
+    if not isinstance(value, Decimal):
+        value = Decimal(str(value))
+    return value.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def line_total(price="price", quantity="quantity"):
+    """``price * quantity`` as a money expression over the named fields."""
+    return ExpressionWrapper(F(price) * F(quantity), output_field=MONEY)
+
+
+def sum_line_totals(price="price", quantity="quantity"):
+    """``SUM(price * quantity)``, zero rather than NULL for no rows."""
+    return Coalesce(Sum(line_total(price, quantity)), Value(ZERO), output_field=MONEY)
+
+
+def tax_for(subtotal):
+    return to_money(subtotal * TAX_RATE)
+
+
+def order_totals(subtotal):
+    """Return ``(subtotal, tax, total)`` for an order subtotal."""
+    subtotal = to_money(subtotal)
+    tax = tax_for(subtotal)
+    return subtotal, tax, subtotal + tax
@@ -0,0 +1,255 @@
+"""Bulk product import and restock for sellers.
+
+``import_products`` reads CSV (with a header row) or JSON Lines from a text
+stream one row at a time and applies it in batches of ``BATCH_SIZE``, so
+memory stays flat whatever the file size. Columns:
+
+    id     update this existing listing of the seller's
+    sku    the seller's code; rows are upserted on ``(seller, sku)``
+    name   required to create a product
+    price  required to create a product; rounded to cents
+    stock  units on hand (set, not added)
+    reorder_threshold  alert when stock falls below this (0 disables)
+
+A row with ``id``, or with a known ``sku`` and no ``name``/``price``,
+updates only the columns it gives (``bulk_update``). A row with ``sku``,
+``name`` and ``price`` is inserted or overwrites the existing product
+(``bulk_create(update_conflicts=True)``). When a key repeats within a
+batch, the last row wins.
+
+Invalid rows are counted and reported with their line number (up to
+``MAX_REPORTED_ERRORS``) and do not stop the import. Each batch commits on
+its own. Bulk writes skip model signals, so each batch reindexes search,
+reprices carts holding the products and refreshes the seller's low-stock
+count itself.
+"""
+import csv
+import json
+from collections import Counter
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import carts, pricing, sales, search
+from .models import Product
+
+BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 200
+
+FORMATS = ("csv", "jsonl")
+COLUMNS = ("id", "sku", "name", "price", "stock", "reorder_threshold")
+# Columns an upsert leaves alone on an existing product when the row omits them.
+OPTIONAL_COLUMNS = ("stock", "reorder_threshold")
+
+_NAME_LENGTH = Product._meta.get_field("name").max_length
+_SKU_LENGTH = Product._meta.get_field("sku").max_length
+_PRICE = Product._meta.get_field("price")
+_MAX_PRICE = Decimal(10) ** (_PRICE.max_digits - _PRICE.decimal_places)
+
+
+class ImportResult:
+    def __init__(self):
+        self.rows = 0
+        self.created = 0
+        self.updated = 0
+        self.error_count = 0
+        self.errors = []
+
+    def error(self, line, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": message})
+
+    def as_dict(self):
+        return {
+            "rows": self.rows,
+            "created": self.created,
+            "updated": self.updated,
+            "error_count": self.error_count,
+            "errors": self.errors,
+        }
+
+
+def format_for(filename, default="csv"):
+    """Guess the format from a file name's extension."""
+    suffix = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    return {"csv": "csv", "jsonl": "jsonl", "ndjson": "jsonl"}.get(suffix, default)
+
+
+def read_csv(stream):
+    """Yield ``(line, row, error)``; line numbers count the header as line 1."""
+    reader = csv.DictReader(stream)
+    unknown = set(reader.fieldnames or ()) - set(COLUMNS)
+    if unknown:
+        yield 1, None, f"Unknown column(s): {', '.join(sorted(unknown))}"
+        return
+    for row in reader:
+        yield reader.line_num, row, None
+
+
+def read_jsonl(stream):
+    for line, text in enumerate(stream, start=1):
+        if not text.strip():
+            continue
+        try:
+            row = json.loads(text)
+        except ValueError:
+            yield line, None, "Not valid JSON."
+            continue
+        if isinstance(row, dict):
+            yield line, row, None
+        else:
+            yield line, None, "Expected a JSON object."
+
+
+READERS = {"csv": read_csv, "jsonl": read_jsonl}
+
+
+def clean_row(row):
+    """Validate one row; return the given columns as Python values or raise ``ValueError``."""
+    values = {}
+    for column in COLUMNS:
+        raw = row.get(column)
+        if raw is None or str(raw).strip() == "":
+            continue
+        values[column] = str(raw).strip()
+
+    if "id" in values:
+        try:
+            values["id"] = int(values["id"])
+        except ValueError:
+            raise ValueError("id must be an integer.")
+    if "sku" in values and len(values["sku"]) > _SKU_LENGTH:
+        raise ValueError(f"sku is longer than {_SKU_LENGTH} characters.")
+    if "name" in values and len(values["name"]) > _NAME_LENGTH:
+        raise ValueError(f"name is longer than {_NAME_LENGTH} characters.")
+    if "price" in values:
+        try:
+            price = Decimal(values["price"])
+        except InvalidOperation:
+            raise ValueError("price must be a number.")
+        if not price.is_finite():
+            raise ValueError("price must be a number.")
+        values["price"] = pricing.to_money(price)
+        if not 0 <= values["price"] < _MAX_PRICE:
+            raise ValueError(f"price must be at least 0 and below {_MAX_PRICE}.")
+    for column in OPTIONAL_COLUMNS:
+        if column in values:
+            try:
+                values[column] = int(values[column])
+            except ValueError:
+                raise ValueError(f"{column} must be an integer.")
+            if values[column] < 0:
+                raise ValueError(f"{column} must be zero or more.")
+
+    if "id" not in values and "sku" not in values:
+        raise ValueError("Each row needs an id or a sku.")
+    if set(values) <= {"id", "sku"}:
+        raise ValueError("Nothing to update.")
+    return values
+
+
+def _apply_batch(seller, batch, result):
+    """Write one batch: ``{key: (line, values)}`` with the last row per key."""
+    now = timezone.now()
+    by_id = {values["id"]: (line, values) for line, values in batch.values() if "id" in values}
+    by_sku = {values["sku"]: (line, values) for line, values in batch.values() if "id" not in values}
+
+    existing = {}
+    if by_id:
+        existing.update(
+            (("id", p.id), p) for p in Product.objects.filter(seller=seller, id__in=by_id)
+        )
+    if by_sku:
+        existing.update(
+            (("sku", p.sku), p) for p in Product.objects.filter(seller=seller, sku__in=by_sku)
+        )
+
+    # An id row may give a listing its sku, but not one already in use.
+    renames = {values["sku"]: values["id"] for _, values in by_id.values() if "sku" in values}
+    repeated = Counter(values["sku"] for _, values in by_id.values() if "sku" in values)
+    taken = set(by_sku) | {sku for sku, n in repeated.items() if n > 1}
+    if renames:
+        taken.update(
+            Product.objects.filter(seller=seller, sku__in=renames)
+            .exclude(id__in=renames.values()).values_list("sku", flat=True)
+        )
+
+    # Upserts are grouped by which optional columns they set, so a row
+    # without a stock column leaves an existing product's stock alone.
+    upserts, updates = {}, {}
+    for kind, rows in (("id", by_id), ("sku", by_sku)):
+        for key, (line, values) in rows.items():
+            product = existing.get((kind, key))
+            if kind == "sku" and "name" in values and "price" in values:
+                upsert = Product(seller=seller, sku=key, name=values["name"], price=values["price"], updated_at=now)
+                given = tuple(column for column in OPTIONAL_COLUMNS if column in values)
+                for column in given:
+                    setattr(upsert, column, values[column])
+                upserts.setdefault(given, []).append(upsert)
+                if product is None:
+                    result.created += 1
+                else:
+                    result.updated += 1
+            elif kind == "id" and values.get("sku") in taken:
+                result.error(line, f"sku {values['sku']!r} already belongs to another product.")
+            elif product is None:
+                hint = "; name and price are needed to create one" if kind == "sku" else ""
+                result.error(line, f"You have no product with {kind} {key!r}{hint}.")
+            else:
+                fields = tuple(sorted(set(values) - {"id"}))
+                for field in fields:
+                    setattr(product, field, values[field])
+                product.updated_at = now
+                updates.setdefault(fields, []).append(product)
+                result.updated += 1
+
+    with transaction.atomic():
+        for given, products in upserts.items():
+            Product.objects.bulk_create(
+                products,
+                update_conflicts=True,
+                unique_fields=["seller", "sku"],
+                update_fields=["name", "price", "updated_at", *given],
+            )
+        for fields, products in updates.items():
+            Product.objects.bulk_update(products, [*fields, "updated_at"])
+
+        upserted = [p for products in upserts.values() for p in products]
+        changed = [p.id for p in upserted if p.id is not None]
+        if len(changed) < len(upserted):  # backends that do not return upserted ids
+            changed = list(Product.objects.filter(seller=seller, sku__in=[p.sku for p in upserted])
+                           .values_list("id", flat=True))
+        changed += [p.id for products in updates.values() for p in products]
+        if changed:
+            search.index_products(changed)
+            carts.reprice_products(changed)
+            sales.refresh_low_stock([seller.id])
+
+
+def import_products(seller, stream, fmt="csv", batch_size=BATCH_SIZE):
+    """Import ``stream`` (text) for ``seller`` and return an ``ImportResult``."""
+    if fmt not in READERS:
+        raise ValueError(f"Unsupported format {fmt!r}; use one of {', '.join(FORMATS)}.")
+    result = ImportResult()
+    batch = {}
+    for line, row, error in READERS[fmt](stream):
+        result.rows += 1
+        if error is None:
+            try:
+                values = clean_row(row)
+            except ValueError as exc:
+                error = str(exc)
+        if error is not None:
+            result.error(line, error)
+            continue
+        key = ("id", values["id"]) if "id" in values else ("sku", values["sku"])
+        batch.pop(key, None)  # the last row for a key wins
+        batch[key] = (line, values)
+        if len(batch) >= batch_size:
+            _apply_batch(seller, batch, result)
+            batch = {}
+    if batch:
+        _apply_batch(seller, batch, result)
+    return result
@@ -0,0 +1,237 @@
+"""Per-request timing collected by ``accounts.middleware.ProfilingMiddleware``.
+
+A ``RequestProfile`` is bound to the current request through a context
+variable. Database time is added by ``record_sql``, an execute wrapper that
+``install`` leaves on each connection and that times queries only while a
+profile is bound, and template time by ``TimedDjangoTemplates``, the
+template backend configured in settings. It wraps templates only while
+profiling is enabled and times just the outermost render, so includes and
+nested ``render_to_string`` calls are not counted twice.
+
+Finished profiles are folded into ``STATS``, a per-process histogram of wall
+time per view, and optionally appended as JSON Lines to
+``PROFILING["REQUEST_LOG"]``; ``summarize_log`` rebuilds the same histogram
+from that file so gunicorn workers can be read together.
+
+Settings (``settings.PROFILING``)::
+
+    ENABLED        install the middleware at all (default False)
+    SERVER_TIMING  add a ``Server-Timing`` header to responses (default True)
+    SAMPLE_RATE    fraction of requests run under cProfile (default 0)
+    PROFILE_DIR    where sampled ``.prof`` dumps are written
+    REQUEST_LOG    JSON Lines file receiving one record per request, or None
+"""
+import contextvars
+import json
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+from django.template.backends.django import DjangoTemplates, Template
+
+# Upper bounds (ms) of the wall-time buckets; the last bucket is open ended.
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+DEFAULTS = {
+    "ENABLED": False,
+    "SERVER_TIMING": True,
+    "SAMPLE_RATE": 0.0,
+    "PROFILE_DIR": None,
+    "REQUEST_LOG": None,
+}
+
+_current = contextvars.ContextVar("request_profile", default=None)
+
+
+def options():
+    return {**DEFAULTS, **getattr(settings, "PROFILING", {})}
+
+
+class RequestProfile:
+    """Timings for one request; durations are in seconds."""
+
+    def __init__(self):
+        self.view = None
+        self.wall = 0.0
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+        self.profile_path = None
+        self._render_depth = 0
+
+    def sql_wrapper(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - start
+            self.sql_count += 1
+
+    def as_record(self):
+        return {
+            "view": self.view,
+            "wall_ms": round(self.wall * 1000, 3),
+            "sql_count": self.sql_count,
+            "sql_ms": round(self.sql_time * 1000, 3),
+            "template_ms": round(self.template_time * 1000, 3),
+        }
+
+    def server_timing(self):
+        parts = [
+            f"total;dur={self.wall * 1000:.2f}",
+            f'sql;dur={self.sql_time * 1000:.2f};desc="{self.sql_count} queries"',
+            f"tpl;dur={self.template_time * 1000:.2f}",
+        ]
+        if self.profile_path:
+            parts.append('prof;desc="sampled"')
+        return ", ".join(parts)
+
+
+def start():
+    """Bind a fresh profile to the current context and return ``(profile, token)``."""
+    profile = RequestProfile()
+    return profile, _current.set(profile)
+
+
+def finish(token):
+    _current.reset(token)
+
+
+def current():
+    return _current.get()
+
+
+def record_sql(execute, sql, params, many, context):
+    """Execute wrapper timing the query into the bound profile, if any."""
+    profile = _current.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    return profile.sql_wrapper(execute, sql, params, many, context)
+
+
+def install(connection):
+    """Add ``record_sql`` to ``connection`` once; it stays for the connection's lifetime.
+
+    Async views run their queries on the connections of a worker thread,
+    not the event loop's, so wrapping per request from the middleware
+    would miss them.
+    """
+    if record_sql not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_sql)
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        profile = _current.get()
+        if profile is None:
+            return super().render(context, request)
+        profile._render_depth += 1
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            profile._render_depth -= 1
+            if not profile._render_depth:
+                profile.template_time += time.perf_counter() - start
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """``DjangoTemplates`` whose templates report render time to the active profile.
+
+    While profiling is disabled it hands out the stock templates unchanged.
+    """
+
+    def from_string(self, template_code):
+        template = super().from_string(template_code)
+        return TimedTemplate(template.template, self) if options()["ENABLED"] else template
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return TimedTemplate(template.template, self) if options()["ENABLED"] else template
+
+
+class ViewStats:
+    """Wall-time histogram plus SQL and template totals for one view."""
+
+    def __init__(self):
+        self.count = 0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+        self.wall_ms = 0.0
+        self.max_ms = 0.0
+        self.sql_count = 0
+        self.sql_ms = 0.0
+        self.template_ms = 0.0
+
+    def add(self, record):
+        self.count += 1
+        self.buckets[bisect_left(BUCKETS_MS, record["wall_ms"])] += 1
+        self.wall_ms += record["wall_ms"]
+        self.max_ms = max(self.max_ms, record["wall_ms"])
+        self.sql_count += record["sql_count"]
+        self.sql_ms += record["sql_ms"]
+        self.template_ms += record["template_ms"]
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the ``fraction`` quantile (None if open ended)."""
+        rank = fraction * self.count
+        seen = 0
+        for bound, hits in zip(BUCKETS_MS + (None,), self.buckets):
+            seen += hits
+            if seen >= rank:
+                return bound
+        return None
+
+    def as_dict(self):
+        n = self.count or 1
+        labels = [f"<={b}" for b in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}"]
+        return {
+            "count": self.count,
+            "mean_ms": round(self.wall_ms / n, 3),
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "mean_sql_count": round(self.sql_count / n, 2),
+            "mean_sql_ms": round(self.sql_ms / n, 3),
+            "mean_template_ms": round(self.template_ms / n, 3),
+            "histogram": dict(zip(labels, self.buckets)),
+        }
+
+
+class Stats:
+    """Thread-safe ``ViewStats`` per view name."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def add(self, record):
+        with self._lock:
+            self._views.setdefault(record["view"], ViewStats()).add(record)
+
+    def snapshot(self):
+        with self._lock:
+            return {view: stats.as_dict() for view, stats in sorted(self._views.items())}
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+
+STATS = Stats()
+
+
+def append_record(path, record):
+    """Append one JSON line; ``O_APPEND`` keeps lines whole across worker processes."""
+    with open(path, "a", encoding="utf-8") as fh:
+        fh.write(json.dumps(record) + "\n")
+
+
+def summarize_log(path):
+    """Build the ``Stats.snapshot`` shape from a ``REQUEST_LOG`` file."""
+    stats = Stats()
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            if line.strip():
+                stats.add(json.loads(line))
+    return stats.snapshot()
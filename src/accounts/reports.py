@@ -0,0 +1,300 @@
+"""Seller sales reporting.
+
+Time-bucketed reports are answered from ``DailySales``, a per seller,
+product and day rollup that ``record_order_items`` bumps as orders are
+placed and ``rebuild_daily_sales`` rebuilds from ``OrderItem``. Day, week
+and month reports sum those small rows instead of scanning line items.
+
+Report results are kept in the ``aggregates`` cache under a per-seller
+generation number. Recording a seller's new sales drops the generation, so
+the next read starts a fresh one and recomputes; ``rebuild_daily_sales``
+clears the alias.
+
+``export_rows`` streams a seller's ``OrderItem`` history straight from a
+server-side cursor (``.iterator(chunk_size=...)``) and the ``*_stream``
+helpers turn it into CSV or JSON Lines chunks for a
+``StreamingHttpResponse``, so an export runs in constant memory however
+many lines the seller has sold.
+"""
+import csv
+import datetime
+import itertools
+import json
+import time
+from collections import defaultdict
+from decimal import Decimal
+
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Case, Count, DateField, F, IntegerField, Sum, Value, When
+from django.db.models.functions import Trunc, TruncDate
+from django.utils import timezone
+
+from . import pricing
+from .models import DailySales, OrderItem
+
+EXPORT_CHUNK_SIZE = 2000
+STREAM_BUFFER_BYTES = 64 * 1024
+
+EXPORT_COLUMNS = (
+    "order_id",
+    "created_at",
+    "product_id",
+    "product_name",
+    "quantity",
+    "unit_price",
+    "line_total",
+)
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson",
+}
+
+REPORT_PERIODS = ("day", "week", "month")
+
+CACHE_ALIAS = "aggregates"
+
+
+def day_start(day):
+    """Aware datetime for midnight at the start of ``day`` in the current time zone."""
+    return timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+
+
+def export_rows(seller, start=None, end=None, product_id=None):
+    """Yield one tuple per ``OrderItem`` sold by ``seller`` in ``EXPORT_COLUMNS`` order.
+
+    ``start`` and ``end`` are inclusive dates.
+    """
+    qs = OrderItem.objects.filter(product__seller=seller)
+    if start is not None:
+        qs = qs.filter(order__created_at__gte=day_start(start))
+    if end is not None:
+        qs = qs.filter(order__created_at__lt=day_start(end + datetime.timedelta(days=1)))
+    if product_id is not None:
+        qs = qs.filter(product_id=product_id)
+
+    rows = qs.order_by("order__created_at", "id").values_list(
+        "order__order_id", "order__created_at", "product_id", "product__name", "quantity", "price",
+        pricing.line_total(),
+    )
+    for order_id, created_at, pid, name, quantity, price, amount in rows.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield (order_id, created_at.isoformat(), pid, name, quantity, f"{price:.2f}", f"{amount:.2f}")
+
+
+class _Echo:
+    """File-like object whose ``write`` hands the line back to ``csv.writer``."""
+
+    def write(self, value):
+        return value
+
+
+def _buffered(lines):
+    """Coalesce small lines into ~64 KiB chunks to keep socket writes few."""
+    buf, size = [], 0
+    for line in lines:
+        buf.append(line)
+        size += len(line)
+        if size >= STREAM_BUFFER_BYTES:
+            yield "".join(buf)
+            buf, size = [], 0
+    if buf:
+        yield "".join(buf)
+
+
+def csv_stream(rows):
+    writer = csv.writer(_Echo())
+    yield from _buffered(writer.writerow(row) for row in itertools.chain([EXPORT_COLUMNS], rows))
+
+
+def jsonl_stream(rows):
+    yield from _buffered(json.dumps(dict(zip(EXPORT_COLUMNS, row))) + "\n" for row in rows)
+
+
+def _generation_key(seller_id):
+    return f"reports:gen:{seller_id}"
+
+
+def _cached(seller_id, name, params, compute):
+    """Return ``compute()`` from the aggregates cache, keyed on the seller's generation."""
+    cache = caches[CACHE_ALIAS]
+    gen_key = _generation_key(seller_id)
+    generation = cache.get(gen_key)
+    if generation is None:
+        generation = time.time_ns()
+        if not cache.add(gen_key, generation, None):
+            generation = cache.get(gen_key, generation)
+    key = f"reports:{name}:{seller_id}:{generation}:" + ":".join(map(str, params))
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value)
+    return value
+
+
+def invalidate_sellers(seller_ids):
+    """Start new report generations for ``seller_ids``, now and again on commit.
+
+    The second drop covers a reader that cached pre-commit totals in between.
+    """
+    keys = [_generation_key(sid) for sid in set(seller_ids)]
+    if not keys:
+        return
+    cache = caches[CACHE_ALIAS]
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def _per_product(mapping, output_field):
+    return Case(
+        *[When(product_id=pid, then=Value(v)) for pid, v in mapping.items()],
+        default=Value(0),
+        output_field=output_field,
+    )
+
+
+def record_order_items(items, day=None):
+    """Add freshly created order items to the daily rollup.
+
+    ``items`` must have ``product`` loaded. Costs two queries whatever the
+    number of products: one insert for missing rows and one UPDATE.
+    """
+    day = day or timezone.localdate()
+    sellers = {}
+    units = defaultdict(int)
+    revenue = defaultdict(Decimal)
+    orders = defaultdict(set)
+    for item in items:
+        pid = item.product_id
+        sellers[pid] = item.product.seller_id
+        units[pid] += item.quantity
+        revenue[pid] += pricing.to_money(item.price) * item.quantity
+        orders[pid].add(item.order_id)
+
+    if not sellers:
+        return
+
+    DailySales.objects.bulk_create(
+        [DailySales(seller_id=sid, product_id=pid, day=day) for pid, sid in sellers.items()],
+        ignore_conflicts=True,
+    )
+    DailySales.objects.filter(day=day, product_id__in=sellers.keys()).update(
+        units=F("units") + _per_product(units, IntegerField()),
+        revenue=F("revenue") + _per_product(revenue, pricing.MONEY),
+        order_count=F("order_count") + _per_product({pid: len(o) for pid, o in orders.items()}, IntegerField()),
+    )
+    invalidate_sellers(sellers.values())
+
+
+def rebuild_daily_sales(since=None, batch_size=1000):
+    """Recompute ``DailySales`` from ``OrderItem``; only days from ``since`` on if given.
+
+    Returns the number of rollup rows written.
+    """
+    items = OrderItem.objects.all()
+    stale = DailySales.objects.all()
+    if since is not None:
+        items = items.filter(order__created_at__gte=day_start(since))
+        stale = stale.filter(day__gte=since)
+
+    totals = (
+        items.annotate(day=TruncDate("order__created_at"))
+        .values("product_id", "product__seller_id", "day")
+        .annotate(
+            units=Sum("quantity"),
+            revenue=pricing.sum_line_totals(),
+            orders=Count("order", distinct=True),
+        )
+        .order_by()
+    )
+
+    written = 0
+    with transaction.atomic():
+        stale.delete()
+        batch = []
+        for row in totals.iterator(chunk_size=batch_size):
+            batch.append(DailySales(
+                seller_id=row["product__seller_id"],
+                product_id=row["product_id"],
+                day=row["day"],
+                units=row["units"],
+                revenue=row["revenue"],
+                order_count=row["orders"],
+            ))
+            if len(batch) >= batch_size:
+                DailySales.objects.bulk_create(batch)
+                written += len(batch)
+                batch = []
+        DailySales.objects.bulk_create(batch)
+        written += len(batch)
+        transaction.on_commit(caches[CACHE_ALIAS].clear)
+    return written
+
+
+def sales_report(seller, period="day", start=None, end=None, product_id=None, by_product=False):
+    """Sum the seller's rollup rows into ``period`` buckets (day, week or month).
+
+    ``start``/``end`` are inclusive dates. With ``by_product`` each bucket
+    is split per product. ``order_count`` counts orders per product, so
+    bucket totals across products count an order once per product in it.
+    """
+    if period not in REPORT_PERIODS:
+        raise ValueError(period)
+    params = (period, start, end, product_id, by_product)
+    return _cached(seller.pk, "sales", params, lambda: _sales_report(seller, *params))
+
+
+def _sales_report(seller, period, start, end, product_id, by_product):
+    qs = DailySales.objects.filter(seller=seller)
+    if start is not None:
+        qs = qs.filter(day__gte=start)
+    if end is not None:
+        qs = qs.filter(day__lte=end)
+    if product_id is not None:
+        qs = qs.filter(product_id=product_id)
+
+    keys = ["bucket", "product_id", "product__name"] if by_product else ["bucket"]
+    rows = (
+        qs.annotate(bucket=Trunc("day", period, output_field=DateField()))
+        .values(*keys)
+        .annotate(units=Sum("units"), revenue=Sum("revenue"), order_count=Sum("order_count"))
+        .order_by(*keys)
+    )
+    report = []
+    for row in rows:
+        entry = {
+            "period_start": row["bucket"].isoformat(),
+            "units": row["units"],
+            "revenue": f"{row['revenue']:.2f}",
+            "order_count": row["order_count"],
+        }
+        if by_product:
+            entry["product_id"] = row["product_id"]
+            entry["product_name"] = row["product__name"]
+        report.append(entry)
+    return report
+
+
+def sales_by_product(seller, start=None, end=None):
+    """Units and revenue per product over a date range, best sellers first.
+
+    Revenue is a float for the reports page chart script.
+    """
+    return _cached(seller.pk, "by_product", (start, end), lambda: _sales_by_product(seller, start, end))
+
+
+def _sales_by_product(seller, start, end):
+    qs = DailySales.objects.filter(seller=seller)
+    if start is not None:
+        qs = qs.filter(day__gte=start)
+    if end is not None:
+        qs = qs.filter(day__lte=end)
+    rows = (
+        qs.values("product_id", "product__name")
+        .annotate(units=Sum("units"), revenue=Sum("revenue"))
+        .order_by("-revenue", "product_id")
+    )
+    return [
+        {"product": row["product__name"], "units": row["units"], "revenue": float(row["revenue"])}
+        for row in rows
+    ]
@@ -0,0 +1,117 @@
+"""Primary/replica database routing.
+
+When ``settings.DATABASES`` has a ``replica`` alias, settings install
+``PrimaryReplicaRouter`` and ``accounts.middleware.ReplicaRoutingMiddleware``.
+Every write goes to the primary (``default``). Reads also go to the primary
+unless the view is wrapped in ``replica_reads``. That covers the catalog,
+order history, reports and dashboard pages.
+
+Read-your-writes: once a request writes, its remaining reads stay on the
+primary. The response then sets a ``REPLICA_PIN_COOKIE`` so the same client
+reads from the primary for ``REPLICA_STICKY_SECONDS``. That covers
+replication lag, e.g. order history right after ``place_order``. Reads
+inside a primary transaction always use the primary too.
+
+Nothing is routed without the middleware's per-request state, so
+management commands, the shell and tests use the primary only.
+"""
+import contextvars
+import functools
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PRIMARY = DEFAULT_DB_ALIAS
+REPLICA = "replica"
+
+
+class RoutingState:
+    """Per-request routing flags set by the middleware and ``replica_reads``."""
+
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.replica_ok = False
+        self.wrote = False
+
+    def use_replica(self):
+        return self.replica_ok and not (self.pinned or self.wrote) and not connections[PRIMARY].in_atomic_block
+
+
+_state = contextvars.ContextVar("db_routing", default=None)
+
+
+def replica_configured():
+    return REPLICA in settings.DATABASES
+
+
+def sticky_seconds():
+    return getattr(settings, "REPLICA_STICKY_SECONDS", 10)
+
+
+def start(pinned=False):
+    """Bind fresh routing state to the current context; return ``(state, token)``."""
+    state = RoutingState(pinned)
+    return state, _state.set(state)
+
+
+def finish(token):
+    _state.reset(token)
+
+
+def current():
+    return _state.get()
+
+
+@contextmanager
+def read_replica():
+    """Let reads in the block use the replica, subject to stickiness."""
+    state = _state.get()
+    if state is None:
+        yield
+        return
+    previous, state.replica_ok = state.replica_ok, True
+    try:
+        yield
+    finally:
+        state.replica_ok = previous
+
+
+def replica_reads(view):
+    """View decorator (sync or async): the view's reads may be served by the replica."""
+
+    if iscoroutinefunction(view):
+
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            with read_replica():
+                return await view(request, *args, **kwargs)
+
+    else:
+
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            with read_replica():
+                return view(request, *args, **kwargs)
+
+    return wrapper
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        return REPLICA if state is not None and state.use_replica() else PRIMARY
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica is a copy of the primary, so rows from either relate.
+        aliases = {PRIMARY, REPLICA}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
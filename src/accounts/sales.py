@@ -0,0 +1,154 @@
+"""Seller sales rollups.
+
+``SellerSalesSummary`` keeps one row per seller so the artisan dashboard
+never has to walk a seller's whole ``OrderItem`` history. Rows are bumped
+in bulk when an order is placed (``record_order_items``) and can be rebuilt
+from scratch with ``rebuild`` (see the ``rebuild_sales_summary`` command).
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from . import pricing
+from .models import OrderItem, Product, SellerSalesSummary
+
+# A product is low on stock below its own reorder threshold; matches the
+# condition of the partial index product_low_stock_idx.
+LOW_STOCK = Q(stock__lt=F("reorder_threshold"))
+
+
+def _low_stock_subquery():
+    return Coalesce(
+        Subquery(
+            Product.objects.filter(LOW_STOCK, seller_id=OuterRef("seller_id"))
+            .order_by()
+            .values("seller_id")
+            .annotate(n=Count("id"))
+            .values("n")
+        ),
+        0,
+    )
+
+
+def _per_seller(mapping, output_field):
+    return Case(
+        *[When(seller_id=sid, then=Value(v)) for sid, v in mapping.items()],
+        default=Value(0),
+        output_field=output_field,
+    )
+
+
+def record_order_items(items):
+    """Add freshly created order items to their sellers' summaries.
+
+    ``items`` must have ``product`` loaded. Costs two queries however many
+    sellers the order touches: one insert for missing rows and one UPDATE.
+    """
+    revenue = defaultdict(Decimal)
+    units = defaultdict(int)
+    orders = defaultdict(set)
+    for item in items:
+        seller_id = item.product.seller_id
+        revenue[seller_id] += pricing.to_money(item.price) * item.quantity
+        units[seller_id] += item.quantity
+        orders[seller_id].add(item.order_id)
+
+    if not revenue:
+        return
+
+    SellerSalesSummary.objects.bulk_create(
+        [SellerSalesSummary(seller_id=sid) for sid in revenue],
+        ignore_conflicts=True,
+    )
+    SellerSalesSummary.objects.filter(seller_id__in=revenue.keys()).update(
+        total_revenue=F("total_revenue") + _per_seller(revenue, pricing.MONEY),
+        units_sold=F("units_sold") + _per_seller(units, IntegerField()),
+        order_count=F("order_count") + _per_seller({sid: len(o) for sid, o in orders.items()}, IntegerField()),
+        low_stock_count=_low_stock_subquery(),
+        updated_at=timezone.now(),
+    )
+
+
+def refresh_low_stock(seller_ids=None, create_missing=True):
+    """Recount low-stock products for the given sellers (all when None).
+
+    Sellers without a summary yet (no sales so far) get one first, so the
+    dashboard count always matches ``inventory.low_stock``. Two queries: an
+    insert for missing rows and one UPDATE. ``create_missing=False`` only
+    updates existing rows, e.g. while the seller is being deleted.
+    """
+    missing = seller_ids if create_missing else []
+    if missing is None:
+        missing = Product.objects.filter(LOW_STOCK).order_by().values_list("seller_id", flat=True).distinct()
+    summaries = SellerSalesSummary.objects.all()
+    if seller_ids is not None:
+        summaries = summaries.filter(seller_id__in=seller_ids)
+    with transaction.atomic():
+        SellerSalesSummary.objects.bulk_create(
+            [SellerSalesSummary(seller_id=sid) for sid in missing],
+            ignore_conflicts=True,
+            batch_size=500,
+        )
+        return summaries.update(
+            low_stock_count=_low_stock_subquery(),
+            updated_at=timezone.now(),
+        )
+
+
+def rebuild(seller_ids=None):
+    """Recompute summaries from ``OrderItem`` and ``Product``.
+
+    Rebuilds every seller when ``seller_ids`` is None. Returns the number of
+    summary rows written.
+    """
+    sold = OrderItem.objects.all()
+    products = Product.objects.all()
+    if seller_ids is not None:
+        sold = sold.filter(product__seller_id__in=seller_ids)
+        products = products.filter(seller_id__in=seller_ids)
+
+    rows = {}
+    totals = (
+        sold.values("product__seller_id")
+        .annotate(
+            revenue=pricing.sum_line_totals(),
+            units=Sum("quantity"),
+            orders=Count("order", distinct=True),
+        )
+        .order_by()
+    )
+    for row in totals:
+        rows[row["product__seller_id"]] = SellerSalesSummary(
+            seller_id=row["product__seller_id"],
+            total_revenue=row["revenue"],
+            units_sold=row["units"] or 0,
+            order_count=row["orders"],
+        )
+
+    low = (
+        products.filter(LOW_STOCK)
+        .values("seller_id")
+        .annotate(n=Count("id"))
+        .order_by()
+    )
+    for row in low:
+        summary = rows.setdefault(row["seller_id"], SellerSalesSummary(seller_id=row["seller_id"]))
+        summary.low_stock_count = row["n"]
+
+    with transaction.atomic():
+        stale = SellerSalesSummary.objects.all()
+        if seller_ids is not None:
+            stale = stale.filter(seller_id__in=seller_ids)
+        stale.delete()
+        SellerSalesSummary.objects.bulk_create(rows.values(), batch_size=500)
+
+    return len(rows)
+
+
+def summary_for(seller):
+    """Return the seller's summary, or an unsaved all-zero one."""
+    return SellerSalesSummary.objects.filter(seller=seller).first() or SellerSalesSummary(seller=seller)
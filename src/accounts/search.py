@@ -0,0 +1,176 @@
+"""Catalog search.
+
+On SQLite the catalog is indexed by a standalone FTS5 table,
+``accounts_product_fts`` (migration 0020), whose rowid is the product id.
+Product saves and deletes keep it in sync through ``accounts.signals``, and
+``ProductQuerySet`` reindexes after queryset ``update`` and ``bulk_update``
+calls that change names. ``bulk_create`` and raw SQL bypass both, so their
+callers must call ``index_products`` (or run ``rebuild_search_index``).
+Results are ranked with ``bm25`` and paged with a ``(score, id)`` keyset
+cursor, so deep pages cost the same as the first. Queries run on the
+database the router picks for reading ``Product`` (the replica under
+``replica_reads``); index writes go to the one it picks for writing.
+
+Other database backends fall back to an ``icontains`` scan ordered by id.
+"""
+import re
+
+from django.db import connections, router
+
+from . import pricing
+from .models import Product
+from .pagination import InvalidCursor, decode_cursor, encode_cursor
+
+FTS_TABLE = "accounts_product_fts"
+MAX_LIMIT = 100
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _connection(for_write=False):
+    alias = router.db_for_write(Product) if for_write else router.db_for_read(Product)
+    return connections[alias]
+
+
+def fts_available(conn=None):
+    return (conn or _connection(for_write=True)).vendor == "sqlite"
+
+
+def match_expression(query):
+    """Turn free text into an FTS5 query where every term is a prefix match.
+
+    ``"oak bo"`` becomes ``"oak"* "bo"*`` (implicit AND). Returns ``None``
+    when the query has no searchable terms.
+    """
+    terms = _TOKEN_RE.findall(query)
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def _decode(cursor):
+    score, product_id = decode_cursor(cursor, 2)
+    try:
+        return float(score), int(product_id)
+    except (TypeError, ValueError):
+        raise InvalidCursor(cursor)
+
+
+def _filters(min_price, max_price, in_stock):
+    clauses, params = [], []
+    if min_price is not None:
+        clauses.append("p.price >= %s")
+        params.append(min_price)
+    if max_price is not None:
+        clauses.append("p.price <= %s")
+        params.append(max_price)
+    if in_stock:
+        clauses.append("p.stock > 0")
+    return clauses, params
+
+
+def _search_fts(conn, match, min_price, max_price, in_stock, after, limit):
+    clauses, params = _filters(min_price, max_price, in_stock)
+    if after is not None:
+        score, product_id = after
+        clauses.append("(s.score > %s OR (s.score = %s AND p.id > %s))")
+        params += [score, score, product_id]
+    where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+    sql = f"""
+        SELECT p.id, p.name, p.price, p.stock, s.score
+        FROM (
+            SELECT rowid AS pid, bm25({FTS_TABLE}) AS score
+            FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s
+        ) s
+        JOIN accounts_product p ON p.id = s.pid
+        {where}
+        ORDER BY s.score, p.id
+        LIMIT %s
+    """
+    with conn.cursor() as cursor:
+        cursor.execute(sql, [match, *params, limit])
+        return cursor.fetchall()
+
+
+def _search_orm(query, min_price, max_price, in_stock, after, limit):
+    qs = Product.objects.all()
+    for term in _TOKEN_RE.findall(query):
+        qs = qs.filter(name__icontains=term)
+    if min_price is not None:
+        qs = qs.filter(price__gte=min_price)
+    if max_price is not None:
+        qs = qs.filter(price__lte=max_price)
+    if in_stock:
+        qs = qs.filter(stock__gt=0)
+    if after is not None:
+        qs = qs.filter(id__gt=after[1])
+    return [
+        (pid, name, price, stock, 0.0)
+        for pid, name, price, stock in qs.order_by("id").values_list("id", "name", "price", "stock")[:limit]
+    ]
+
+
+def search_products(query, min_price=None, max_price=None, in_stock=False, cursor=None, limit=20):
+    """Return ``(results, next_cursor)`` for a catalog query.
+
+    ``results`` is a list of dicts ordered best match first, with ``price``
+    as a ``Decimal``; ``next_cursor`` is ``None`` on the last page. Raises
+    ``InvalidCursor`` for a malformed cursor.
+    """
+    limit = max(1, min(int(limit), MAX_LIMIT))
+    after = _decode(cursor) if cursor else None
+    match = match_expression(query or "")
+    if match is None:
+        return [], None
+
+    conn = _connection()
+    if fts_available(conn):
+        rows = _search_fts(conn, match, min_price, max_price, in_stock, after, limit + 1)
+    else:
+        rows = _search_orm(query, min_price, max_price, in_stock, after, limit + 1)
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    results = [
+        {"id": pid, "name": name, "price": pricing.to_money(price), "stock": stock}
+        for pid, name, price, stock, _ in rows
+    ]
+    next_cursor = encode_cursor(rows[-1][4], rows[-1][0]) if has_more else None
+    return results, next_cursor
+
+
+def index_products(product_ids):
+    """(Re)index the given products; ids that no longer exist are dropped."""
+    product_ids = list(product_ids)
+    conn = _connection(for_write=True)
+    if not product_ids or not fts_available(conn):
+        return
+    placeholders = ", ".join(["%s"] * len(product_ids))
+    with conn.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", product_ids)
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}(rowid, name) "
+            f"SELECT id, name FROM accounts_product WHERE id IN ({placeholders})",
+            product_ids,
+        )
+
+
+def unindex_products(product_ids):
+    product_ids = list(product_ids)
+    conn = _connection(for_write=True)
+    if not product_ids or not fts_available(conn):
+        return
+    placeholders = ", ".join(["%s"] * len(product_ids))
+    with conn.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", product_ids)
+
+
+def rebuild_index():
+    """Repopulate the FTS index from ``accounts_product``. Returns row count."""
+    conn = _connection(for_write=True)
+    if not fts_available(conn):
+        return 0
+    with conn.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        cursor.execute(f"INSERT INTO {FTS_TABLE}(rowid, name) SELECT id, name FROM accounts_product")
+        return cursor.rowcount
@@ -0,0 +1,65 @@
+"""Model and connection signal handlers wired up in ``AccountsConfig.ready``."""
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from . import carts, sales, search
+from .models import CartItem, Product
+
+
+@receiver(post_save, sender=Product)
+def refresh_seller_low_stock(sender, instance, **kwargs):
+    sales.refresh_low_stock([instance.seller_id])
+
+
+@receiver(post_delete, sender=Product)
+def recount_seller_low_stock(sender, instance, **kwargs):
+    # A deletion can only lower the count, so a seller without a summary
+    # needs none; creating one would also fail when the seller's own
+    # deletion is what cascaded to the product.
+    sales.refresh_low_stock([instance.seller_id], create_missing=False)
+
+
+@receiver(post_save, sender=Product)
+def reprice_carts(sender, instance, created, **kwargs):
+    if not created:
+        carts.reprice_product(instance)
+
+
+@receiver(post_save, sender=Product)
+def index_product(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or "name" in update_fields:
+        search.index_products([instance.id])
+
+
+@receiver(post_delete, sender=Product)
+def unindex_product(sender, instance, **kwargs):
+    search.unindex_products([instance.id])
+
+
+@receiver(pre_delete, sender=Product)
+def note_carts_holding_product(sender, instance, **kwargs):
+    # The cascade removes the cart lines before post_delete runs.
+    instance._cart_user_ids = list(
+        CartItem.objects.filter(product=instance).values_list("user_id", flat=True)
+    )
+
+
+@receiver(post_delete, sender=Product)
+def rebuild_carts_holding_product(sender, instance, **kwargs):
+    user_ids = getattr(instance, "_cart_user_ids", None)
+    if user_ids:
+        carts.rebuild(user_ids)
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """Apply ``settings.SQLITE_PRAGMAS`` to each new SQLite connection."""
+    if connection.vendor != "sqlite":
+        return
+    pragmas = getattr(settings, "SQLITE_PRAGMAS", {})
+    if pragmas:
+        with connection.cursor() as cursor:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name} = {value}")
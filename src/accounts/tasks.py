@@ -0,0 +1,188 @@
+"""Database-backed background tasks.
+
+A task is a row in ``Task`` naming a module-level function by dotted path,
+plus JSON keyword arguments. ``enqueue`` writes the row (``enqueue_on_commit``
+waits for the surrounding transaction to commit first) and the ``run_tasks``
+worker claims due rows and calls the functions. No service besides the
+database is needed.
+
+    * Idempotency: tasks enqueued with the same ``key`` (e.g. one per
+      ``order_id``) are stored once, so replays are harmless.
+    * Claiming is one conditional UPDATE that stamps the worker's id and a
+      lease (``LEASE``). It is safe with several workers on SQLite or
+      PostgreSQL. A task whose worker died is claimed again when its lease
+      runs out.
+    * A task that raises is retried after an exponential backoff with
+      jitter (``retry_delay``) until ``max_attempts``, then marked failed
+      with its traceback.
+
+``stats`` summarises queue depth and latency for the ``task_stats``
+command.
+"""
+import os
+import random
+import socket
+import threading
+import traceback
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Min, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Task
+
+DEFAULT_MAX_ATTEMPTS = 5
+BACKOFF_BASE_SECONDS = 2
+BACKOFF_MAX_SECONDS = 600
+LEASE = timedelta(minutes=5)
+ERROR_CHARS = 4000
+
+
+def task_name(func):
+    return func if isinstance(func, str) else f"{func.__module__}.{func.__qualname__}"
+
+
+def enqueue(func, payload=None, key=None, delay=0, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """Queue ``func(**payload)``; return ``(task, created)``.
+
+    With a ``key`` already in the table, nothing is queued and the existing
+    task is returned.
+    """
+    now = timezone.now()
+    fields = {
+        "name": task_name(func),
+        "payload": payload or {},
+        "max_attempts": max_attempts,
+        "created_at": now,
+        "run_at": now + timedelta(seconds=delay),
+    }
+    if key is None:
+        return Task.objects.create(**fields), True
+    return Task.objects.get_or_create(key=key, defaults=fields)
+
+
+def enqueue_on_commit(func, payload=None, key=None, **kwargs):
+    """``enqueue`` once the current transaction commits; nothing if it rolls back."""
+    transaction.on_commit(lambda: enqueue(func, payload, key, **kwargs))
+
+
+def worker_id():
+    return f"{socket.gethostname()[:40]}:{os.getpid()}:{threading.get_ident() % 100000}"
+
+
+def retry_delay(attempts, rng=random.random):
+    """Seconds before retry number ``attempts``: doubling, capped, with 50-100% jitter."""
+    base = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** (attempts - 1))
+    return base * (0.5 + rng() / 2)
+
+
+def _due(now):
+    return Q(status=Task.QUEUED, run_at__lte=now) | Q(status=Task.RUNNING, locked_until__lt=now)
+
+
+def claim(worker, limit=1):
+    """Lease up to ``limit`` due tasks to ``worker`` and return them, oldest first."""
+    now = timezone.now()
+    ids = list(Task.objects.filter(_due(now)).order_by("run_at").values_list("id", flat=True)[:limit])
+    if not ids:
+        return []
+    # Rows another worker leased in between no longer match _due.
+    Task.objects.filter(_due(now), id__in=ids).update(
+        status=Task.RUNNING,
+        locked_by=worker,
+        locked_until=now + LEASE,
+        attempts=F("attempts") + 1,
+        started_at=now,
+    )
+    return list(Task.objects.filter(id__in=ids, locked_by=worker, status=Task.RUNNING).order_by("run_at"))
+
+
+def _finish(task, worker, **fields):
+    """Record the outcome unless the lease was lost to another worker."""
+    return Task.objects.filter(id=task.id, locked_by=worker).update(locked_by="", locked_until=None, **fields)
+
+
+def run(task, worker):
+    """Run one claimed task; return True on success."""
+    try:
+        if task.attempts > task.max_attempts:
+            raise RuntimeError("Lease expired on the last attempt.")
+        import_string(task.name)(**task.payload)
+    except Exception:
+        error = traceback.format_exc()[-ERROR_CHARS:]
+        now = timezone.now()
+        if task.attempts >= task.max_attempts:
+            _finish(task, worker, status=Task.FAILED, finished_at=now, last_error=error)
+        else:
+            retry_at = now + timedelta(seconds=retry_delay(task.attempts))
+            _finish(task, worker, status=Task.QUEUED, run_at=retry_at, last_error=error)
+        return False
+    _finish(task, worker, status=Task.DONE, finished_at=timezone.now(), last_error="")
+    return True
+
+
+def run_pending(worker=None, limit=100):
+    """Claim and run due tasks one at a time, up to ``limit``; return how many ran."""
+    worker = worker or worker_id()
+    ran = 0
+    while ran < limit:
+        claimed = claim(worker)
+        if not claimed:
+            break
+        run(claimed[0], worker)
+        ran += 1
+    return ran
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    return round(sorted_values[int(fraction * (len(sorted_values) - 1))], 3)
+
+
+def stats(window=timedelta(hours=1), sample=10_000):
+    """Queue depth and, for tasks finished within ``window``, wait and run times in seconds.
+
+    ``wait`` is creation to the start of the last attempt, so it includes
+    retry backoff.
+    """
+    now = timezone.now()
+    by_status = {
+        (row["name"], row["status"]): row["n"]
+        for row in Task.objects.values("name", "status").annotate(n=Count("id")).order_by()
+    }
+    due = Task.objects.filter(status=Task.QUEUED, run_at__lte=now)
+    oldest = due.aggregate(oldest=Min("run_at"))["oldest"]
+
+    finished = (
+        Task.objects.filter(status=Task.DONE, finished_at__gte=now - window)
+        .order_by("-finished_at")
+        .values_list("created_at", "started_at", "finished_at")[:sample]
+    )
+    waits, runs = [], []
+    for created_at, started_at, finished_at in finished:
+        waits.append((started_at - created_at).total_seconds())
+        runs.append((finished_at - started_at).total_seconds())
+    waits.sort()
+    runs.sort()
+
+    return {
+        "depth": due.count(),
+        "oldest_due_seconds": round((now - oldest).total_seconds(), 3) if oldest else None,
+        "retrying": Task.objects.filter(status=Task.QUEUED, attempts__gt=0).count(),
+        "counts": [
+            {"name": name, "status": status, "count": n} for (name, status), n in sorted(by_status.items())
+        ],
+        "finished_in_window": len(runs),
+        "wait_p50": _percentile(waits, 0.5),
+        "wait_p95": _percentile(waits, 0.95),
+        "run_p50": _percentile(runs, 0.5),
+        "run_p95": _percentile(runs, 0.95),
+    }
+
+
+def purge(older_than=timedelta(days=7)):
+    """Delete finished (done) tasks older than ``older_than``; return how many."""
+    return Task.objects.filter(status=Task.DONE, finished_at__lt=timezone.now() - older_than).delete()[0]
@@ -2,7 +2,7 @@ from django.test import TestCase, Client
 from django.urls import reverse
 from django.contrib.auth.models import User
 
-from accounts.models import UserProfile
+from accounts.models import Order, UserProfile
 
 
 class RegistrationTests(TestCase):
@@ -136,11 +136,11 @@ class PortalAccessTests(TestCase):
 
 	def test_authenticated_user_can_access_portal_pages(self):
 		self.client.login(username="buyer", password="Strong123")
+		order = Order.objects.create(user=self.user, order_id="WW-1", subtotal=0, tax=0, total=0)
 		urls = [
 			("buyer_profile", []),
 			("order_history", []),
-			("invoice_page", [1]),
-			("artisan_dashboard", []),
+			("invoice_page", [order.order_id]),
 			("create_listing", []),
 			("edit_listing", [1]),
 			("fulfillment", []),
@@ -150,3 +150,21 @@ class PortalAccessTests(TestCase):
 		for name, args in urls:
 			resp = self.client.get(reverse(name, args=args))
 			self.assertEqual(resp.status_code, 200, msg=f"{name} should be accessible when logged in")
+
+	def test_invoice_page_hides_missing_and_other_users_orders(self):
+		other = User.objects.create_user(username="other", password="Strong123")
+		Order.objects.create(user=other, order_id="WW-2", subtotal=0, tax=0, total=0)
+		self.client.login(username="buyer", password="Strong123")
+		for order_id in ("WW-404", "WW-2"):
+			resp = self.client.get(reverse("invoice_page", args=[order_id]))
+			self.assertEqual(resp.status_code, 404, msg=f"{order_id} should not be found")
+
+	def test_artisan_dashboard_is_for_artisans(self):
+		self.client.login(username="buyer", password="Strong123")
+		resp = self.client.get(reverse("artisan_dashboard"))
+		self.assertEqual(resp.status_code, 302)
+		self.assertEqual(resp["Location"], reverse("home"))
+
+		UserProfile.objects.filter(user=self.user).update(role="artisan")
+		resp = self.client.get(reverse("artisan_dashboard"))
+		self.assertEqual(resp.status_code, 200)
@@ -0,0 +1,31 @@
+import json
+import tempfile
+from pathlib import Path
+
+from django.test import TestCase, override_settings
+
+from accounts import benchmarks
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class RouteQueryScalingTests(TestCase):
+    """Fails when a route's query count starts growing with the data it serves."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_every_route_has_a_benchmark_spec(self):
+        self.assertEqual(benchmarks.unbenchmarked_routes(), [])
+
+    def test_query_counts_do_not_scale_with_data(self):
+        volumes = {
+            "few": {"buyers": 2, "products": 5, "cart_lines": 1, "orders": 3, "lines_per_order": 1},
+            "many": {"buyers": 6, "products": 40, "cart_lines": 25, "orders": 60, "lines_per_order": 3},
+        }
+        with override_settings(INVOICE_CACHE_DIR=Path(self.tmp.name)):
+            report = benchmarks.run(volumes, repeat=1)
+        self.assertEqual(report["scaling"], [], msg=json.dumps(report["routes"], indent=1))
+        for name, by_volume in report["routes"].items():
+            for volume, result in by_volume.items():
+                self.assertLess(result["status"], 400, msg=f"{name} at {volume}")
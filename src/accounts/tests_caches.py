@@ -0,0 +1,168 @@
+import datetime
+import tempfile
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+
+from django.conf import settings
+from django.test import TestCase
+from django.core.cache import caches
+from django.core.management import call_command
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.urls import reverse
+from django.utils import timezone
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from accounts import catalog, orders, reports
+from accounts import caches as caches_module
+from accounts.models import Product, CartItem
+
+
+class SQLiteCacheTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = Path(tmp.name) / "cache.sqlite3"
+        self.cache = self._open()
+
+    def _open(self, **options):
+        return caches_module.SQLiteCache(
+            str(self.path), {"TIMEOUT": 60, "KEY_PREFIX": "t", "OPTIONS": options}
+        )
+
+    def test_basic_operations(self):
+        cache = self.cache
+        cache.set("a", {"x": 1})
+        cache.set_many({"b": 2, "c": 3})
+        self.assertEqual(cache.get("a"), {"x": 1})
+        self.assertEqual(cache.get_many(["a", "b", "missing"]), {"a": {"x": 1}, "b": 2})
+        self.assertFalse(cache.add("b", 20))
+        self.assertTrue(cache.add("d", 4))
+        self.assertEqual(cache.incr("b", 5), 7)
+        with self.assertRaises(ValueError):
+            cache.incr("missing")
+        self.assertTrue(cache.delete("c"))
+        self.assertFalse(cache.has_key("c"))
+        cache.set("gone", 1, timeout=0)
+        self.assertIsNone(cache.get("gone"))
+        self.assertTrue(cache.add("gone", 2))
+        cache.clear()
+        self.assertEqual(cache.get_many(["a", "b", "d"]), {})
+
+    def test_versions_isolate_keys(self):
+        self.cache.set("k", "v1", version=1)
+        self.cache.set("k", "v2", version=2)
+        self.assertEqual(self.cache.get("k", version=1), "v1")
+        self.assertEqual(self.cache.get("k", version=2), "v2")
+
+    def test_entries_are_shared_between_processes(self):
+        self.cache.set("shared", "yes")
+        other = self._open()  # a second worker opening the same file
+        self.assertEqual(other.get("shared"), "yes")
+
+    def test_culls_past_max_entries(self):
+        cache = self._open(MAX_ENTRIES=50, CULL_FREQUENCY=2)
+        cache.set_many({f"k{i}": i for i in range(caches_module.SQLiteStore.CULL_EVERY)})
+        self.assertLessEqual(cache.entry_count(), 50)
+
+    def test_hit_and_miss_counters_are_shared(self):
+        self.cache.set("a", 1)
+        self.cache.get("a")
+        self.cache.get("nope")
+        self.cache.get_many(["a", "nope", "nada"])
+        other = self._open()
+        other.get("a")
+        other.flush_stats()
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (3, 3))
+        self.assertEqual(stats["hit_rate"], 0.5)
+        self.assertTrue(stats["shared"])
+        self.cache.reset_stats()
+        self.assertEqual(self.cache.stats()["hits"], 0)
+
+
+class CacheAliasTests(TestCase):
+    def setUp(self):
+        for alias in ("catalog", "aggregates"):
+            caches[alias].clear()
+            caches[alias].reset_stats()
+        self.seller = User.objects.create_user(username="artisan", password="pass123")
+        self.buyer = User.objects.create_user(username="buyer", password="pass123")
+        self.cup = Product.objects.create(name="Cup", price=Decimal("6.00"), stock=100, seller=self.seller)
+
+    def test_named_aliases_are_configured(self):
+        self.assertEqual(set(settings.CACHES), {"default", "sessions", "catalog", "aggregates"})
+        self.assertIsInstance(caches["catalog"], caches_module.CacheStatsMixin)
+
+    def test_locmem_get_many_counts_each_key_once(self):
+        cache = caches["catalog"]
+        cache.set("x", 1)
+        cache.get_many(["x", "y"])
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertFalse(stats["shared"])
+
+    def test_catalog_fragments_use_catalog_alias(self):
+        catalog.home_cards()
+        catalog.home_cards()
+        stats = caches["catalog"].stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+
+    def test_reports_cached_until_new_sales(self):
+        CartItem.objects.create(user=self.buyer, product=self.cup, quantity=1)
+        orders.place_order(self.buyer)
+        self.assertEqual(reports.sales_report(self.seller, "month")[0]["units"], 1)
+        with CaptureQueriesContext(connection) as ctx:
+            reports.sales_report(self.seller, "month")
+        self.assertEqual(len(ctx), 0)
+
+        CartItem.objects.create(user=self.buyer, product=self.cup, quantity=2)
+        orders.place_order(self.buyer)
+        self.assertEqual(reports.sales_report(self.seller, "month")[0]["units"], 3)
+
+    def test_cache_stats_command(self):
+        caches["catalog"].get("missing")
+        out = StringIO()
+        call_command("cache_stats", "catalog", stdout=out)
+        self.assertIn("catalog", out.getvalue())
+        self.assertIn("this process only", out.getvalue())
+
+
+class SessionEngineTests(TestCase):
+    def setUp(self):
+        caches["sessions"].clear()
+        self.user = User.objects.create_user(username="buyer", password="pass123")
+
+    def _session_queries(self, ctx):
+        return [q["sql"] for q in ctx.captured_queries if "django_session" in q["sql"]]
+
+    def test_reads_come_from_cache_and_unchanged_sessions_are_not_written(self):
+        self.assertEqual(settings.SESSION_ENGINE, "django.contrib.sessions.backends.cached_db")
+        self.client.force_login(self.user)
+        self.client.get(reverse("buyer_profile"))
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(reverse("buyer_profile"))
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(self._session_queries(ctx), [])
+
+    def test_session_survives_cache_loss(self):
+        self.client.force_login(self.user)
+        caches["sessions"].clear()
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(reverse("buyer_profile"))
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(self._session_queries(ctx)), 1)  # one read-through
+
+    def test_cleanup_removes_only_expired_sessions_in_batches(self):
+        now = timezone.now()
+        Session.objects.bulk_create(
+            [Session(session_key=f"old{i:05d}", session_data="", expire_date=now - datetime.timedelta(days=1))
+             for i in range(7)]
+            + [Session(session_key="live00000", session_data="", expire_date=now + datetime.timedelta(days=1))]
+        )
+        out = StringIO()
+        call_command("cleanup_sessions", batch_size=3, pause=0, stdout=out)
+        self.assertIn("Removed 7", out.getvalue())
+        self.assertEqual(list(Session.objects.values_list("session_key", flat=True)), ["live00000"])
@@ -0,0 +1,86 @@
+from decimal import Decimal
+
+from django.test import TestCase, Client
+from django.contrib.auth.models import User
+from django.urls import reverse
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from accounts import carts, orders
+from accounts.models import UserProfile, Product, CartItem, CartSummary
+
+
+class CartSummaryTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.buyer = User.objects.create_user(username="buyer", password="pass123")
+        UserProfile.objects.create(user=self.buyer, role="buyer")
+        seller = User.objects.create_user(username="seller", password="pass123")
+        self.mug = Product.objects.create(name="Mug", price=8.0, seller=seller)
+        self.tray = Product.objects.create(name="Tray", price=15.0, seller=seller)
+        self.client.force_login(self.buyer)
+
+    def _summary(self):
+        return CartSummary.objects.get(user=self.buyer)
+
+    def test_add_update_remove_keep_summary_in_step(self):
+        resp = self.client.post(reverse("add_to_cart"), {"product_id": self.mug.id, "quantity": 2})
+        self.assertEqual(resp.json()["cart_count"], 1)
+        self.client.post(reverse("add_to_cart"), {"product_id": self.tray.id})
+        resp = self.client.post(reverse("add_to_cart"), {"product_id": self.mug.id})
+        self.assertEqual(resp.json()["cart_count"], 2)
+
+        summary = self._summary()
+        self.assertEqual((summary.line_count, summary.item_count), (2, 4))
+        self.assertEqual(summary.subtotal, Decimal("39.00"))
+
+        mug_line = CartItem.objects.get(user=self.buyer, product=self.mug)
+        self.client.get(reverse("update_cart_quantity", args=[mug_line.id, "decrease"]))
+        self.assertEqual(self._summary().subtotal, Decimal("31.00"))
+
+        tray_line = CartItem.objects.get(user=self.buyer, product=self.tray)
+        self.client.get(reverse("remove_from_cart", args=[tray_line.id]))
+        summary = self._summary()
+        self.assertEqual((summary.line_count, summary.item_count), (1, 2))
+        self.assertEqual(summary.subtotal, Decimal("16.00"))
+
+    def test_price_change_reprices_cart(self):
+        carts.add_item(self.buyer, self.mug, 3)
+        self.mug.price = 10.0
+        self.mug.save()
+        self.assertEqual(self._summary().subtotal, Decimal("30.00"))
+
+    def test_deleting_a_product_drops_it_from_summaries(self):
+        carts.add_item(self.buyer, self.mug, 2)
+        carts.add_item(self.buyer, self.tray, 1)
+        self.mug.delete()
+        summary = carts.summary_for(self.buyer)
+        self.assertEqual((summary.line_count, summary.item_count), (1, 1))
+        self.assertEqual(summary.subtotal, Decimal("15.00"))
+
+        Product.objects.filter(pk=self.tray.pk).delete()
+        self.assertEqual(carts.summary_for(self.buyer).line_count, 0)
+
+    def test_place_order_clears_summary(self):
+        carts.add_item(self.buyer, self.mug, 1)
+        orders.place_order(self.buyer)
+        self.assertEqual(self._summary().line_count, 0)
+
+    def test_cart_page_queries_independent_of_size(self):
+        counts = []
+        for n in (1, 10):
+            for i in range(n):
+                product = Product.objects.create(name=f"P{n}-{i}", price=1.0, seller=self.mug.seller)
+                carts.add_item(self.buyer, product)
+            with CaptureQueriesContext(connection) as ctx:
+                self.client.get(reverse("shopping_cart"))
+            counts.append(len(ctx))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_rebuild_matches_incremental(self):
+        carts.add_item(self.buyer, self.mug, 2)
+        carts.add_item(self.buyer, self.tray, 1)
+        before = CartSummary.objects.values("line_count", "item_count", "subtotal").get(user=self.buyer)
+        carts.rebuild()
+        after = CartSummary.objects.values("line_count", "item_count", "subtotal").get(user=self.buyer)
+        self.assertEqual(before, after)
@@ -0,0 +1,49 @@
+from django.test import TestCase, Client
+from django.core.cache import caches
+from django.contrib.auth.models import User
+from django.urls import reverse
+from unittest.mock import patch
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from accounts import catalog
+from accounts.models import Product
+
+
+class CatalogFragmentTests(TestCase):
+    def setUp(self):
+        caches["catalog"].clear()
+        self.client = Client()
+        self.seller = User.objects.create_user(username="seller", password="pass123", first_name="Ola")
+        self.bowl = Product.objects.create(name="Cedar bowl", price=30.0, stock=4, seller=self.seller)
+        self.box = Product.objects.create(name="Pine box", price=12.0, stock=0, seller=self.seller)
+
+    def test_home_page_lists_products(self):
+        resp = self.client.get(reverse("home"))
+        self.assertContains(resp, "Cedar bowl")
+        self.assertContains(resp, "Pine box")
+        self.assertContains(resp, "Out of stock")
+
+    def test_home_page_served_from_cache(self):
+        self.client.get(reverse("home"))
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse("home"))
+        self.assertEqual(len(ctx), 1)  # only the (id, updated_at) listing
+
+    def test_edit_invalidates_only_that_product(self):
+        self.client.get(reverse("home"))
+        self.bowl.name = "Cedar salad bowl"
+        self.bowl.save()
+        with patch("accounts.catalog.render_to_string", wraps=catalog.render_to_string) as render:
+            resp = self.client.get(reverse("home"))
+        self.assertContains(resp, "Cedar salad bowl")
+        self.assertEqual(render.call_count, 1)
+
+    def test_product_details(self):
+        buyer = User.objects.create_user(username="buyer", password="pass123")
+        self.client.force_login(buyer)
+        resp = self.client.get(reverse("product_details", args=[self.bowl.id]))
+        self.assertContains(resp, "Cedar bowl")
+        self.assertContains(resp, "In stock: 4 available")
+        resp = self.client.get(reverse("product_details", args=[9999]))
+        self.assertEqual(resp.status_code, 404)
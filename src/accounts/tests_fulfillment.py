@@ -0,0 +1,82 @@
+from decimal import Decimal
+
+from django.test import TestCase, Client
+from django.contrib.auth.models import User
+from django.urls import reverse
+
+from accounts import fulfillment, orders
+from accounts.models import UserProfile, Product, CartItem, Fulfillment, Order, OrderItem
+
+
+class FulfillmentQueueTests(TestCase):
+    def setUp(self):
+        self.buyer = User.objects.create_user(username="buyer", password="pass123")
+        self.seller = User.objects.create_user(username="seller", password="pass123")
+        self.other = User.objects.create_user(username="other", password="pass123")
+        UserProfile.objects.create(user=self.seller, role="artisan")
+        self.mine = Product.objects.create(name="Oak tray", price=12, stock=100, seller=self.seller)
+        self.theirs = Product.objects.create(name="Elm cup", price=7, stock=100, seller=self.other)
+
+    def _order(self, mine=1, theirs=0):
+        if mine:
+            CartItem.objects.create(user=self.buyer, product=self.mine, quantity=mine)
+        if theirs:
+            CartItem.objects.create(user=self.buyer, product=self.theirs, quantity=theirs)
+        return orders.place_order(self.buyer)
+
+    def test_orders_are_split_per_seller(self):
+        order = self._order(mine=2, theirs=3)
+        shares = {f.seller_id: (f.status, f.units, f.subtotal) for f in Fulfillment.objects.filter(order=order)}
+        self.assertEqual(shares, {
+            self.seller.id: ("pending", 2, Decimal("24.00")),
+            self.other.id: ("pending", 3, Decimal("21.00")),
+        })
+
+    def test_queue_pages_oldest_first_with_only_the_sellers_lines(self):
+        placed = [self._order(mine=1, theirs=1).order_id for _ in range(5)]
+        seen, cursor = [], None
+        while True:
+            with self.assertNumQueries(2):
+                page, cursor = fulfillment.queue(self.seller, cursor=cursor, limit=2)
+            for entry in map(fulfillment.serialize, page):
+                self.assertEqual([item["name"] for item in entry["items"]], ["Oak tray"])
+                seen.append(entry["order_id"])
+            if cursor is None:
+                break
+        self.assertEqual(seen, placed)
+        with self.assertRaises(ValueError):
+            fulfillment.queue(self.seller, status="lost")
+
+    def test_status_moves_forward_only(self):
+        self._order()
+        entry = Fulfillment.objects.get(seller=self.seller)
+        client = Client()
+        client.force_login(self.seller)
+        url = reverse("update_fulfillment", args=[entry.id])
+
+        self.assertEqual(client.post(url, {"status": "shipped"}).status_code, 200)
+        self.assertEqual(client.post(url, {"status": "packed"}).status_code, 409)
+        self.assertEqual(client.post(url, {"status": "lost"}).status_code, 400)
+        self.assertFalse(fulfillment.set_status(self.other, entry.id, "delivered"))
+        data = client.get(reverse("fulfillment_queue"), {"status": "shipped"}).json()
+        self.assertEqual([f["id"] for f in data["fulfillments"]], [entry.id])
+
+        client.force_login(self.other)
+        self.assertEqual(client.post(url, {"status": "delivered"}).status_code, 404)
+
+    def test_seller_endpoints_refuse_non_artisans(self):
+        client = Client()
+        client.force_login(self.buyer)
+        for name in ("fulfillment_queue", "inventory_low_stock", "sales_report"):
+            with self.subTest(name):
+                resp = client.get(reverse(name))
+                self.assertEqual(resp.status_code, 403)
+                self.assertFalse(resp.json()["success"])
+        self.assertEqual(client.post(reverse("import_products")).status_code, 403)
+
+    def test_backfill_splits_orders_without_fulfillments(self):
+        order = Order.objects.create(user=self.buyer, order_id="WW-OLD", subtotal=0, tax=0, total=0)
+        OrderItem.objects.create(order=order, product=self.mine, quantity=2, price=12)
+        self.assertEqual(fulfillment.backfill(), 1)
+        self.assertEqual(fulfillment.backfill(), 0)
+        self.assertEqual(Fulfillment.objects.get(order=order).subtotal, Decimal("24.00"))
@@ -0,0 +1,113 @@
+import datetime
+from io import StringIO
+
+from django.test import TestCase, Client
+from django.core.management import call_command
+from django.contrib.auth.models import User
+from django.urls import reverse
+from django.utils import timezone
+from unittest.mock import patch
+
+from accounts import holds, orders
+from accounts.models import UserProfile, Product, CartItem, StockHold
+
+
+class StockHoldTests(TestCase):
+    def setUp(self):
+        seller = User.objects.create_user(username="seller", password="pass123")
+        self.buyer = User.objects.create_user(username="buyer", password="pass123")
+        self.rival = User.objects.create_user(username="rival", password="pass123")
+        for user in (self.buyer, self.rival):
+            UserProfile.objects.create(user=user, role="buyer")
+        self.product = Product.objects.create(name="Vase", price=40, stock=3, seller=seller)
+
+    def test_holds_reduce_availability_for_other_buyers(self):
+        self.assertEqual(holds.hold(self.buyer, {self.product.id: 2}), {})
+        self.assertEqual(holds.available([self.product.id]), {self.product.id: 1})
+        self.assertEqual(holds.available([self.product.id], self.buyer), {self.product.id: 3})
+        self.assertEqual(holds.hold(self.rival, {self.product.id: 2}), {self.product.id: 1})
+        self.assertEqual(holds.hold(self.rival, {self.product.id: 1}), {})
+        with self.assertNumQueries(1):
+            holds.available([self.product.id])
+
+    def test_expired_holds_stop_counting_and_are_swept(self):
+        holds.hold(self.buyer, {self.product.id: 3})
+        StockHold.objects.update(expires_at=timezone.now() - datetime.timedelta(seconds=1))
+        self.assertEqual(holds.available([self.product.id]), {self.product.id: 3})
+        out = StringIO()
+        call_command("sweep_holds", stdout=out)
+        self.assertIn("Removed 1 expired hold(s).", out.getvalue())
+        self.assertFalse(StockHold.objects.exists())
+
+    def test_order_cannot_take_units_held_by_others(self):
+        holds.hold(self.rival, {self.product.id: 2})
+        CartItem.objects.create(user=self.buyer, product=self.product, quantity=2)
+        with self.assertRaises(orders.InsufficientStock):
+            orders.place_order(self.buyer)
+
+        CartItem.objects.filter(user=self.buyer).update(quantity=1)
+        holds.hold_cart(self.buyer)
+        orders.place_order(self.buyer)
+        self.assertEqual(Product.objects.get(pk=self.product.pk).stock, 2)
+        self.assertEqual(list(StockHold.objects.values_list("user__username", flat=True)), ["rival"])
+
+    def test_removing_a_line_releases_its_hold_atomically(self):
+        client = Client()
+        client.force_login(self.buyer)
+        client.post(reverse("add_to_cart"), {"product_id": self.product.id, "quantity": 2})
+        item = CartItem.objects.get(user=self.buyer)
+
+        with patch.object(holds, "release", side_effect=RuntimeError("lost connection")):
+            with self.assertRaises(RuntimeError):
+                client.get(reverse("remove_from_cart", args=[item.id]))
+        self.assertTrue(CartItem.objects.filter(pk=item.pk).exists())
+
+        client.get(reverse("remove_from_cart", args=[item.id]))
+        self.assertFalse(CartItem.objects.exists())
+        self.assertFalse(StockHold.objects.exists())
+
+    def test_add_to_cart_rejects_bad_quantities(self):
+        client = Client()
+        client.force_login(self.buyer)
+        for quantity in ("-1", "0", "two"):
+            with self.subTest(quantity):
+                resp = client.post(reverse("add_to_cart"), {"product_id": self.product.id, "quantity": quantity})
+                self.assertEqual(resp.status_code, 400)
+                self.assertFalse(resp.json()["success"])
+        self.assertFalse(CartItem.objects.exists())
+        self.assertFalse(StockHold.objects.exists())
+
+    def test_add_to_cart_and_checkout_take_holds(self):
+        holds.hold(self.rival, {self.product.id: 2})
+        client = Client()
+        client.force_login(self.buyer)
+        resp = client.post(reverse("add_to_cart"), {"product_id": self.product.id, "quantity": 2})
+        self.assertEqual(resp.status_code, 409)
+        self.assertEqual(resp.json()["available"], 1)
+        self.assertFalse(CartItem.objects.filter(user=self.buyer).exists())
+
+        resp = client.post(reverse("add_to_cart"), {"product_id": self.product.id, "quantity": 1})
+        self.assertTrue(resp.json()["success"])
+        self.assertEqual(StockHold.objects.get(user=self.buyer).quantity, 1)
+
+        self.assertEqual(client.get(reverse("checkout")).status_code, 200)
+        self.product.stock = 2
+        self.product.save()
+        self.assertRedirects(client.get(reverse("checkout")), reverse("shopping_cart"), fetch_redirect_response=False)
+
+    def test_changing_a_line_moves_its_hold(self):
+        client = Client()
+        client.force_login(self.buyer)
+        client.post(reverse("add_to_cart"), {"product_id": self.product.id, "quantity": 1})
+        client.post(reverse("add_to_cart"), {"product_id": self.product.id, "quantity": 1})
+        self.assertEqual(StockHold.objects.get(user=self.buyer).quantity, 2)
+
+        item = CartItem.objects.get(user=self.buyer)
+        client.post(reverse("update_cart_quantity", args=[item.id, "decrease"]))
+        self.assertEqual(StockHold.objects.get(user=self.buyer).quantity, 1)
+        self.assertEqual(holds.available([self.product.id]), {self.product.id: 2})
+
+        holds.hold(self.rival, {self.product.id: 2})
+        client.post(reverse("update_cart_quantity", args=[item.id, "increase"]))
+        self.assertEqual(CartItem.objects.get(pk=item.pk).quantity, 1)
+        self.assertEqual(StockHold.objects.get(user=self.buyer).quantity, 1)
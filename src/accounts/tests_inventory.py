@@ -0,0 +1,69 @@
+import json
+from io import StringIO
+
+from django.test import TestCase, Client
+from django.core.management import call_command
+from django.contrib.auth.models import User
+from django.urls import reverse
+from django.db import connection
+
+from accounts import inventory, product_import, sales
+from accounts.models import UserProfile, Product, SellerSalesSummary
+
+
+class LowStockAlertTests(TestCase):
+    def setUp(self):
+        self.seller = User.objects.create_user(username="seller", password="pass123")
+        UserProfile.objects.create(user=self.seller, role="artisan")
+        self.low = Product.objects.create(name="Ash bowl", price=20, stock=3, seller=self.seller)
+        Product.objects.create(name="Elm spoon", price=5, stock=3, reorder_threshold=2, seller=self.seller)
+        Product.objects.create(name="Sold-out print", price=5, stock=0, reorder_threshold=0, seller=self.seller)
+
+    def test_thresholds_are_per_product(self):
+        with self.assertNumQueries(1):
+            rows = inventory.low_stock_rows(self.seller)
+        self.assertEqual([(r["name"], r["shortfall"]) for r in rows], [("Ash bowl", 2)])
+
+        Product.objects.filter(pk=self.low.pk).update(reorder_threshold=3)
+        self.assertEqual(inventory.low_stock_rows(self.seller), [])
+
+    def test_endpoint_lists_the_sellers_at_risk_products(self):
+        client = Client()
+        client.force_login(self.seller)
+        data = client.get(reverse("inventory_low_stock")).json()
+        self.assertEqual((data["count"], data["products"][0]["product_id"]), (1, self.low.id))
+
+    def test_sellers_without_sales_get_a_count(self):
+        SellerSalesSummary.objects.all().delete()
+        self.assertEqual(sales.refresh_low_stock([self.seller.id]), 1)
+        self.assertEqual(SellerSalesSummary.objects.get(seller=self.seller).low_stock_count, 1)
+
+        SellerSalesSummary.objects.all().delete()
+        call_command("low_stock_digest", stdout=StringIO())
+        self.assertEqual(SellerSalesSummary.objects.get(seller=self.seller).low_stock_count, 1)
+
+    def test_deleting_a_seller_with_products(self):
+        self.seller.delete()
+        connection.check_constraints()
+        self.assertFalse(SellerSalesSummary.objects.exists())
+        self.assertFalse(Product.objects.exists())
+
+    def test_import_sets_thresholds_and_refreshes_the_count(self):
+        self.assertEqual(SellerSalesSummary.objects.get(seller=self.seller).low_stock_count, 1)
+        product_import.import_products(
+            self.seller, StringIO(f"id,reorder_threshold\n{self.low.id},0\n"), "csv"
+        )
+        self.assertEqual(SellerSalesSummary.objects.get(seller=self.seller).low_stock_count, 0)
+
+    def test_digest_command_batches_every_seller_in_one_pass(self):
+        other = User.objects.create_user(username="other", password="pass123")
+        Product.objects.create(name="Oak stool", price=30, stock=1, seller=other)
+        with self.assertNumQueries(1):
+            batches = list(inventory.digests())
+        self.assertEqual([sid for sid, _ in batches], sorted([self.seller.id, other.id]))
+
+        out = StringIO()
+        call_command("low_stock_digest", "--json", stdout=out)
+        lines = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([len(line["products"]) for line in lines], [1, 1])
+        self.assertEqual(SellerSalesSummary.objects.get(seller=other).low_stock_count, 1)
@@ -0,0 +1,46 @@
+from django.test import TestCase, RequestFactory
+from django.contrib.auth.models import User
+from unittest.mock import patch
+from django.http import HttpResponse
+
+from accounts.middleware import LoginRequiredMiddleware, PrefixTrie, PublicPathMatcher
+from accounts.models import UserProfile
+
+
+class PublicPathCachingTests(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.user = User.objects.create_user(username="mw", password="pass123")
+        UserProfile.objects.create(user=self.user, role="buyer")
+
+    def test_resolve_cached_per_path(self):
+        class Match: url_name = 'profile'
+        mw = LoginRequiredMiddleware(lambda r: HttpResponse("OK"))
+        with patch("accounts.middleware.resolve", return_value=Match()) as resolve:
+            for _ in range(3):
+                req = self.factory.get("/profile/")
+                req.user = self.user
+                mw(req)
+        self.assertEqual(resolve.call_count, 1)
+
+
+class PublicPathMatcherTests(TestCase):
+    def test_prefix_trie(self):
+        trie = PrefixTrie(["/static/", "/admin/"])
+        self.assertTrue(trie.matches("/static/app.js"))
+        self.assertTrue(trie.matches("/admin/"))
+        self.assertFalse(trie.matches("/stat"))
+        self.assertFalse(trie.matches("/profile/"))
+
+    def test_exact_and_prefix_skip_resolve(self):
+        matcher = PublicPathMatcher({"/"}, ("/media/",), {"home"})
+        with patch("accounts.middleware.resolve") as resolve:
+            self.assertTrue(matcher.is_public("/"))
+            self.assertTrue(matcher.is_public("/media/a.png"))
+        resolve.assert_not_called()
+
+    def test_cache_is_bounded(self):
+        matcher = PublicPathMatcher(set(), (), {"home"}, cache_size=4)
+        for i in range(10):
+            matcher.is_public(f"/ghost/{i}/")
+        self.assertEqual(matcher.is_public.cache_info().currsize, 4)
@@ -0,0 +1,230 @@
+import sqlite3
+import tempfile
+import threading
+from decimal import Decimal
+from pathlib import Path
+
+from django.test import TestCase, TransactionTestCase, Client
+from django.contrib.auth.models import User
+from django.urls import reverse
+from unittest.mock import patch
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from accounts import orders
+from accounts.models import UserProfile, Product, CartItem, Order, OrderItem
+
+
+class PlaceOrderTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.buyer = User.objects.create_user(username="buyer", password="pass123")
+        self.seller = User.objects.create_user(username="seller", password="pass123")
+        UserProfile.objects.create(user=self.buyer, role="buyer")
+
+    def _fill_cart(self, lines, stock=10):
+        for i in range(lines):
+            product = Product.objects.create(
+                name=f"Bowl {i}", price=10.0, stock=stock, seller=self.seller
+            )
+            CartItem.objects.create(user=self.buyer, product=product, quantity=2)
+
+    def test_place_order_creates_items_and_reserves_stock(self):
+        self._fill_cart(3)
+        order = orders.place_order(self.buyer)
+
+        self.assertEqual(OrderItem.objects.filter(order=order).count(), 3)
+        self.assertFalse(CartItem.objects.filter(user=self.buyer).exists())
+        self.assertEqual(set(Product.objects.values_list("stock", flat=True)), {8})
+        self.assertEqual(order.subtotal, Decimal("60.00"))
+        self.assertEqual(order.tax, Decimal("4.80"))
+        self.assertEqual(order.total, Decimal("64.80"))
+
+    def test_query_count_independent_of_cart_size(self):
+        counts = []
+        for lines in (1, 25):
+            CartItem.objects.all().delete()
+            self._fill_cart(lines)
+            with CaptureQueriesContext(connection) as ctx:
+                orders.place_order(self.buyer)
+            counts.append(len(ctx))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_insufficient_stock_rolls_back(self):
+        self._fill_cart(2)
+        Product.objects.filter(name="Bowl 1").update(stock=1)
+
+        with self.assertRaises(orders.InsufficientStock):
+            orders.place_order(self.buyer)
+
+        self.assertEqual(Order.objects.count(), 0)
+        self.assertEqual(CartItem.objects.filter(user=self.buyer).count(), 2)
+        self.assertEqual(Product.objects.get(name="Bowl 0").stock, 10)
+
+    def test_view_redirects_to_invoice(self):
+        self._fill_cart(1)
+        self.client.force_login(self.buyer)
+        resp = self.client.post(reverse("place_order"))
+        order = Order.objects.get(user=self.buyer)
+        self.assertEqual(resp.status_code, 302)
+        self.assertIn(order.order_id, resp["Location"])
+
+    def test_view_empty_cart_redirects_to_cart(self):
+        self.client.force_login(self.buyer)
+        resp = self.client.post(reverse("place_order"))
+        self.assertRedirects(resp, reverse("shopping_cart"), fetch_redirect_response=False)
+
+
+class OrderHistoryTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.buyer = User.objects.create_user(username="buyer", password="pass123")
+        seller = User.objects.create_user(username="seller", password="pass123")
+        self.products = [
+            Product.objects.create(name=f"Vase {i}", price=5.0, stock=1000, seller=seller) for i in range(3)
+        ]
+        self.client.force_login(self.buyer)
+
+    def _place(self, count):
+        for _ in range(count):
+            for product in self.products:
+                CartItem.objects.create(user=self.buyer, product=product, quantity=1)
+            orders.place_order(self.buyer)
+
+    def test_pages_cover_every_order_newest_first(self):
+        self._place(7)
+        seen, cursor = [], None
+        while True:
+            params = {"format": "json", "limit": 3}
+            if cursor:
+                params["cursor"] = cursor
+            data = self.client.get(reverse("order_history"), params).json()
+            seen += [o["order_id"] for o in data["orders"]]
+            cursor = data["next_cursor"]
+            if cursor is None:
+                break
+        expected = list(Order.objects.order_by("-created_at", "-id").values_list("order_id", flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_deep_page_costs_same_as_first(self):
+        self._place(6)
+        _, cursor = orders.order_history(self.buyer, limit=2)
+        with CaptureQueriesContext(connection) as first:
+            orders.order_history(self.buyer, limit=2)
+        _, cursor = orders.order_history(self.buyer, cursor=cursor, limit=2)
+        with CaptureQueriesContext(connection) as deep:
+            page, _ = orders.order_history(self.buyer, cursor=cursor, limit=2)
+            [item.product.name for order in page for item in order.orderitem_set.all()]
+        self.assertEqual(len(first), 2)
+        self.assertEqual(len(deep), 2)
+
+    def test_html_page_renders(self):
+        self._place(1)
+        resp = self.client.get(reverse("order_history"))
+        self.assertEqual(resp.status_code, 200)
+        self.assertContains(resp, Order.objects.get().order_id)
+
+    def test_bad_cursor_rejected(self):
+        resp = self.client.get(reverse("order_history"), {"format": "json", "cursor": "garbage"})
+        self.assertEqual(resp.status_code, 400)
+
+
+class CheckoutIdempotencyTests(TestCase):
+    def setUp(self):
+        self.buyer = User.objects.create_user(username="buyer", password="pass123")
+        seller = User.objects.create_user(username="seller", password="pass123")
+        UserProfile.objects.create(user=self.buyer, role="buyer")
+        self.product = Product.objects.create(name="Jug", price=10, stock=10, seller=seller)
+        CartItem.objects.create(user=self.buyer, product=self.product, quantity=2)
+
+    def test_replayed_key_returns_order_without_queries_on_cart_or_stock(self):
+        first = orders.place_order(self.buyer, "key-1")
+        CartItem.objects.create(user=self.buyer, product=self.product, quantity=1)
+
+        with CaptureQueriesContext(connection) as ctx:
+            again = orders.place_order(self.buyer, "key-1")
+        self.assertEqual(again.order_id, first.order_id)
+        self.assertEqual(len(ctx), 1)
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(Product.objects.get(pk=self.product.pk).stock, 8)
+        self.assertEqual(CartItem.objects.filter(user=self.buyer).count(), 1)
+
+    def test_keys_are_scoped_to_the_user(self):
+        other = User.objects.create_user(username="other", password="pass123")
+        CartItem.objects.create(user=other, product=self.product, quantity=1)
+        mine = orders.place_order(self.buyer, "shared")
+        theirs = orders.place_order(other, "shared")
+        self.assertNotEqual(mine.order_id, theirs.order_id)
+
+    def test_view_uses_key_issued_by_checkout_page(self):
+        client = Client()
+        client.force_login(self.buyer)
+        key = client.get(reverse("checkout")).context["checkout_key"]
+        first = client.post(reverse("place_order"), {"idempotency_key": key})
+        second = client.post(reverse("place_order"), {"idempotency_key": key})
+        order = Order.objects.get(user=self.buyer)
+        self.assertEqual(order.idempotency_key, key)
+        self.assertEqual(first["Location"], second["Location"])
+        self.assertIn(order.order_id, second["Location"])
+
+    def test_malformed_keys_are_ignored(self):
+        self.assertIsNone(orders.clean_checkout_key("x" * 65))
+        self.assertIsNone(orders.clean_checkout_key("a b"))
+        self.assertEqual(orders.clean_checkout_key(" abc-1 "), "abc-1")
+
+
+class ConcurrentCheckoutTests(TransactionTestCase):
+    # Threads share the in-memory test database through SQLite's shared
+    # cache, whose table locks fail at once instead of waiting, so the race
+    # runs against a file copy with the usual pragmas.
+    def _use_file_copy(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = Path(tmp.name) / "race.sqlite3"
+        target = sqlite3.connect(path)
+        connection.ensure_connection()
+        connection.connection.backup(target)
+        target.close()
+        override = patch.dict(connection.settings_dict, NAME=str(path))
+        override.start()
+        self.addCleanup(override.stop)
+
+    def _in_threads(self, *funcs):
+        results, errors = [], []
+        barrier = threading.Barrier(len(funcs))
+
+        def call(func):
+            try:
+                barrier.wait()
+                results.append(func())
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=call, args=(func,)) for func in funcs]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return results, errors
+
+    def test_concurrent_duplicates_place_one_order(self):
+        buyer = User.objects.create_user(username="buyer", password="pass123")
+        seller = User.objects.create_user(username="seller", password="pass123")
+        product = Product.objects.create(name="Jug", price=10, stock=10, seller=seller)
+        CartItem.objects.create(user=buyer, product=product, quantity=2)
+        self._use_file_copy()
+
+        results, errors = self._in_threads(*[lambda: orders.place_order(buyer, "double-click").order_id] * 4)
+        self.assertEqual(errors, [])
+        self.assertEqual(len(results), 4)
+        self.assertEqual(len(set(results)), 1)
+
+        [state], _ = self._in_threads(lambda: (
+            list(Order.objects.values_list("order_id", flat=True)),
+            list(OrderItem.objects.values_list("quantity", flat=True)),
+            Product.objects.get(pk=product.pk).stock,
+            CartItem.objects.count(),
+        ))
+        self.assertEqual(state, ([results[0]], [2], 8, 0))
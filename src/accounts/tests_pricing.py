@@ -0,0 +1,52 @@
+from decimal import Decimal
+
+from django.test import TestCase
+from django.contrib.auth.models import User
+from django.urls import reverse
+
+from accounts import carts, orders, pricing, reports, sales
+from accounts.models import Product
+
+
+class DecimalMoneyTests(TestCase):
+    def setUp(self):
+        self.seller = User.objects.create_user("seller", "s@example.com", "pw-123456")
+        self.buyer = User.objects.create_user("buyer", "b@example.com", "pw-123456")
+        # 0.1 + 0.2 style prices drift in float arithmetic.
+        self.a = Product.objects.create(name="A", price=Decimal("0.10"), stock=100, seller=self.seller)
+        self.b = Product.objects.create(name="B", price=Decimal("0.20"), stock=100, seller=self.seller)
+        self.c = Product.objects.create(name="C", price=Decimal("19.99"), stock=100, seller=self.seller)
+
+    def test_order_totals_round_tax_half_up_once(self):
+        self.assertEqual(pricing.order_totals(Decimal("10.06")), (Decimal("10.06"), Decimal("0.80"), Decimal("10.86")))
+        self.assertEqual(pricing.tax_for(Decimal("10.0625")), Decimal("0.81"))  # 0.805 rounds up
+        self.assertEqual(pricing.to_money(19.990000000000002), Decimal("19.99"))
+
+    def test_cart_order_and_rollups_stay_exact(self):
+        for product, qty in ((self.a, 1), (self.b, 1), (self.c, 3)):
+            carts.add_item(self.buyer, product, qty)
+        self.assertEqual(carts.summary_for(self.buyer).subtotal, Decimal("60.27"))
+
+        order = orders.place_order(self.buyer)
+        order.refresh_from_db()
+        self.assertEqual((order.subtotal, order.tax, order.total), pricing.order_totals(Decimal("60.27")))
+        self.assertIsInstance(order.total, Decimal)
+
+        self.assertEqual(sales.summary_for(self.seller).total_revenue, Decimal("60.27"))
+        sales.rebuild()
+        self.assertEqual(sales.summary_for(self.seller).total_revenue, Decimal("60.27"))
+        reports.rebuild_daily_sales()
+        [bucket] = reports.sales_report(self.seller, "month")
+        self.assertEqual(bucket["revenue"], "60.27")
+
+        carts.add_item(self.buyer, self.a, 3)
+        carts.rebuild([self.buyer])
+        self.assertEqual(carts.summary_for(self.buyer).subtotal, Decimal("0.30"))
+
+    def test_checkout_shows_server_tax(self):
+        carts.add_item(self.buyer, self.c, 1)
+        self.client.force_login(self.buyer)
+        resp = self.client.get(reverse("checkout"))
+        self.assertEqual(resp.context["tax"], Decimal("1.60"))
+        self.assertEqual(resp.context["total"], Decimal("21.59"))
+        self.assertContains(resp, "const TAX = 0.08;")
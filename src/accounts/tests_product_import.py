@@ -0,0 +1,90 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.test import TestCase
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.contrib.auth.models import User
+from django.urls import reverse
+
+from accounts import carts, product_import, sales, search
+from accounts.models import UserProfile, Product, CartSummary, SellerSalesSummary
+
+
+class ProductImportTests(TestCase):
+    def setUp(self):
+        self.seller = User.objects.create_user(username="maker", password="pass123")
+        UserProfile.objects.create(user=self.seller, role="artisan")
+        self.legacy = Product.objects.create(seller=self.seller, name="Old shelf", price=Decimal("30.00"), stock=2)
+
+    def _import(self, text, fmt="csv", **kwargs):
+        return product_import.import_products(self.seller, StringIO(text), fmt, **kwargs)
+
+    def test_csv_upserts_on_sku_and_updates_by_id_in_batches(self):
+        result = self._import(
+            "sku,name,price,stock\n"
+            "OAK-1,Oak stool,12.499,4\n"
+            "OAK-2,Oak bench,80,1\n"
+            "OAK-3,Oak box,9.50,\n",
+            batch_size=2,
+        )
+        self.assertEqual((result.created, result.updated, result.error_count), (3, 0, 0))
+        self.assertEqual(Product.objects.get(sku="OAK-1").price, Decimal("12.50"))
+        self.assertEqual(Product.objects.get(sku="OAK-3").stock, 10)  # model default
+
+        result = self._import(
+            "id,sku,name,price,stock\n"
+            f"{self.legacy.id},SHELF,,,7\n"
+            ",OAK-1,Oak stool v2,14,\n"
+            ",OAK-2,,,0\n"
+        )
+        self.assertEqual((result.created, result.updated, result.error_count), (0, 3, 0))
+        self.legacy.refresh_from_db()
+        self.assertEqual((self.legacy.sku, self.legacy.stock, self.legacy.name), ("SHELF", 7, "Old shelf"))
+        stool = Product.objects.get(sku="OAK-1")
+        self.assertEqual((stool.name, stool.price, stool.stock), ("Oak stool v2", Decimal("14.00"), 4))
+        self.assertEqual(Product.objects.get(sku="OAK-2").stock, 0)
+
+    def test_invalid_rows_are_reported_and_skipped(self):
+        other = User.objects.create_user(username="other", password="pass123")
+        foreign = Product.objects.create(seller=other, name="Not yours", price=1, stock=1)
+        result = self._import(
+            '{"sku": "A", "name": "Ash bowl", "price": "15"}\n'
+            '{"sku": "B", "name": "Birch bowl", "price": "-1"}\n'
+            'not json\n'
+            f'{{"id": {foreign.id}, "stock": 3}}\n'
+            '{"sku": "C", "stock": 3}\n'
+            '{"name": "No key", "price": 3}\n'
+            '{"sku": "D", "name": "Nan bowl", "price": "NaN"}\n'
+            '{"sku": "E", "name": "Inf bowl", "price": "Infinity"}\n',
+            fmt="jsonl",
+        )
+        self.assertEqual(result.created, 1)
+        self.assertEqual(sorted(e["line"] for e in result.errors), [2, 3, 4, 5, 6, 7, 8])
+        self.assertIn("price", next(e["error"] for e in result.errors if e["line"] == 2))
+        skus = Product.objects.filter(seller=self.seller, sku__isnull=False).values_list("sku", flat=True)
+        self.assertEqual(list(skus), ["A"])
+
+    def test_imports_refresh_search_carts_and_low_stock(self):
+        buyer = User.objects.create_user(username="buyer", password="pass123")
+        self.legacy.sku = "SHELF"
+        self.legacy.save()
+        carts.add_item(buyer, self.legacy, 2)
+        sales.rebuild([self.seller.id])
+
+        self._import("sku,name,price,stock\nSHELF,Walnut shelf,35,1\n")
+        self.assertEqual(CartSummary.objects.get(user=buyer).subtotal, Decimal("70.00"))
+        self.assertEqual(SellerSalesSummary.objects.get(seller=self.seller).low_stock_count, 1)
+        if search.fts_available():
+            self.assertEqual([r["name"] for r in search.search_products("walnut")[0]], ["Walnut shelf"])
+
+    def test_upload_endpoint(self):
+        self.client.force_login(self.seller)
+        upload = SimpleUploadedFile("stock.csv", b"\xef\xbb\xbfid,stock\n%d,9\n" % self.legacy.id)
+        resp = self.client.post(reverse("import_products"), {"file": upload})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()["updated"], 1)
+        self.legacy.refresh_from_db()
+        self.assertEqual(self.legacy.stock, 9)
+
+        resp = self.client.post(reverse("import_products"), {"file": SimpleUploadedFile("x.xls", b"")})
+        self.assertEqual(resp.status_code, 400)
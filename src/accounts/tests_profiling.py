@@ -0,0 +1,88 @@
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.test import TestCase, Client, override_settings
+from django.core.management import call_command
+from django.contrib.auth.models import User
+from django.urls import reverse
+
+from accounts import profiling
+from accounts.models import Product
+
+
+class ProfilingMiddlewareTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        profiling.STATS.reset()
+        self.addCleanup(profiling.STATS.reset)
+        self.seller = User.objects.create_user("seller", "s@example.com", "pw-123456")
+        Product.objects.create(name="Oak bowl", price=10.0, stock=3, seller=self.seller)
+
+    def settings_for(self, **extra):
+        return override_settings(PROFILING={
+            "ENABLED": True,
+            "PROFILE_DIR": Path(self.tmp.name) / "profiles",
+            "REQUEST_LOG": str(Path(self.tmp.name) / "requests.jsonl"),
+            **extra,
+        })
+
+    def test_disabled_by_default_is_not_installed(self):
+        with override_settings(PROFILING={"ENABLED": False}):
+            response = Client().get(reverse("home"))
+        self.assertNotIn("Server-Timing", response)
+
+    def test_templates_are_only_wrapped_while_enabled(self):
+        from django.template.loader import get_template
+
+        with override_settings(PROFILING={"ENABLED": False}):
+            self.assertNotIsInstance(get_template("HomePage.html"), profiling.TimedTemplate)
+        with self.settings_for():
+            self.assertIsInstance(get_template("HomePage.html"), profiling.TimedTemplate)
+
+    def test_records_view_sql_and_template_time(self):
+        with self.settings_for():
+            response = Client().get(reverse("home"))
+        self.assertEqual(response.status_code, 200)
+        timing = response["Server-Timing"]
+        self.assertIn("total;dur=", timing)
+        self.assertRegex(timing, r'sql;dur=[\d.]+;desc="[1-9]\d* queries"')
+        self.assertIn("tpl;dur=", timing)
+
+        stats = profiling.STATS.snapshot()["home"]
+        self.assertEqual(stats["count"], 1)
+        self.assertGreater(stats["mean_sql_count"], 0)
+        self.assertGreater(stats["mean_template_ms"], 0)
+        self.assertEqual(sum(stats["histogram"].values()), 1)
+
+        log = profiling.summarize_log(Path(self.tmp.name) / "requests.jsonl")
+        self.assertEqual(log["home"]["count"], 1)
+
+    def test_sampled_requests_dump_cprofile_stats(self):
+        with self.settings_for(SAMPLE_RATE=1.0):
+            response = Client().get(reverse("product_search"), {"q": "oak"})
+        self.assertIn('prof;desc="sampled"', response["Server-Timing"])
+        dumps = list((Path(self.tmp.name) / "profiles").glob("product_search-*.prof"))
+        self.assertEqual(len(dumps), 1)
+
+    def test_stats_endpoint_is_staff_only(self):
+        staff = User.objects.create_user("staff", "st@example.com", "pw-123456", is_staff=True)
+        client = Client()
+        client.force_login(self.seller)
+        self.assertRedirects(client.get(reverse("profiling_stats")), reverse("home"), fetch_redirect_response=False)
+
+        with self.settings_for():
+            client = Client()
+            client.force_login(staff)
+            client.get(reverse("home"))
+            data = client.get(reverse("profiling_stats")).json()
+        self.assertTrue(data["enabled"])
+        self.assertEqual(data["views"]["home"]["count"], 1)
+
+    def test_report_command_summarizes_log(self):
+        with self.settings_for():
+            Client().get(reverse("home"))
+            out = StringIO()
+            call_command("profiling_report", stdout=out)
+        self.assertIn("home", out.getvalue())
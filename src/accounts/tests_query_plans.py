@@ -0,0 +1,70 @@
+from django.test import TestCase
+from django.contrib.auth.models import User
+from unittest import skipUnless
+from django.db import IntegrityError, connection, transaction
+
+from accounts import inventory
+from accounts.models import Product, CartItem, Fulfillment, Order
+
+
+@skipUnless(connection.vendor == "sqlite", "asserts on SQLite EXPLAIN QUERY PLAN output")
+class HotQueryPlanTests(TestCase):
+    """The lookups views.py runs on every request must be index searches, not scans."""
+
+    def setUp(self):
+        self.seller = User.objects.create_user("seller", "s@example.com", "pw-123456")
+        self.buyer = User.objects.create_user("buyer", "b@example.com", "pw-123456")
+        self.product = Product.objects.create(name="Oak bowl", price=10.0, stock=3, seller=self.seller)
+
+    def assertIndexSearch(self, queryset, table, uses):
+        plan = queryset.explain()
+        self.assertNotRegex(plan, rf"\bSCAN {table}\b", msg=plan)
+        self.assertIn(f"SEARCH {table} USING", plan, msg=plan)
+        self.assertIn(uses, plan, msg=plan)
+        return plan
+
+    def test_login_and_register_email_lookup(self):
+        self.assertIndexSearch(
+            User.objects.filter(email="b@example.com"), "auth_user", "auth_user_email_idx (email=?)"
+        )
+
+    def test_add_to_cart_line_lookup(self):
+        self.assertIndexSearch(
+            CartItem.objects.filter(user=self.buyer, product=self.product),
+            "accounts_cartitem",
+            "(user_id=? AND product_id=?)",
+        )
+
+    def test_shopping_cart_lines(self):
+        self.assertIndexSearch(
+            CartItem.objects.filter(user=self.buyer).select_related("product"),
+            "accounts_cartitem",
+            "(user_id=?)",
+        )
+
+    def test_dashboard_low_stock_listings(self):
+        plan = self.assertIndexSearch(
+            inventory.low_stock(self.seller), "accounts_product", "product_low_stock_idx (seller_id=?)"
+        )
+        self.assertNotIn("TEMP B-TREE FOR ORDER BY", plan)
+
+    def test_fulfillment_queue_needs_no_sort(self):
+        plan = self.assertIndexSearch(
+            Fulfillment.objects.filter(seller=self.seller, status="pending").order_by("created_at", "id"),
+            "accounts_fulfillment",
+            "fulfillment_queue_idx (seller_id=? AND status=?)",
+        )
+        self.assertNotIn("TEMP B-TREE FOR ORDER BY", plan)
+
+    def test_order_history_needs_no_sort(self):
+        plan = self.assertIndexSearch(
+            Order.objects.filter(user=self.buyer).order_by("-created_at", "-id"),
+            "accounts_order",
+            "order_user_created_idx (user_id=?)",
+        )
+        self.assertNotIn("TEMP B-TREE FOR ORDER BY", plan)
+
+    def test_duplicate_cart_lines_are_rejected(self):
+        CartItem.objects.create(user=self.buyer, product=self.product)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            CartItem.objects.create(user=self.buyer, product=self.product)
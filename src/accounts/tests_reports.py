@@ -0,0 +1,135 @@
+import csv
+import datetime
+import json
+from decimal import Decimal
+from io import StringIO
+
+from django.test import TestCase, Client
+from django.core.cache import caches
+from django.core.management import call_command
+from django.contrib.auth.models import User
+from django.urls import reverse
+from unittest.mock import patch
+
+from accounts import orders, reports
+from accounts.models import UserProfile, Product, CartItem, DailySales
+
+
+class SalesExportTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.seller = User.objects.create_user(username="artisan", password="pass123")
+        UserProfile.objects.create(user=self.seller, role="artisan")
+        other = User.objects.create_user(username="other", password="pass123")
+        buyer = User.objects.create_user(username="buyer", password="pass123")
+        self.stool = Product.objects.create(name="Stool, low", price=50.0, stock=100, seller=self.seller)
+        self.lamp = Product.objects.create(name="Lamp", price=30.0, stock=100, seller=self.seller)
+        foreign = Product.objects.create(name="Rug", price=80.0, stock=100, seller=other)
+        for product, qty in ((self.stool, 2), (self.lamp, 1), (foreign, 1)):
+            CartItem.objects.create(user=buyer, product=product, quantity=qty)
+        self.order = orders.place_order(buyer)
+        self.client.force_login(self.seller)
+
+    def _get(self, **params):
+        resp = self.client.get(reverse("sales_export"), params)
+        self.assertEqual(resp.status_code, 200)
+        return resp, b"".join(resp.streaming_content).decode()
+
+    def test_csv_export_only_includes_own_items(self):
+        resp, body = self._get(format="csv")
+        self.assertEqual(resp["Content-Type"], "text/csv")
+        rows = list(csv.reader(body.splitlines()))
+        self.assertEqual(rows[0][0], "order_id")
+        self.assertEqual(sorted(r[3] for r in rows[1:]), ["Lamp", "Stool, low"])
+        stool = next(r for r in rows[1:] if r[3] == "Stool, low")
+        self.assertEqual(stool[4:], ["2", "50.00", "100.00"])
+
+    def test_jsonl_export_with_product_filter(self):
+        _, body = self._get(format="jsonl", product=self.lamp.id)
+        lines = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(lines[0]["order_id"], self.order.order_id)
+
+    def test_date_range_filter(self):
+        _, body = self._get(format="jsonl", end="2000-01-01")
+        self.assertEqual(body, "")
+
+    def test_invalid_parameters(self):
+        resp = self.client.get(reverse("sales_export"), {"format": "xml"})
+        self.assertEqual(resp.status_code, 400)
+        resp = self.client.get(reverse("sales_export"), {"start": "yesterday"})
+        self.assertEqual(resp.status_code, 400)
+
+    def test_buyers_are_refused(self):
+        buyer = User.objects.get(username="buyer")
+        self.client.force_login(buyer)
+        resp = self.client.get(reverse("sales_export"))
+        self.assertEqual(resp.status_code, 403)
+        self.assertFalse(resp.json()["success"])
+
+
+class DailySalesReportTests(TestCase):
+    def setUp(self):
+        caches["aggregates"].clear()
+        self.client = Client()
+        self.seller = User.objects.create_user(username="artisan", password="pass123")
+        UserProfile.objects.create(user=self.seller, role="artisan")
+        self.buyer = User.objects.create_user(username="buyer", password="pass123")
+        self.cup = Product.objects.create(name="Cup", price=6.0, stock=100, seller=self.seller)
+        self.jug = Product.objects.create(name="Jug", price=20.0, stock=100, seller=self.seller)
+
+    def _order(self, *lines):
+        for product, qty in lines:
+            CartItem.objects.create(user=self.buyer, product=product, quantity=qty)
+        return orders.place_order(self.buyer)
+
+    def _rollup(self):
+        return list(
+            DailySales.objects.order_by("product_id", "day")
+            .values("product_id", "day", "units", "revenue", "order_count")
+        )
+
+    def test_orders_fill_rollup(self):
+        self._order((self.cup, 2), (self.jug, 1))
+        self._order((self.cup, 1))
+        cup = DailySales.objects.get(product=self.cup)
+        self.assertEqual((cup.units, cup.revenue, cup.order_count), (3, Decimal("18.00"), 2))
+
+    def test_backfill_matches_incremental(self):
+        self._order((self.cup, 2), (self.jug, 1))
+        self._order((self.jug, 3))
+        before = self._rollup()
+        DailySales.objects.all().delete()
+        call_command("rebuild_daily_sales", stdout=StringIO())
+        self.assertEqual(self._rollup(), before)
+
+    def test_rebuild_clears_cached_reports_once_on_commit(self):
+        self._order((self.cup, 2))
+        with patch.object(caches[reports.CACHE_ALIAS], "clear") as clear:
+            with self.captureOnCommitCallbacks(execute=True):
+                reports.rebuild_daily_sales()
+                clear.assert_not_called()
+        clear.assert_called_once_with()
+
+    def test_week_and_month_buckets(self):
+        monday = datetime.date(2025, 3, 3)
+        for offset, units in ((0, 1), (2, 2), (7, 4), (30, 8)):
+            DailySales.objects.create(
+                seller=self.seller, product=self.cup, day=monday + datetime.timedelta(days=offset),
+                units=units, revenue=Decimal(units * 6), order_count=1,
+            )
+        weeks = reports.sales_report(self.seller, period="week")
+        self.assertEqual([(w["period_start"], w["units"]) for w in weeks],
+                         [("2025-03-03", 3), ("2025-03-10", 4), ("2025-03-31", 8)])
+        months = reports.sales_report(self.seller, period="month", end=datetime.date(2025, 3, 31))
+        self.assertEqual([(m["period_start"], m["units"]) for m in months], [("2025-03-01", 7)])
+
+    def test_report_endpoint(self):
+        self._order((self.jug, 2))
+        self.client.force_login(self.seller)
+        resp = self.client.get(reverse("sales_report"), {"period": "month", "by_product": "1"})
+        report = resp.json()["report"]
+        self.assertEqual(report[0]["product_name"], "Jug")
+        self.assertEqual(report[0]["revenue"], "40.00")
+        resp = self.client.get(reverse("sales_report"), {"period": "year"})
+        self.assertEqual(resp.status_code, 400)
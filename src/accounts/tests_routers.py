@@ -0,0 +1,76 @@
+from django.test import SimpleTestCase, RequestFactory
+from unittest.mock import patch
+from django.http import HttpResponse
+from django.db import connection
+
+from accounts import routers
+from accounts.middleware import ReplicaRoutingMiddleware
+from accounts.models import Product, CartItem
+
+
+class ReplicaRoutingTests(SimpleTestCase):
+    # The router only inspects state; TestCase's wrapping transaction would pin reads.
+    def setUp(self):
+        self.router = routers.PrimaryReplicaRouter()
+        self.factory = RequestFactory()
+
+    def _middleware(self, view):
+        with patch.object(routers, "replica_configured", return_value=True):
+            return ReplicaRoutingMiddleware(view)
+
+    def test_reads_use_primary_outside_replica_views(self):
+        self.assertEqual(self.router.db_for_read(Product), "default")
+        state, token = routers.start()
+        try:
+            self.assertEqual(self.router.db_for_read(Product), "default")
+            with routers.read_replica():
+                self.assertEqual(self.router.db_for_read(Product), "replica")
+        finally:
+            routers.finish(token)
+
+    def test_a_write_keeps_later_reads_on_primary(self):
+        state, token = routers.start()
+        try:
+            with routers.read_replica():
+                self.assertEqual(self.router.db_for_write(CartItem), "default")
+                self.assertEqual(self.router.db_for_read(Product), "default")
+        finally:
+            routers.finish(token)
+        self.assertTrue(state.wrote)
+
+    def test_reads_inside_a_transaction_use_primary(self):
+        state, token = routers.start()
+        try:
+            with routers.read_replica(), patch.object(connection, "in_atomic_block", True):
+                self.assertEqual(self.router.db_for_read(Product), "default")
+        finally:
+            routers.finish(token)
+
+    def test_middleware_is_skipped_without_a_replica(self):
+        from django.core.exceptions import MiddlewareNotUsed
+
+        with patch.object(routers, "replica_configured", return_value=False), self.assertRaises(MiddlewareNotUsed):
+            ReplicaRoutingMiddleware(lambda request: HttpResponse())
+
+    def test_write_sets_pin_cookie_and_pin_keeps_reads_on_primary(self):
+        def writing_view(request):
+            self.router.db_for_write(CartItem)
+            return HttpResponse()
+
+        response = self._middleware(writing_view)(self.factory.post("/cart/add/"))
+        pin = response.cookies["db_pin"]
+        self.assertEqual(pin["max-age"], routers.sticky_seconds())
+
+        seen = []
+
+        @routers.replica_reads
+        def reading_view(request):
+            seen.append(self.router.db_for_read(Product))
+            return HttpResponse()
+
+        middleware = self._middleware(reading_view)
+        pinned = self.factory.get("/orders/")
+        pinned.COOKIES["db_pin"] = pin.value
+        self.assertNotIn("db_pin", middleware(pinned).cookies)
+        middleware(self.factory.get("/orders/"))
+        self.assertEqual(seen, ["default", "replica"])
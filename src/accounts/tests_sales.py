@@ -0,0 +1,58 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.test import TestCase, Client
+from django.core.management import call_command
+from django.contrib.auth.models import User
+from django.urls import reverse
+
+from accounts import orders
+from accounts.models import UserProfile, Product, CartItem, SellerSalesSummary
+
+
+class SellerSalesSummaryTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.buyer = User.objects.create_user(username="buyer", password="pass123")
+        self.seller = User.objects.create_user(username="artisan", password="pass123")
+        UserProfile.objects.create(user=self.seller, role="artisan")
+        self.bowl = Product.objects.create(name="Bowl", price=12.5, stock=6, seller=self.seller)
+        self.spoon = Product.objects.create(name="Spoon", price=4.0, stock=20, seller=self.seller)
+
+    def _order(self, *lines):
+        for product, qty in lines:
+            CartItem.objects.create(user=self.buyer, product=product, quantity=qty)
+        return orders.place_order(self.buyer)
+
+    def test_placing_orders_updates_summary(self):
+        self._order((self.bowl, 2), (self.spoon, 3))
+        self._order((self.spoon, 1))
+
+        summary = SellerSalesSummary.objects.get(seller=self.seller)
+        self.assertEqual(summary.total_revenue, Decimal("41.00"))
+        self.assertEqual(summary.units_sold, 6)
+        self.assertEqual(summary.order_count, 2)
+        self.assertEqual(summary.low_stock_count, 1)  # bowl dropped to 4
+
+    def test_rebuild_matches_incremental(self):
+        self._order((self.bowl, 1), (self.spoon, 2))
+        self._order((self.bowl, 1))
+        before = SellerSalesSummary.objects.values(
+            "total_revenue", "units_sold", "order_count", "low_stock_count"
+        ).get(seller=self.seller)
+
+        SellerSalesSummary.objects.all().delete()
+        call_command("rebuild_sales_summary", stdout=StringIO())
+
+        after = SellerSalesSummary.objects.values(
+            "total_revenue", "units_sold", "order_count", "low_stock_count"
+        ).get(seller=self.seller)
+        self.assertEqual(before, after)
+
+    def test_dashboard_reads_summary(self):
+        self._order((self.bowl, 2))
+        self.client.force_login(self.seller)
+        resp = self.client.get(reverse("artisan_dashboard"))
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.context["total_sales"], Decimal("25.00"))
+        self.assertEqual(resp.context["total_orders"], 1)
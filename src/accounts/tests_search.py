@@ -0,0 +1,72 @@
+from django.test import TestCase, Client
+from django.contrib.auth.models import User
+from django.urls import reverse
+from unittest.mock import patch
+
+from accounts import search
+from accounts.models import Product
+
+
+class ProductSearchTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        seller = User.objects.create_user(username="seller", password="pass123")
+        self.bowl = Product.objects.create(name="Walnut salad bowl", price=40.0, stock=3, seller=seller)
+        self.spoon = Product.objects.create(name="Walnut spoon", price=9.0, stock=0, seller=seller)
+        self.chair = Product.objects.create(name="Oak chair", price=120.0, stock=2, seller=seller)
+
+    def _ids(self, query, **kwargs):
+        return {r["id"] for r in search.search_products(query, **kwargs)[0]}
+
+    def test_prefix_matching(self):
+        self.assertEqual(self._ids("waln"), {self.bowl.id, self.spoon.id})
+        self.assertEqual(self._ids("walnut bo"), {self.bowl.id})
+
+    def test_filters(self):
+        self.assertEqual(self._ids("walnut", in_stock=True), {self.bowl.id})
+        self.assertEqual(self._ids("walnut", max_price=10), {self.spoon.id})
+
+    def test_index_follows_edits_and_deletes(self):
+        self.chair.name = "Teak chair"
+        self.chair.save()
+        self.assertEqual(self._ids("oak"), set())
+        self.assertEqual(self._ids("teak"), {self.chair.id})
+        self.chair.delete()
+        self.assertEqual(self._ids("teak"), set())
+
+    def test_index_follows_queryset_and_bulk_renames(self):
+        Product.objects.filter(pk=self.chair.pk).update(name="Teak chair")
+        self.assertEqual(self._ids("teak"), {self.chair.id})
+        self.spoon.name = "Cherry spoon"
+        Product.objects.bulk_update([self.spoon], ["name"])
+        self.assertEqual(self._ids("cherry"), {self.spoon.id})
+        self.assertEqual(self._ids("walnut"), {self.bowl.id})
+
+    def test_queries_use_the_routed_read_database(self):
+        with patch.object(search.router, "db_for_read", return_value="default") as db_for_read:
+            self.assertEqual(self._ids("oak"), {self.chair.id})
+        db_for_read.assert_called_once_with(Product)
+
+    def test_keyset_pagination_covers_all_results(self):
+        seller = self.bowl.seller
+        boxes = Product.objects.bulk_create(
+            [Product(name=f"Walnut box {i}", price=5.0, seller=seller) for i in range(7)]
+        )
+        search.index_products(p.id for p in boxes)
+        seen, cursor = [], None
+        while True:
+            results, cursor = search.search_products("walnut", cursor=cursor, limit=3)
+            seen += [r["id"] for r in results]
+            if cursor is None:
+                break
+        self.assertEqual(len(seen), 9)
+        self.assertEqual(len(set(seen)), 9)
+
+    def test_endpoint_is_public(self):
+        resp = self.client.get(reverse("product_search"), {"q": "oak"})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([r["id"] for r in resp.json()["results"]], [self.chair.id])
+
+    def test_endpoint_rejects_bad_cursor(self):
+        resp = self.client.get(reverse("product_search"), {"q": "oak", "cursor": "nope"})
+        self.assertEqual(resp.status_code, 400)
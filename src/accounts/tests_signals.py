@@ -0,0 +1,31 @@
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.test import TestCase
+from django.db import connection
+
+
+class SQLitePragmaTests(TestCase):
+    def _pragma(self, conn, name):
+        with conn.cursor() as cursor:
+            cursor.execute(f"PRAGMA {name}")
+            return cursor.fetchone()[0]
+
+    def test_new_connections_get_the_configured_pragmas(self):
+        self.assertEqual(self._pragma(connection, "synchronous"), 1)  # NORMAL
+        self.assertEqual(self._pragma(connection, "busy_timeout"), settings.SQLITE_PRAGMAS["busy_timeout"])
+
+    def test_file_database_runs_in_wal_mode(self):
+        from django.db.backends.sqlite3.base import DatabaseWrapper
+
+        with tempfile.TemporaryDirectory() as tmp:
+            conn = DatabaseWrapper({**connection.settings_dict, "NAME": str(Path(tmp) / "wal.sqlite3")})
+            try:
+                self.assertEqual(self._pragma(conn, "journal_mode"), "wal")
+            finally:
+                conn.close()
+
+    def test_connections_persist_and_begin_immediate(self):
+        self.assertGreater(settings.DATABASES["default"]["CONN_MAX_AGE"], 0)
+        self.assertEqual(settings.DATABASES["default"]["OPTIONS"]["transaction_mode"], "IMMEDIATE")
@@ -0,0 +1,115 @@
+import datetime
+import json
+import tempfile
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+
+from django.test import TestCase, override_settings
+from django.core.management import call_command
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from accounts import orders, tasks
+from accounts.models import Product, CartItem, Task
+
+
+FLAKY_CALLS = []
+
+
+def flaky_task(fail_times):
+    """Task body for TaskQueueTests: fails ``fail_times`` times, then succeeds."""
+    FLAKY_CALLS.append(fail_times)
+    if len(FLAKY_CALLS) <= fail_times:
+        raise RuntimeError("flaky")
+
+
+class TaskQueueTests(TestCase):
+    def setUp(self):
+        FLAKY_CALLS.clear()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        override = override_settings(INVOICE_CACHE_DIR=Path(self.tmp.name))
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_enqueue_is_idempotent_per_key(self):
+        first, created = tasks.enqueue(flaky_task, {"fail_times": 0}, key="k1")
+        again, created_again = tasks.enqueue(flaky_task, {"fail_times": 0}, key="k1")
+        self.assertTrue(created)
+        self.assertFalse(created_again)
+        self.assertEqual(first.pk, again.pk)
+        self.assertEqual(first.name, "accounts.tests_tasks.flaky_task")
+
+    def test_place_order_queues_invoice_after_commit(self):
+        buyer = User.objects.create_user(username="buyer", password="pass123")
+        seller = User.objects.create_user(username="seller", password="pass123")
+        product = Product.objects.create(name="Bowl", price=Decimal("10.00"), stock=5, seller=seller)
+        CartItem.objects.create(user=buyer, product=product, quantity=1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            order = orders.place_order(buyer)
+            self.assertFalse(Task.objects.exists())  # nothing until commit
+        task = Task.objects.get()
+        self.assertEqual(task.key, f"order_placed:{order.order_id}")
+
+        self.assertEqual(tasks.run_pending(), 1)
+        task.refresh_from_db()
+        self.assertEqual(task.status, Task.DONE)
+        self.assertEqual(len(list(Path(self.tmp.name).glob(f"{order.order_id}-*.pdf"))), 1)
+
+    def test_failures_retry_with_backoff_then_succeed(self):
+        task, _ = tasks.enqueue(flaky_task, {"fail_times": 1})
+        before = timezone.now()
+        self.assertEqual(tasks.run_pending(), 1)
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.attempts), (Task.QUEUED, 1))
+        self.assertIn("RuntimeError: flaky", task.last_error)
+        self.assertGreaterEqual(task.run_at, before + datetime.timedelta(seconds=tasks.BACKOFF_BASE_SECONDS / 2))
+        self.assertEqual(tasks.run_pending(), 0)  # not due yet
+
+        Task.objects.filter(pk=task.pk).update(run_at=timezone.now())
+        self.assertEqual(tasks.run_pending(), 1)
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.attempts, task.last_error), (Task.DONE, 2, ""))
+
+    def test_task_fails_after_max_attempts(self):
+        task, _ = tasks.enqueue(flaky_task, {"fail_times": 5}, max_attempts=2)
+        for _ in range(2):
+            Task.objects.filter(pk=task.pk).update(run_at=timezone.now())
+            tasks.run_pending()
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.attempts), (Task.FAILED, 2))
+        self.assertIsNotNone(task.finished_at)
+
+    def test_expired_lease_is_reclaimed_and_stale_worker_cannot_finish(self):
+        task, _ = tasks.enqueue(flaky_task, {"fail_times": 0})
+        [claimed] = tasks.claim("dead-worker")
+        self.assertEqual(tasks.claim("other"), [])
+        Task.objects.filter(pk=task.pk).update(locked_until=timezone.now() - datetime.timedelta(seconds=1))
+        [reclaimed] = tasks.claim("other")
+        self.assertEqual(reclaimed.attempts, 2)
+        self.assertTrue(tasks.run(reclaimed, "other"))
+        self.assertEqual(tasks._finish(claimed, "dead-worker", status=Task.FAILED), 0)
+
+    def test_retry_delay_doubles_and_caps(self):
+        self.assertEqual(tasks.retry_delay(1, rng=lambda: 1.0), tasks.BACKOFF_BASE_SECONDS)
+        self.assertEqual(tasks.retry_delay(3, rng=lambda: 1.0), tasks.BACKOFF_BASE_SECONDS * 4)
+        self.assertEqual(tasks.retry_delay(30, rng=lambda: 0.0), tasks.BACKOFF_MAX_SECONDS / 2)
+
+    def test_worker_and_stats_commands(self):
+        for i in range(3):
+            tasks.enqueue(flaky_task, {"fail_times": 0}, key=f"job-{i}")
+        out = StringIO()
+        call_command("task_stats", stdout=out)
+        self.assertIn("Due now: 3", out.getvalue())
+
+        out = StringIO()
+        call_command("run_tasks", once=True, threads=1, stdout=out)
+        self.assertIn("Ran 3 task(s)", out.getvalue())
+
+        out = StringIO()
+        call_command("task_stats", "--json", stdout=out)
+        data = json.loads(out.getvalue())
+        self.assertEqual((data["depth"], data["finished_in_window"]), (0, 3))
+        self.assertEqual(data["counts"], [{"name": "accounts.tests_tasks.flaky_task", "status": "done", "count": 3}])
@@ -0,0 +1,130 @@
+import tempfile
+from decimal import Decimal
+from pathlib import Path
+
+from django.test import TestCase, RequestFactory, Client, override_settings
+from django.core.cache import caches
+from django.contrib.auth.models import User
+from django.urls import reverse
+from unittest.mock import patch
+from django.http import HttpResponse
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from accounts import orders
+from accounts.middleware import (
+    LoginRequiredMiddleware, ProfilingMiddleware, ReplicaRoutingMiddleware,
+)
+from accounts.models import UserProfile, Product, CartItem, CartSummary
+
+
+class InvoicePdfTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        override = override_settings(INVOICE_CACHE_DIR=Path(self.tmp.name))
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.client = Client()
+        self.buyer = User.objects.create_user(username="buyer", password="pass123", first_name="Ann")
+        seller = User.objects.create_user(username="seller", password="pass123")
+        for i in range(3):
+            product = Product.objects.create(name=f"Chair {i}", price=20.0, seller=seller)
+            CartItem.objects.create(user=self.buyer, product=product, quantity=1)
+        self.order = orders.place_order(self.buyer)
+        self.client.force_login(self.buyer)
+
+    def test_pdf_download(self):
+        resp = self.client.get(reverse("invoice_pdf", args=[self.order.order_id]))
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp["Content-Type"], "application/pdf")
+        body = b"".join(resp.streaming_content)
+        self.assertTrue(body.startswith(b"%PDF-"))
+        self.assertIn(b"Chair 2", body)
+
+    def test_repeat_download_served_from_cache(self):
+        url = reverse("invoice_pdf", args=[self.order.order_id])
+        b"".join(self.client.get(url).streaming_content)
+        with patch("accounts.invoices.render_pdf") as render_pdf:
+            resp = self.client.get(url)
+            b"".join(resp.streaming_content)
+        render_pdf.assert_not_called()
+        self.assertEqual(len(list(Path(self.tmp.name).glob("*.pdf"))), 1)
+
+    def test_other_users_cannot_download(self):
+        other = User.objects.create_user(username="other", password="pass123")
+        self.client.force_login(other)
+        resp = self.client.get(reverse("invoice_pdf", args=[self.order.order_id]))
+        self.assertEqual(resp.status_code, 404)
+
+    def test_other_users_cannot_view_invoice_page(self):
+        other = User.objects.create_user(username="other", password="pass123")
+        self.client.force_login(other)
+        self.assertEqual(self.client.get(reverse("invoice_page", args=[self.order.order_id])).status_code, 404)
+        resp = self.client.get(reverse("invoice_page"), {"orderId": self.order.order_id})
+        self.assertEqual(resp.status_code, 404)
+
+    def test_invoice_page_single_items_query(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse("invoice_page"), {"orderId": self.order.order_id})
+        item_queries = [q for q in ctx.captured_queries if "accounts_orderitem" in q["sql"]]
+        self.assertEqual(len(item_queries), 1)
+
+
+class AsyncViewTests(TestCase):
+    """Drive the async views through the ASGI handler, as under uvicorn."""
+
+    def setUp(self):
+        self.buyer = User.objects.create_user(username="buyer", password="pass123")
+        UserProfile.objects.create(user=self.buyer, role="buyer")
+        seller = User.objects.create_user(username="seller", password="pass123")
+        self.product = Product.objects.create(seller=seller, name="Oak stool", price=Decimal("12.50"), stock=4)
+        caches["catalog"].clear()
+
+    async def test_catalog_pages_render(self):
+        resp = await self.async_client.get(reverse("home"))
+        self.assertContains(resp, "Oak stool")
+        await self.async_client.aforce_login(self.buyer)
+        resp = await self.async_client.get(reverse("product_details", args=[self.product.id]))
+        self.assertContains(resp, "Oak stool")
+        resp = await self.async_client.get(reverse("product_details", args=[self.product.id + 1]))
+        self.assertEqual(resp.status_code, 404)
+
+    async def test_add_to_cart_and_badge_count(self):
+        resp = await self.async_client.get(reverse("cart_count"))
+        self.assertEqual(resp.json(), {"cart_count": 0})
+
+        await self.async_client.aforce_login(self.buyer)
+        for _ in range(2):
+            resp = await self.async_client.post(reverse("add_to_cart"), {"product_id": self.product.id})
+        self.assertEqual(resp.json(), {"success": True, "cart_count": 1})
+        item = await CartItem.objects.aget(user=self.buyer)
+        self.assertEqual(item.quantity, 2)
+        summary = await CartSummary.objects.aget(user=self.buyer)
+        self.assertEqual(summary.subtotal, Decimal("25.00"))
+        resp = await self.async_client.get(reverse("cart_count"))
+        self.assertEqual(resp.json(), {"cart_count": 1})
+
+    async def test_login_required_middleware_runs_async(self):
+        resp = await self.async_client.get(reverse("order_history"))
+        self.assertRedirects(resp, reverse("login_register"), fetch_redirect_response=False)
+        await self.async_client.aforce_login(self.buyer)
+        resp = await self.async_client.get(reverse("order_history"))
+        self.assertEqual(resp.status_code, 200)
+
+    async def test_profiling_middleware_times_async_requests(self):
+        async def view(request):
+            await Product.objects.acount()
+            return HttpResponse()
+
+        with override_settings(PROFILING={"ENABLED": True, "SAMPLE_RATE": 1.0, "PROFILE_DIR": "unused"}):
+            middleware = ProfilingMiddleware(view)
+        response = await middleware(RequestFactory().get("/"))
+        self.assertIn('sql;dur=', response["Server-Timing"])
+        self.assertIn('desc="1 queries"', response["Server-Timing"])
+        self.assertNotIn("prof;", response["Server-Timing"])
+
+    def test_project_middleware_is_async_capable(self):
+        for middleware in (LoginRequiredMiddleware, ProfilingMiddleware, ReplicaRoutingMiddleware):
+            self.assertTrue(middleware.async_capable, middleware.__name__)
@@ -5,10 +5,12 @@ urlpatterns = [
     # Public
     path('', views.home_page, name='home'),
     path('product/<int:product_id>/', views.product_details, name='product_details'),
+    path('search/', views.product_search, name='product_search'),
 
     # Cart
     path('cart/', views.shopping_cart, name='shopping_cart'),
     path('cart/add/<int:product_id>/', views.add_to_cart, name='add_to_cart'),
+    path('cart/count/', views.cart_count, name='cart_count'),
 
     # Authentication
     path('login/', views.login_register, name='login_register'),
@@ -25,8 +27,14 @@ urlpatterns = [
     path('artisan/listing/', views.create_edit_listing, name='create_listing'),
     path('artisan/listing/<int:product_id>/', views.create_edit_listing, name='edit_listing'),
     path('artisan/fulfillment/', views.fulfillment_page, name='fulfillment'),
+    path('artisan/fulfillment/queue/', views.fulfillment_queue, name='fulfillment_queue'),
+    path('artisan/fulfillment/<int:fulfillment_id>/status/', views.update_fulfillment, name='update_fulfillment'),
     path('artisan/inventory/', views.inventory_manager, name='inventory_manager'),
+    path('artisan/inventory/import/', views.import_products, name='import_products'),
+    path('artisan/inventory/low-stock/', views.inventory_low_stock, name='inventory_low_stock'),
     path('artisan/reports/', views.reports_page, name='reports_page'),
+    path('artisan/reports/export/', views.sales_export, name='sales_export'),
+    path('artisan/reports/sales/', views.sales_report, name='sales_report'),
     path('cart/add/', views.add_to_cart, name='add_to_cart'),
     # CART ACTION ROUTES
     path('cart/update/<int:item_id>/<str:action>/', views.update_cart_quantity, name='update_cart_quantity'),
@@ -34,5 +42,10 @@ urlpatterns = [
     path("checkout/", views.checkout_page, name="checkout"),
     path('order/place/', views.place_order, name='place_order'),
     path("invoice/", views.invoice_page, name="invoice_page"),
+    path("invoice/<str:order_id>/", views.invoice_page, name="invoice_page"),
+    path("invoice/<str:order_id>/pdf/", views.invoice_pdf, name="invoice_pdf"),
+
+    # Staff
+    path("profiling/", views.profiling_stats, name="profiling_stats"),
 
 ]
@@ -1,43 +1,84 @@
-"""Views for public pages, authentication, and user portals.
+"""Views for public pages, authentication, user portals and their JSON endpoints.
 
-Each view keeps previous behavior (simple render or redirect). Minor refactor:
-    * Common render helper to avoid repetition.
-    * Inline comments clarified; functionality unchanged for URLs.
+Pages render a template or redirect. The JSON endpoints answer with
+``{"success": ...}`` bodies and real status codes: 400 for bad parameters,
+403 when a seller-only endpoint is called by someone who is not an artisan,
+409 when stock or a status change conflicts. The work itself lives in the
+service modules (``orders``, ``carts``, ``holds``, ``reports``...).
 """
-from django.shortcuts import render, redirect, get_object_or_404
+from asgiref.sync import sync_to_async
+from django.shortcuts import render, redirect, get_object_or_404, aget_object_or_404
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
 from django.contrib import messages
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, FileResponse, Http404, StreamingHttpResponse
 from django.views.decorators.http import require_POST
 from django.utils.safestring import mark_safe
 from django.utils import timezone
+from django.utils.dateparse import parse_date
+import io
 import json
-import uuid
+import os
+from datetime import timedelta
 
-from .models import UserProfile, Product, CartItem, Order, OrderItem
+from . import carts, catalog, fulfillment, holds, inventory, invoices, orders, pricing, product_import, profiling, reports, sales, search
+from .routers import replica_reads
+from .models import UserProfile, Product, CartItem, Fulfillment, Order, OrderItem
 
 
 def _render(request, template_name):
     return render(request, template_name)
 
 
+def _not_artisan(request):
+    """403 JSON response unless the user is an artisan; None when they are."""
+    if UserProfile.objects.filter(user=request.user, role="artisan").exists():
+        return None
+    return JsonResponse({"success": False, "error": "Sellers only."}, status=403)
+
+
+def _date_param(request, name):
+    """Parse an optional YYYY-MM-DD query param; raise ValueError if malformed."""
+    raw = request.GET.get(name)
+    if not raw:
+        return None
+    value = parse_date(raw)
+    if value is None:
+        raise ValueError(raw)
+    return value
+
+
 # -------------------------
 # PUBLIC PAGES
 # -------------------------
 
-def home_page(request):
-    return _render(request, "HomePage.html")
+async def _page_context(request):
+    """``user`` and ``cart`` loaded up front: templates may not query from an async view."""
+    user = await request.auser()
+    return {"user": user, "cart": await carts.asummary_for(user)}
+
 
+@replica_reads
+async def home_page(request):
+    cards = [mark_safe(html) for html in await catalog.ahome_cards()]
+    return render(request, "HomePage.html", {"cards": cards, **await _page_context(request)})
 
-def product_details(request, product_id):
-    return _render(request, "ProductDetails.html")
+
+@replica_reads
+async def product_details(request, product_id):
+    detail = await catalog.adetail_panel(product_id)
+    if detail is None:
+        raise Http404("No such product.")
+    return render(request, "ProductDetails.html", {"detail": mark_safe(detail), **await _page_context(request)})
 
 
 def shopping_cart(request):
-    items = CartItem.objects.filter(user=request.user) if request.user.is_authenticated else []
-    total = sum(i.product.price * i.quantity for i in items)
+    items = (
+        CartItem.objects.filter(user=request.user).select_related("product")
+        if request.user.is_authenticated else []
+    )
+    total = carts.summary_for(request.user).subtotal
 
     return render(request, "ShoppingCart.html", {
         "items": items,
@@ -45,6 +86,27 @@ def shopping_cart(request):
     })
 
 
+@replica_reads
+def product_search(request):
+    """JSON catalog search: ``q``, ``min_price``, ``max_price``, ``in_stock``, ``cursor``, ``limit``."""
+    try:
+        min_price = float(request.GET["min_price"]) if request.GET.get("min_price") else None
+        max_price = float(request.GET["max_price"]) if request.GET.get("max_price") else None
+        limit = int(request.GET.get("limit", 20))
+        results, next_cursor = search.search_products(
+            request.GET.get("q", ""),
+            min_price=min_price,
+            max_price=max_price,
+            in_stock=request.GET.get("in_stock") in ("1", "true"),
+            cursor=request.GET.get("cursor"),
+            limit=limit,
+        )
+    except (ValueError, search.InvalidCursor):
+        return JsonResponse({"success": False, "error": "Invalid search parameters."}, status=400)
+
+    return JsonResponse({"success": True, "results": results, "next_cursor": next_cursor})
+
+
 def checkout(request):
     return _render(request, "Checkout.html")
 
@@ -144,18 +206,34 @@ def buyer_profile(request):
 
 
 @login_required
+@replica_reads
 def order_history(request):
-    return _render(request, "OrderHistory.html")
+    try:
+        page, next_cursor = orders.order_history(
+            request.user,
+            cursor=request.GET.get("cursor"),
+            limit=request.GET.get("limit", orders.HISTORY_PAGE_SIZE),
+        )
+    except ValueError:
+        return JsonResponse({"success": False, "error": "Invalid page parameters."}, status=400)
+
+    serialized = [orders.serialize_order(order) for order in page]
+    if request.GET.get("format") == "json":
+        return JsonResponse({"success": True, "orders": serialized, "next_cursor": next_cursor})
+
+    return render(request, "OrderHistory.html", {
+        "orders": serialized,
+        "next_cursor": next_cursor,
+    })
 
 
 @login_required
 def invoice_page(request, order_id=None):
+    order_id = order_id or request.GET.get("orderId")
     if order_id:
-        order = Order.objects.filter(order_id=order_id).first()
-        if not order:
-            return HttpResponse("Invalid order ID")
+        order = get_object_or_404(Order.objects.select_related("user"), order_id=order_id, user=request.user)
 
-        items = OrderItem.objects.filter(order=order)
+        items = OrderItem.objects.filter(order=order).select_related("product")
         serialized_items = [{
             "name": it.product.name,
             "price": float(it.price),
@@ -166,7 +244,10 @@ def invoice_page(request, order_id=None):
             "order_id": order.order_id,
             "created_at": order.created_at.strftime("%Y-%m-%d"),
             "user_name": f"{order.user.first_name} {order.user.last_name}",
-            "shipping_address": "Default Address"
+            "shipping_address": "Default Address",
+            "subtotal": f"{order.subtotal:.2f}",
+            "tax": f"{order.tax:.2f}",
+            "total": f"{order.total:.2f}",
         }
 
         return render(request, "Invoice.html", {
@@ -177,11 +258,24 @@ def invoice_page(request, order_id=None):
     return _render(request, "Invoice.html")
 
 
+@login_required
+def invoice_pdf(request, order_id):
+    order = get_object_or_404(Order.objects.select_related("user"), order_id=order_id, user=request.user)
+    path = invoices.invoice_pdf_path(order)
+    return FileResponse(
+        open(path, "rb"),
+        as_attachment=True,
+        filename=f"{order.order_id}.pdf",
+        content_type="application/pdf",
+    )
+
+
 # -------------------------
 # ARTISAN / SELLER PORTAL
 # -------------------------
 
 @login_required
+@replica_reads
 def artisan_dashboard(request):
 
     profile = UserProfile.objects.get(user=request.user)
@@ -189,25 +283,19 @@ def artisan_dashboard(request):
         return redirect("home")
 
     products = Product.objects.filter(seller=request.user)
-    sold_items = OrderItem.objects.filter(product__seller=request.user)
+    summary = sales.summary_for(request.user)
 
-    total_sales = sum(i.price * i.quantity for i in sold_items)
-    total_orders = sold_items.values("order").distinct().count()
-    low_stock_products = products.filter(stock__lt=5)
-
-    pending_orders = (
-        Order.objects.filter(orderitem__product__seller=request.user).distinct()
-    )
+    low_stock_products = inventory.low_stock(request.user)
 
     recent_listings = products.order_by("-id")[:5]
 
     return render(request, "ArtisanDashboard.html", {
-        "products": products,
-        "sold_items": sold_items,
-        "total_sales": total_sales,
-        "total_orders": total_orders,
+        "summary": summary,
+        "total_sales": summary.total_revenue,
+        "total_orders": summary.order_count,
+        "units_sold": summary.units_sold,
+        "low_stock_count": summary.low_stock_count,
         "low_stock_products": low_stock_products,
-        "pending_orders": pending_orders,
         "recent_listings": recent_listings,
     })
 
@@ -222,14 +310,148 @@ def fulfillment_page(request):
     return _render(request, "Fulfillment.html")
 
 
+@login_required
+@replica_reads
+def fulfillment_queue(request):
+    """JSON page of the seller's fulfillments in one ``status`` (default pending), oldest first."""
+    forbidden = _not_artisan(request)
+    if forbidden:
+        return forbidden
+
+    try:
+        page, next_cursor = fulfillment.queue(
+            request.user,
+            status=request.GET.get("status", "pending"),
+            cursor=request.GET.get("cursor"),
+            limit=request.GET.get("limit", fulfillment.QUEUE_PAGE_SIZE),
+        )
+    except ValueError:
+        return JsonResponse({"success": False, "error": "Invalid queue parameters."}, status=400)
+
+    return JsonResponse({
+        "success": True,
+        "fulfillments": [fulfillment.serialize(f) for f in page],
+        "next_cursor": next_cursor,
+    })
+
+
+@require_POST
+@login_required
+def update_fulfillment(request, fulfillment_id):
+    """Move one of the seller's fulfillments to the posted ``status``."""
+    status = request.POST.get("status")
+    if status not in fulfillment.TRANSITIONS:
+        return JsonResponse({"success": False, "error": "Unknown status."}, status=400)
+    if not fulfillment.set_status(request.user, fulfillment_id, status):
+        get_object_or_404(Fulfillment, id=fulfillment_id, seller=request.user)
+        return JsonResponse({"success": False, "error": f"Cannot move this fulfillment to {status}."}, status=409)
+    return JsonResponse({"success": True, "status": status})
+
+
 @login_required
 def inventory_manager(request):
     return _render(request, "InventoryManager.html")
 
 
 @login_required
+@replica_reads
+def inventory_low_stock(request):
+    """JSON list of the seller's products below their reorder threshold."""
+    forbidden = _not_artisan(request)
+    if forbidden:
+        return forbidden
+
+    products = inventory.low_stock_rows(request.user)
+    return JsonResponse({"success": True, "count": len(products), "products": products})
+
+
+@require_POST
+@login_required
+def import_products(request):
+    """Create, update or restock the seller's products from an uploaded file.
+
+    Form fields: ``file`` (CSV with a header row, or JSON Lines) and an
+    optional ``format`` (csv|jsonl; guessed from the file name otherwise).
+    See ``accounts.product_import`` for the columns.
+    """
+    forbidden = _not_artisan(request)
+    if forbidden:
+        return forbidden
+
+    upload = request.FILES.get("file")
+    fmt = request.POST.get("format") or (product_import.format_for(upload.name, default=None) if upload else None)
+    if upload is None or fmt not in product_import.FORMATS:
+        return JsonResponse({"success": False, "error": "Upload a CSV or JSONL file."}, status=400)
+
+    # Large uploads are spooled to disk by Django; rows are read from there.
+    stream = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+    try:
+        result = product_import.import_products(request.user, stream, fmt)
+    except UnicodeDecodeError:
+        return JsonResponse({"success": False, "error": "The file must be UTF-8 text."}, status=400)
+    finally:
+        stream.detach()
+    return JsonResponse({"success": True, **result.as_dict()})
+
+
+@login_required
+@replica_reads
 def reports_page(request):
-    return _render(request, "Reports.html")
+    today = timezone.localdate()
+    sales_by_product = reports.sales_by_product(request.user, start=today - timedelta(days=29), end=today)
+    return render(request, "Reports.html", {"sales_by_product": sales_by_product})
+
+
+@login_required
+@replica_reads
+def sales_report(request):
+    """JSON sales totals per ``period`` (day|week|month) from the daily rollups."""
+    forbidden = _not_artisan(request)
+    if forbidden:
+        return forbidden
+
+    try:
+        product_id = int(request.GET["product"]) if request.GET.get("product") else None
+        report = reports.sales_report(
+            request.user,
+            period=request.GET.get("period", "day"),
+            start=_date_param(request, "start"),
+            end=_date_param(request, "end"),
+            product_id=product_id,
+            by_product=request.GET.get("by_product") in ("1", "true"),
+        )
+    except ValueError:
+        return JsonResponse({"success": False, "error": "Invalid report parameters."}, status=400)
+
+    return JsonResponse({"success": True, "report": report})
+
+
+@login_required
+def sales_export(request):
+    """Stream the seller's sold line items as CSV or JSON Lines.
+
+    Query params: ``format`` (csv|jsonl), ``start``/``end`` (YYYY-MM-DD,
+    inclusive) and ``product`` (id).
+    """
+    forbidden = _not_artisan(request)
+    if forbidden:
+        return forbidden
+
+    fmt = request.GET.get("format", "csv")
+    try:
+        if fmt not in reports.EXPORT_FORMATS:
+            raise ValueError(fmt)
+        start = _date_param(request, "start")
+        end = _date_param(request, "end")
+        product_id = int(request.GET["product"]) if request.GET.get("product") else None
+    except ValueError:
+        return JsonResponse({"success": False, "error": "Invalid export parameters."}, status=400)
+
+    rows = reports.export_rows(request.user, start=start, end=end, product_id=product_id)
+    stream = reports.csv_stream(rows) if fmt == "csv" else reports.jsonl_stream(rows)
+    response = StreamingHttpResponse(stream, content_type=reports.EXPORT_FORMATS[fmt])
+    response["Content-Disposition"] = f'attachment; filename="sales.{fmt}"'
+    return response
 
 
 # -------------------------
@@ -238,102 +460,109 @@ def reports_page(request):
 
 @require_POST
 @login_required
-def add_to_cart(request):
+async def add_to_cart(request):
     product_id = request.POST.get("product_id")
-    quantity = int(request.POST.get("quantity", 1))
-
-    product = get_object_or_404(Product, id=product_id)
+    try:
+        quantity = int(request.POST.get("quantity", 1))
+    except ValueError:
+        quantity = 0
+    if quantity < 1:
+        return JsonResponse({"success": False, "error": "Quantity must be a whole number of at least 1."}, status=400)
+
+    product = await aget_object_or_404(Product, id=product_id)
+
+    user = await request.auser()
+    # Transactions need the sync ORM; the hold and the cart line are written together.
+    _, short = await sync_to_async(holds.add_to_cart)(user, product, quantity)
+    if short:
+        return JsonResponse(
+            {"success": False, "error": "Not enough stock available.", "available": short[product.id]},
+            status=409,
+        )
 
-    cart_item, created = CartItem.objects.get_or_create(
-        user=request.user,
-        product=product,
-        defaults={'quantity': quantity}
-    )
+    cart_count = await carts.aline_count(user)
+    return JsonResponse({"success": True, "cart_count": cart_count})
 
-    if not created:
-        cart_item.quantity += quantity
-        cart_item.save()
 
-    cart_count = CartItem.objects.filter(user=request.user).count()
-    return JsonResponse({"success": True, "cart_count": cart_count})
+async def cart_count(request):
+    """Cart badge count; 0 for anonymous visitors."""
+    return JsonResponse({"cart_count": await carts.aline_count(await request.auser())})
 
 
 @login_required
 def update_cart_quantity(request, item_id, action):
-    item = get_object_or_404(CartItem, id=item_id, user=request.user)
+    item = get_object_or_404(CartItem.objects.select_related("product"), id=item_id, user=request.user)
 
     if action == "increase":
-        item.quantity += 1
+        if holds.set_line_quantity(request.user, item, item.quantity + 1):
+            messages.error(request, f"No more {item.product.name} available right now.")
     elif action == "decrease" and item.quantity > 1:
-        item.quantity -= 1
+        holds.set_line_quantity(request.user, item, item.quantity - 1)
 
-    item.save()
     return redirect('shopping_cart')
 
 
 @login_required
 def remove_from_cart(request, item_id):
-    item = get_object_or_404(CartItem, id=item_id, user=request.user)
-    item.delete()
+    item = get_object_or_404(CartItem.objects.select_related("product"), id=item_id, user=request.user)
+    holds.remove_line(request.user, item)
     return redirect('shopping_cart')
 
 
 @login_required
 def checkout_page(request):
-    items = CartItem.objects.filter(user=request.user)
-
-    items_json = []
-    subtotal = 0
+    if holds.hold_cart(request.user):
+        messages.error(request, "Some items in your cart are no longer in stock.")
+        return redirect("shopping_cart")
 
-    for item in items:
-        price = float(item.product.price)
-        qty = item.quantity
+    items = CartItem.objects.filter(user=request.user).select_related("product")
 
-        items_json.append({
-            "name": item.product.name,
-            "price": price,
-            "quantity": qty,
-            "color": "7c2d12"
-        })
+    items_json = [{
+        "name": item.product.name,
+        "price": float(item.product.price),
+        "quantity": item.quantity,
+        "color": "7c2d12"
+    } for item in items]
 
-        subtotal += price * qty
+    subtotal, tax, total = pricing.order_totals(carts.summary_for(request.user).subtotal)
 
     return render(request, "Checkout.html", {
         "items_json": items_json,
         "subtotal": subtotal,
-        "total": subtotal,
+        "tax": tax,
+        "tax_rate": float(pricing.TAX_RATE),
+        "total": total,
+        "checkout_key": orders.new_checkout_key(),
     })
 
 
 @login_required
 def place_order(request):
-    cart_items = CartItem.objects.filter(user=request.user)
-    if not cart_items.exists():
+    key = orders.clean_checkout_key(
+        request.POST.get("idempotency_key") or request.headers.get("Idempotency-Key")
+    )
+    try:
+        order = orders.place_order(request.user, key)
+    except orders.EmptyCart:
+        return redirect("shopping_cart")
+    except orders.InsufficientStock:
+        messages.error(request, "Some items in your cart are no longer in stock.")
         return redirect("shopping_cart")
 
-    order_id = "WW-" + uuid.uuid4().hex[:8].upper()
-
-    subtotal = sum(item.product.price * item.quantity for item in cart_items)
-    tax = subtotal * 0.08
-    total = subtotal + tax
-
-    order = Order.objects.create(
-        user=request.user,
-        order_id=order_id,
-        subtotal=subtotal,
-        tax=tax,
-        total=total,
-        created_at=timezone.now(),
-    )
+    return redirect(f"/invoice/?orderId={order.order_id}")
 
-    for item in cart_items:
-        OrderItem.objects.create(
-            order=order,
-            product=item.product,
-            quantity=item.quantity,
-            price=item.product.price
-        )
 
-    cart_items.delete()
+# -------------------------
+# STAFF
+# -------------------------
 
-    return redirect(f"/invoice/?orderId={order_id}")
+@login_required
+def profiling_stats(request):
+    """Per-view timing histogram of this worker process (see ProfilingMiddleware)."""
+    if not request.user.is_staff:
+        return redirect("home")
+    return JsonResponse({
+        "enabled": profiling.options()["ENABLED"],
+        "pid": os.getpid(),
+        "views": profiling.STATS.snapshot(),
+    })
@@ -0,0 +1,32 @@
+"""Gunicorn settings for the two deployment profiles.
+
+WEBSITE_SERVER picks the profile:
+
+    wsgi  (default) website.wsgi with sync workers, each holding
+          WEBSITE_THREADS threads; a slow client ties up a thread.
+    asgi  website.asgi under uvicorn workers. The async views (catalog,
+          product detail, cart add and badge count) wait on the network
+          without holding a thread, so one process serves many slow
+          clients. Needs ``pip install "uvicorn[standard]"``.
+
+Django closes database connections at the end of each ASGI request, so
+persistent connections buy nothing there; CONN_MAX_AGE defaults to 0.
+"""
+import os
+
+SERVER = os.environ.get("WEBSITE_SERVER", "wsgi")
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get("WEBSITE_WORKERS", 3))
+accesslog = "-"
+errorlog = "-"
+
+if SERVER == "asgi":
+    wsgi_app = "website.asgi:application"
+    worker_class = "uvicorn.workers.UvicornWorker"
+    os.environ.setdefault("WEBSITE_CONN_MAX_AGE", "0")
+elif SERVER == "wsgi":
+    wsgi_app = "website.wsgi:application"
+    threads = int(os.environ.get("WEBSITE_THREADS", 4))
+else:
+    raise RuntimeError(f"WEBSITE_SERVER must be 'wsgi' or 'asgi', not {SERVER!r}")
@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -42,6 +44,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "accounts.middleware.ProfilingMiddleware",
+    "accounts.middleware.ReplicaRoutingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -56,7 +60,9 @@ ROOT_URLCONF = "website.urls"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        # DjangoTemplates that reports render time to ProfilingMiddleware;
+        # returns the stock templates while PROFILING["ENABLED"] is off.
+        "BACKEND": "accounts.profiling.TimedDjangoTemplates",
         "DIRS": [],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -64,6 +70,7 @@ TEMPLATES = [
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
+                "accounts.context_processors.cart",
             ],
         },
     },
@@ -74,12 +81,86 @@ WSGI_APPLICATION = "website.wsgi.application"
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
-
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+#
+# WEBSITE_DB_ENGINE picks the backend:
+#   sqlite      a file at WEBSITE_DB_NAME (default db.sqlite3 next to manage.py)
+#   postgresql  WEBSITE_DB_NAME/_HOST/_PORT/_USER/_PASSWORD (pip install "psycopg[binary]")
+# Setting WEBSITE_DB_REPLICA_HOST (or, for SQLite, WEBSITE_DB_REPLICA_NAME)
+# adds a "replica" alias. Unset WEBSITE_DB_REPLICA_* values fall back to the
+# primary's. accounts.routers then sends the reads of catalog, order
+# history, report and dashboard views to it. To try this locally, point
+# both aliases at separate SQLite files and refresh the copy with
+# sync_replica.
+
+DB_ENGINE = os.environ.get("WEBSITE_DB_ENGINE", "sqlite")
+
+
+def _database(prefix="WEBSITE_DB_", fallback=None):
+    fallback = fallback or {}
+
+    def env(name, default=None):
+        return os.environ.get(prefix + name, fallback.get(name, default))
+
+    config = {
+        # Keep each worker thread's connection open between requests.
+        "CONN_MAX_AGE": int(os.environ.get("WEBSITE_CONN_MAX_AGE", 600)),
+        "CONN_HEALTH_CHECKS": True,
+    }
+    if DB_ENGINE == "postgresql":
+        config.update(
+            ENGINE="django.db.backends.postgresql",
+            NAME=env("NAME", "website"),
+            HOST=env("HOST", "localhost"),
+            PORT=env("PORT", "5432"),
+            USER=env("USER", ""),
+            PASSWORD=env("PASSWORD", ""),
+        )
+    else:
+        config.update(
+            ENGINE="django.db.backends.sqlite3",
+            NAME=env("NAME", BASE_DIR / "db.sqlite3"),
+            OPTIONS={
+                # Take the write lock at BEGIN so a read-then-write transaction
+                # (place_order) waits for busy_timeout instead of failing on upgrade.
+                "transaction_mode": "IMMEDIATE",
+            },
+        )
+    return config
+
+
+def _env_keys(prefix):
+    return {key[len(prefix):]: value for key, value in os.environ.items() if key.startswith(prefix)}
+
+
+DATABASES = {"default": _database()}
+
+_REPLICA_ENV = _env_keys("WEBSITE_DB_REPLICA_")
+if "HOST" in _REPLICA_ENV or "NAME" in _REPLICA_ENV:
+    DATABASES["replica"] = {
+        **_database("WEBSITE_DB_REPLICA_", fallback=_env_keys("WEBSITE_DB_")),
+        # Tests run against one database; the replica alias reuses it.
+        "TEST": {"MIRROR": "default"},
     }
+    DATABASE_ROUTERS = ["accounts.routers.PrimaryReplicaRouter"]
+
+# Seconds a client keeps reading from the primary after it writes, to
+# cover replication lag (accounts.middleware.ReplicaRoutingMiddleware).
+REPLICA_STICKY_SECONDS = int(os.environ.get("WEBSITE_DB_REPLICA_STICKY", 10))
+
+# How long adding to the cart or opening checkout holds stock for a buyer
+# (accounts.holds); the sweep_holds command deletes expired holds.
+STOCK_HOLD_SECONDS = int(os.environ.get("WEBSITE_STOCK_HOLD_SECONDS", 600))
+
+# Applied to every new SQLite connection by accounts.signals.apply_sqlite_pragmas.
+# WAL lets readers run alongside the single writer; NORMAL sync is durable
+# across application crashes (only an OS crash can lose the last commits).
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,  # ms to wait for a lock before "database is locked"
+    "cache_size": -20000,  # KiB of page cache per connection
+    "mmap_size": 128 * 1024 * 1024,
+    "temp_store": "MEMORY",
 }
 
 
@@ -119,6 +200,76 @@ USE_TZ = True
 
 STATIC_URL = "static/"
 
+# Caches
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+#
+# One alias per kind of data so each can be sized, expired and flushed on
+# its own. WEBSITE_CACHE_BACKEND picks the backend for all of them:
+#   sqlite  shared SQLite files under CACHE_DIR, no extra service (default)
+#   redis   a Redis-compatible server at WEBSITE_REDIS_URL (pip install redis)
+#   locmem  per-process memory; always used by the test suite
+# Bump an alias's VERSION to invalidate everything it holds. Backends count
+# hits and misses; see the cache_stats command.
+
+TESTING = len(sys.argv) > 1 and sys.argv[1] == "test"
+CACHE_BACKEND = "locmem" if TESTING else os.environ.get("WEBSITE_CACHE_BACKEND", "sqlite")
+CACHE_DIR = Path(os.environ.get("WEBSITE_CACHE_DIR", BASE_DIR / "cache"))
+REDIS_URL = os.environ.get("WEBSITE_REDIS_URL", "redis://127.0.0.1:6379/0")
+
+
+def _cache(alias, timeout, max_entries, version=1):
+    config = {
+        "TIMEOUT": timeout,
+        "KEY_PREFIX": alias,
+        "VERSION": int(os.environ.get(f"WEBSITE_CACHE_{alias.upper()}_VERSION", version)),
+        "OPTIONS": {},
+    }
+    if CACHE_BACKEND == "redis":
+        config.update(BACKEND="accounts.caches.RedisCache", LOCATION=REDIS_URL)
+    elif CACHE_BACKEND == "locmem":
+        config.update(BACKEND="accounts.caches.LocMemCache", LOCATION=alias)
+        config["OPTIONS"]["MAX_ENTRIES"] = max_entries
+    else:
+        config.update(BACKEND="accounts.caches.SQLiteCache", LOCATION=str(CACHE_DIR / f"{alias}.sqlite3"))
+        config["OPTIONS"]["MAX_ENTRIES"] = max_entries
+    return config
+
+
+CACHES = {
+    "default": _cache("default", timeout=300, max_entries=10_000),
+    # Session data (accounts use SESSION_CACHE_ALIAS).
+    "sessions": _cache("sessions", timeout=60 * 60 * 24 * 14, max_entries=100_000),
+    # Rendered product fragments, versioned on Product.updated_at (accounts.catalog).
+    "catalog": _cache("catalog", timeout=60 * 60 * 24, max_entries=50_000),
+    # Per-seller report aggregates, invalidated as orders land (accounts.reports).
+    "aggregates": _cache("aggregates", timeout=60 * 15, max_entries=20_000),
+}
+
+# Sessions
+# https://docs.djangoproject.com/en/5.2/topics/http/sessions/
+#
+# cached_db serves session reads from the "sessions" cache and writes to the
+# database only when a session changes, so authenticated requests no longer
+# read django_session. signed_cookies avoids the table entirely but cannot
+# be revoked server side. Expired rows are removed by cleanup_sessions; the
+# bench_sessions command compares engines under concurrent load.
+
+SESSION_ENGINE = os.environ.get("WEBSITE_SESSION_ENGINE", "django.contrib.sessions.backends.cached_db")
+SESSION_CACHE_ALIAS = "sessions"
+
+# Rendered PDF invoices, keyed by order id and content hash (accounts.invoices).
+INVOICE_CACHE_DIR = BASE_DIR / "invoice_cache"
+
+# Per-request profiling (accounts.middleware.ProfilingMiddleware). Off unless
+# WEBSITE_PROFILING=1; see accounts.profiling for what each option does.
+PROFILING = {
+    "ENABLED": os.environ.get("WEBSITE_PROFILING") == "1",
+    "SERVER_TIMING": True,
+    "SAMPLE_RATE": float(os.environ.get("WEBSITE_PROFILE_SAMPLE_RATE", "0")),
+    "PROFILE_DIR": BASE_DIR / "profiles",
+    "REQUEST_LOG": os.environ.get("WEBSITE_PROFILE_LOG") or None,
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 